@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Throughput of `weigh export` (weigh/export.py) on a synthetic database.
+
+Fills a throwaway database with N entries spread over 36 months (random
+donor/type, ~30% with temperatures, 1% undone), then for each format:
+
+  * full export: seconds, rows/s and size on disk
+  * repeat export after 100 new entries in one month: only that month is
+    rewritten
+
+and, for comparison, the time to build the report CSV of the whole range
+(report_utils.iter_report_csv) and its size.
+
+Usage: PYTHONPATH=src python benchmarks/bench_export.py [rows]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from weigh import db, export  # noqa: E402
+
+MONTHS = 36
+
+
+def fill(rows: int) -> None:
+    random.seed(7)
+    sources = [row["id"] for row in db.fetch_sources()]
+    types = [row["id"] for row in db.fetch_types()]
+    conn = db.get_conn()
+    start = time.mktime((2023, 1, 1, 0, 0, 0, 0, 0, 0))
+    span = MONTHS * 30.4 * 86400
+    batch = []
+    for i in range(rows):
+        ts = start + span * i / rows
+        temp = random.random() < 0.3
+        batch.append((
+            time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + f".{i % 1000000:06d}+00:00",
+            round(random.uniform(0.2, 60.0), 2), random.choice(sources), random.choice(types),
+            int(random.random() < 0.01),
+            round(random.uniform(33.0, 41.0), 1) if temp else None,
+            round(random.uniform(33.0, 41.0), 1) if temp else None,
+        ))
+        if len(batch) == 100_000:
+            conn.executemany("""
+                INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                                  temp_pickup_f, temp_dropoff_f)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, batch)
+            batch = []
+    if batch:
+        conn.executemany("""
+            INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                              temp_pickup_f, temp_dropoff_f)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+    conn.commit()
+    conn.close()
+
+
+def add_entries(month: str, count: int) -> None:
+    conn = db.get_conn()
+    conn.executemany("""
+        INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted)
+        VALUES (?, 5.0, 1, 1, 0)
+    """, [(f"{month}-15T12:00:{i % 60:02d}+00:00",) for i in range(count)])
+    conn.commit()
+    conn.close()
+
+
+def size_mb(path: Path) -> float:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 1e6
+
+
+def main(rows: int = 2_000_000) -> None:
+    work = Path(tempfile.mkdtemp())
+    db.init_for_test(str(work / "weigh.db"), str(ROOT / "src" / "weigh" / "schema.sql"))
+    t0 = time.perf_counter()
+    fill(rows)
+    print(f"{rows:,} entries over {MONTHS} months, database {size_mb(work) :.0f} MB "
+          f"(filled in {time.perf_counter() - t0:.1f} s)")
+
+    print(f"  {'format':>8} {'full s':>8} {'rows/s':>10} {'MB':>7} {'repeat s':>9} {'rewritten':>10}")
+    for fmt in export.FORMATS:
+        out = work / f"export-{fmt}"
+        full = export.export_logs(out, fmt)
+        add_entries("2024-06", 100)
+        t0 = time.perf_counter()
+        repeat = export.export_logs(out, fmt)
+        repeat_s = time.perf_counter() - t0
+        print(f"  {fmt:>8} {full.seconds:>8.1f} {full.rows / full.seconds:>10,.0f} {size_mb(out):>7.1f} "
+              f"{repeat_s:>9.2f} {','.join(repeat.written):>10}")
+
+    from weigh import report_utils
+    t0 = time.perf_counter()
+    csv_bytes = sum(len(chunk) for chunk in report_utils.iter_report_csv("2000-01-01", "2100-01-01"))
+    csv_s = time.perf_counter() - t0
+    print(f"  {'csv':>8} {csv_s:>8.1f} {rows / csv_s:>10,.0f} {csv_bytes / 1e6:>7.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compare the lite kiosk (kiosk_lite.py) with the Streamlit kiosk (app.py).
+
+Starts each frontend as its own server process on a throwaway database with
+a fake scale (a stable 5 lb load), then, from this process:
+
+  * first paint: fetches the page and every script/stylesheet it loads up
+    front, then (Streamlit) opens the websocket and waits for the first
+    script run to finish. Reports the time and the bytes shipped; the
+    browser's own parse/render time is not included, so the byte count is
+    the better guide to what a slow tablet pays on top.
+  * click-to-update: clicks the "Produce" type button N times and times the
+    round trip until the updated screen has arrived (Streamlit: the entry
+    panel fragment rerun over the websocket, as the browser sends it; lite:
+    POST /log and its panel HTML)
+  * server memory (VmRSS) after start, after the first session and after
+    the clicks, and server CPU time per click
+
+Usage: PYTHONPATH=src python benchmarks/bench_lite.py [clicks]
+"""
+import asyncio
+import http.client
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+STREAMLIT_PORT = 8611
+LITE_PORT = 8613
+
+
+class FakeScale:
+    """Stands in for DymoHIDScale: a stable 5 lb load, no USB device."""
+
+    def __init__(self, *args, **kwargs):
+        from weigh import scale_backend
+        self.reading = scale_backend.ScaleReading(5.0, "lb", True)
+
+    def get_latest(self):
+        return self.reading
+
+    def read_stable_weight(self, timeout_s=2.0):
+        return self.reading
+
+    def add_listener(self, callback):
+        pass
+
+    def remove_listener(self, callback):
+        pass
+
+    def get_telemetry(self):
+        return {"unknown_unit_codes": {}}
+
+    def close(self):
+        pass
+
+
+def serve(frontend: str, port: int) -> None:
+    """Server process: the frontend with the fake scale"""
+    from weigh import scale_backend
+    scale_backend.DymoHIDScale = FakeScale
+    if frontend == "lite":
+        from weigh import kiosk_lite
+        kiosk_lite.serve("127.0.0.1", port)
+    else:
+        from streamlit.web import cli as stcli
+        sys.argv = ["streamlit", "run", str(ROOT / "src" / "weigh" / "app.py"),
+                    f"--server.port={port}", "--server.address=127.0.0.1",
+                    "--server.headless=true", "--browser.gatherUsageStats=false"]
+        stcli.main()
+
+
+# ---------------- server process ----------------
+
+def start(frontend: str, port: int, env: dict) -> subprocess.Popen:
+    try:
+        get(port, "/")
+        raise RuntimeError(f"Port {port} is already serving something")
+    except OSError:
+        pass
+    proc = subprocess.Popen([sys.executable, __file__, "--serve", frontend, str(port)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            get(port, "/")
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{frontend} did not start")
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def cpu_s(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+# ---------------- clients ----------------
+
+def get(port: int, path: str, conn: http.client.HTTPConnection = None) -> bytes:
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    return resp.read()
+
+
+def fetch_page(port: int):
+    """GET / plus the scripts, stylesheets and images it loads up front: (ms, bytes)"""
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    page = get(port, "/", conn)
+    total = len(page)
+    refs = re.findall(rb'(?:src|href)="(\.?/[^"]+\.(?:js|css|png))"', page)
+    for ref in dict.fromkeys(refs):
+        total += len(get(port, "/" + ref.decode().lstrip("./"), conn))
+    return (time.perf_counter() - t0) * 1000.0, total
+
+
+def lite_run(port: int, clicks: int, mark):
+    first_ms, size = fetch_page(port)
+    mark()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    timings = []
+    for _ in range(clicks):
+        t0 = time.perf_counter()
+        conn.request("POST", "/log", body="type=Produce&source=Wegmans",
+                     headers={"Content-Type": "application/x-www-form-urlencoded"})
+        panel = conn.getresponse().read()
+        timings.append((time.perf_counter() - t0) * 1000.0)
+        assert b"Logged Produce" in panel, panel[:200]
+    return first_ms, size, timings
+
+
+async def streamlit_session(port: int, clicks: int, mark):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    async def run_until_finished(ws, message):
+        await ws.send(message.SerializeToString())
+        buttons = {}
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                if element.WhichOneof("type") == "button":
+                    buttons[element.button.label] = (element.button.id, msg.delta.fragment_id)
+            elif kind == "script_finished":
+                return buttons
+
+    t0 = time.perf_counter()
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                  subprotocols=["streamlit"], max_size=None) as ws:
+        first = BackMsg()
+        first.rerun_script.query_string = ""
+        buttons = await run_until_finished(ws, first)
+        script_ms = (time.perf_counter() - t0) * 1000.0
+        mark()
+
+        widget_id, fragment_id = buttons["Produce"]
+        timings = []
+        for _ in range(clicks):
+            click = BackMsg()
+            click.rerun_script.query_string = ""
+            click.rerun_script.fragment_id = fragment_id
+            widget = click.rerun_script.widget_states.widgets.add()
+            widget.id = widget_id
+            widget.trigger_value = True
+            t0 = time.perf_counter()
+            await run_until_finished(ws, click)
+            timings.append((time.perf_counter() - t0) * 1000.0)
+    return script_ms, timings
+
+
+def streamlit_run(port: int, clicks: int, mark):
+    page_ms, size = fetch_page(port)
+    script_ms, timings = asyncio.run(streamlit_session(port, clicks, mark))
+    return page_ms + script_ms, size, timings
+
+
+# ---------------- report ----------------
+
+def measure(frontend: str, port: int, run, clicks: int, env: dict) -> dict:
+    proc = start(frontend, port, env)
+    try:
+        time.sleep(1.0)
+        started = rss_mb(proc.pid)
+        # Server CPU time when the first paint is done and the clicks start
+        cpu0 = []
+        first_ms, size, timings = run(port, clicks, lambda: cpu0.append(cpu_s(proc.pid)))
+        cpu_ms = (cpu_s(proc.pid) - cpu0[0]) * 1000.0 / max(clicks, 1)
+        return {
+            "frontend": frontend, "idle MB": started, "after MB": rss_mb(proc.pid),
+            "first paint ms": first_ms, "first paint KB": size / 1024.0,
+            "click ms": statistics.median(timings), "click p95 ms": sorted(timings)[int(0.95 * (len(timings) - 1))],
+            "CPU ms/click": cpu_ms,
+        }
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def main(clicks: int = 30) -> None:
+    work = tempfile.mkdtemp()
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"), WEIGHIT_WEIGHT_STREAM_PORT="8612",
+               WEIGHIT_STATIONS_FILE=os.path.join(work, "none.toml"))
+    results = []
+    for frontend, port, run in (("streamlit", STREAMLIT_PORT, streamlit_run),
+                                ("lite", LITE_PORT, lite_run)):
+        env["WEIGHIT_DB_PATH"] = os.path.join(work, f"{frontend}.db")
+        results.append(measure(frontend, port, run, clicks, env))
+
+    columns = list(results[0])
+    print(f"{clicks} clicks per frontend")
+    print("  " + " ".join(f"{c:>15}" for c in columns))
+    for r in results:
+        print("  " + " ".join(f"{r[c]:>15.1f}" if isinstance(r[c], float) else f"{r[c]:>15}"
+                              for c in columns))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure the script work done by one type-button ("log") click on the kiosk.
+
+Runs src/weigh/app.py under Streamlit's AppTest with a fake scale holding a
+stable weight and a throwaway database, clicks a type button N times and
+reports:
+
+  * full script run time per click (what every click cost before the main
+    screen was split into fragments)
+  * the time of each profiled section, from weigh.profiling, including the
+    fragment a click actually reruns in the browser
+
+Usage: PYTHONPATH=src python benchmarks/bench_log_click.py [clicks]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+os.environ.setdefault("WEIGHIT_DB_PATH", os.path.join(tempfile.mkdtemp(), "weigh.db"))
+os.environ.setdefault("WEIGHIT_WEIGHT_STREAM_PORT", "0")
+os.environ["WEIGHIT_PROFILE_RERUNS"] = "1"
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from weigh import scale_backend  # noqa: E402
+
+
+class FakeScale:
+    """Stands in for DymoHIDScale: a stable 5 lb load, no USB device."""
+
+    def __init__(self, *args, **kwargs):
+        self.reading = scale_backend.ScaleReading(5.0, "lb", True)
+
+    def get_latest(self):
+        return self.reading
+
+    def read_stable_weight(self, timeout_s=2.0):
+        return self.reading
+
+    def add_listener(self, callback):
+        pass
+
+    def remove_listener(self, callback):
+        pass
+
+    def get_telemetry(self):
+        return {"unknown_unit_codes": {}}
+
+    def close(self):
+        pass
+
+
+def main(clicks: int = 20) -> None:
+    scale_backend.DymoHIDScale = FakeScale
+
+    at = AppTest.from_file(str(ROOT / "src" / "weigh" / "app.py"), default_timeout=60)
+    at.run()
+
+    try:
+        from weigh import profiling
+        profiling.clear()
+    except ImportError:
+        profiling = None
+
+    button = next(b for b in at.button if b.label == "Produce")
+    timings = []
+    for _ in range(clicks):
+        t0 = time.perf_counter()
+        at.button(key=button.key).click().run()
+        timings.append((time.perf_counter() - t0) * 1000.0)
+        assert not at.exception, at.exception
+
+    print(f"{clicks} clicks")
+    print(f"  full script run (AppTest): median {statistics.median(timings):7.1f} ms")
+    if profiling is not None:
+        sections = {}
+        for name, ms in profiling.recent():
+            sections.setdefault(name, []).append(ms)
+        for name, values in sorted(sections.items()):
+            print(f"  {name:<24}       median {statistics.median(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Measure the bytes Streamlit sends to the browser per kiosk rerun.
+
+Runs src/weigh/app.py under AppTest (fake scale, throwaway database) and sums
+the serialized size of the ForwardMsgs produced by:
+
+  * the first full run of a session
+  * a full rerun (e.g. donor change, undo)
+  * a type-button click
+  * opening the temperature dialog
+
+Usage: PYTHONPATH=src python benchmarks/bench_payload.py [--no-static]
+
+By default static file serving is on, as in launch.sh; --no-static measures
+the inline fallback.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+os.environ.setdefault("WEIGHIT_DB_PATH", os.path.join(tempfile.mkdtemp(), "weigh.db"))
+os.environ.setdefault("WEIGHIT_WEIGHT_STREAM_PORT", "0")
+
+from streamlit import config  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+
+from bench_log_click import FakeScale  # noqa: E402
+from weigh import scale_backend  # noqa: E402
+
+_sizes = []
+_parse = local_script_runner.parse_tree_from_messages
+
+
+def _measuring_parse(messages):
+    _sizes.append(sum(m.ByteSize() for m in messages))
+    return _parse(messages)
+
+
+def run_and_measure(at: AppTest) -> int:
+    _sizes.clear()
+    at.run()
+    return _sizes[-1]
+
+
+def main() -> None:
+    scale_backend.DymoHIDScale = FakeScale
+    local_script_runner.parse_tree_from_messages = _measuring_parse
+    config.set_option("server.enableStaticServing", "--no-static" not in sys.argv)
+
+    at = AppTest.from_file(str(ROOT / "src" / "weigh" / "app.py"), default_timeout=60)
+    print(f"first run       {run_and_measure(at):7d} bytes")
+    print(f"full rerun      {run_and_measure(at):7d} bytes")
+
+    produce = next(b for b in at.button if b.label == "Produce")
+    at.button(key=produce.key).click()
+    print(f"log click       {run_and_measure(at):7d} bytes")
+
+    meat = next(b for b in at.button if b.label == "Meat")
+    at.button(key=meat.key).click()
+    print(f"temp dialog     {run_and_measure(at):7d} bytes")
+
+
+if __name__ == "__main__":
+    main()
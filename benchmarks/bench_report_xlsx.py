@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Time and memory of the Excel report (report_utils.write_report_xlsx) at
+10k, 100k and 1M entries, next to the CSV report of the same range.
+
+Each size gets a throwaway database filled like bench_export.py (random
+donor/type over 36 months). Generation time is measured without
+tracemalloc; the Python heap peak in a second run with it. The file goes
+to the spool directory, as for an email or download.
+
+Usage: PYTHONPATH=src python benchmarks/bench_report_xlsx.py [rows ...]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_export import fill  # noqa: E402
+from weigh import db, report_utils  # noqa: E402
+
+
+def build(fmt: str) -> Path:
+    report_utils._report_cache.clear()
+    return report_utils.get_report_file("2000-01-01", "2100-01-01", fmt)
+
+
+def main(sizes) -> None:
+    report_utils._spool_dir = Path(tempfile.mkdtemp())
+    print(f"  {'entries':>10} {'format':>6} {'seconds':>8} {'rows/s':>10} {'peak MB':>8} {'file MB':>8}")
+    for rows in sizes:
+        work = Path(tempfile.mkdtemp())
+        db.init_for_test(str(work / "weigh.db"), str(ROOT / "src" / "weigh" / "schema.sql"))
+        fill(rows)
+        for fmt in ("xlsx", "csv"):
+            t0 = time.perf_counter()
+            path = build(fmt)
+            seconds = time.perf_counter() - t0
+            tracemalloc.start()
+            build(fmt)
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            print(f"  {rows:>10,} {fmt:>6} {seconds:>8.2f} {rows / seconds:>10,.0f} {peak:>8.2f} "
+                  f"{path.stat().st_size / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Load test for multi-station mode: memory and CPU per extra station.
+
+Writes a stations.toml with N stations (each with its own scale), then
+opens one kiosk session per station in this process, the way one server
+serves several tablets (?station=NAME), and logs entries from every
+station in turn. Stations alternate between two donors, so the totals and
+history caches of a donor are shared by half of the stations.
+
+Reports, after each station joins:
+
+  * resident memory of the process (VmRSS) and its growth per station
+  * CPU time of the session start and of one log click
+  * number of shared history views (per donor and day, not per station)
+
+Scales are fakes (a stable 5 lb load): a real scale adds one reader thread
+blocked on the USB device, which costs memory but no CPU while idle.
+
+Usage: PYTHONPATH=src python benchmarks/bench_stations.py [stations] [clicks]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ.setdefault("WEIGHIT_DB_PATH", os.path.join(WORK_DIR, "weigh.db"))
+os.environ.setdefault("WEIGHIT_WEIGHT_STREAM_PORT", "0")
+os.environ["WEIGHIT_STATIONS_FILE"] = os.path.join(WORK_DIR, "stations.toml")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from weigh import history, scale_backend  # noqa: E402
+
+DONORS = ("Wegmans", "Safeway")
+
+
+class FakeScale:
+    """Stands in for DymoHIDScale: a stable 5 lb load, no USB device."""
+
+    def __init__(self, *args, **kwargs):
+        self.reading = scale_backend.ScaleReading(5.0, "lb", True)
+
+    def get_latest(self):
+        return self.reading
+
+    def read_stable_weight(self, timeout_s=2.0):
+        return self.reading
+
+    def add_listener(self, callback):
+        pass
+
+    def remove_listener(self, callback):
+        pass
+
+    def get_telemetry(self):
+        return {"unknown_unit_codes": {}}
+
+    def close(self):
+        pass
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def write_config(count: int) -> None:
+    with open(os.environ["WEIGHIT_STATIONS_FILE"], "w") as f:
+        for i in range(count):
+            f.write(f'[stations.S{i}]\nscale = "/dev/hidraw{i}"\nsource = "{DONORS[i % 2]}"\n\n')
+
+
+def main(count: int = 6, clicks: int = 10) -> None:
+    scale_backend.DymoHIDScale = FakeScale
+    write_config(count)
+    app_path = str(ROOT / "src" / "weigh" / "app.py")
+
+    sessions = []
+    print(f"{count} stations, {clicks} clicks per station per round")
+    print(f"  {'stations':>8} {'RSS MB':>8} {'+MB':>6} {'start CPU ms':>13} "
+          f"{'click CPU ms':>13} {'views':>6}")
+    previous = rss_mb()
+    for i in range(count):
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.query_params["station"] = f"S{i}"
+        t0 = time.process_time()
+        at.run()
+        start_ms = (time.process_time() - t0) * 1000.0
+        assert not at.exception, at.exception
+        sessions.append(at)
+
+        # Every station so far logs entries (one round)
+        click_ms = []
+        for session in sessions:
+            button = next(b for b in session.button if b.label == "Produce")
+            for _ in range(clicks):
+                t0 = time.process_time()
+                session.button(key=button.key).click().run()
+                click_ms.append((time.process_time() - t0) * 1000.0)
+                assert not session.exception, session.exception
+
+        rss = rss_mb()
+        print(f"  {i + 1:>8} {rss:>8.1f} {rss - previous:>6.1f} {start_ms:>13.1f} "
+              f"{statistics.median(click_ms):>13.1f} {len(history._views):>6}")
+        previous = rss
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Report summary from per-day blocks (weigh/summary_cache.py) vs aggregating
+the range from the logs every time.
+
+Fills a throwaway database like bench_export.py (N entries over 36 closed
+months), then times the summary of a 1-day and a 365-day range:
+
+  * logs: logger_core.summarize_logs_between (no blocks)
+  * cold: summary_cache.summarize_between, first time (builds the blocks)
+  * warm: again, after a new entry today (no block invalidated)
+  * edit: after an entry of one day in the range is undone (one block rebuilt)
+
+and the whole 365-day report CSV (summary plus detailed rows) with the
+blocks warm, for scale.
+
+Usage: PYTHONPATH=src python benchmarks/bench_summary_cache.py [rows]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_export import fill  # noqa: E402
+from weigh import db, logger_core, report_utils, summary_cache  # noqa: E402
+
+RANGES = {"1 day": ("2024-06-15", "2024-06-15"), "365 days": ("2024-01-01", "2024-12-30")}
+
+
+def timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t0) * 1000
+
+
+def undo_one(day: str) -> None:
+    conn = db.get_conn()
+    conn.execute("UPDATE logs SET deleted=1 WHERE id=(SELECT MIN(id) FROM logs WHERE DATE(timestamp)=?)", (day,))
+    conn.commit()
+    conn.close()
+
+
+def main(rows: int = 1_000_000) -> None:
+    work = Path(tempfile.mkdtemp())
+    db.init_for_test(str(work / "weigh.db"), str(ROOT / "src" / "weigh" / "schema.sql"))
+    fill(rows)
+    print(f"{rows:,} entries over 36 months")
+    print(f"  {'range':>9} {'logs ms':>9} {'cold ms':>9} {'warm ms':>9} {'edit ms':>9}")
+    for name, (start, end) in RANGES.items():
+        logs = timed(logger_core.summarize_logs_between, start, end)
+        cold = timed(summary_cache.summarize_between, start, end)
+        logger_core.log_entry(5.0, "Safeway", "Produce")
+        warm = timed(summary_cache.summarize_between, start, end)
+        undo_one(start)
+        edit = timed(summary_cache.summarize_between, start, end)
+        print(f"  {name:>9} {logs:>9.1f} {cold:>9.1f} {warm:>9.1f} {edit:>9.1f}")
+
+    start, end = RANGES["365 days"]
+    csv_ms = timed(lambda: sum(len(c) for c in report_utils.iter_report_csv(start, end)))
+    print(f"  365-day report CSV, blocks warm: {csv_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
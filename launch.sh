@@ -53,7 +53,12 @@ source /home/alarm/miniconda3/bin/activate foodlog
 export PYTHONPATH=/home/alarm/weighit/src:$PYTHONPATH
 
 # Performance tuning environment variables for PineTab2
-# WEIGHIT_WEIGHT_UPDATE_INTERVAL: How often weight display updates (in seconds)
+# WEIGHIT_WEIGHT_PUSH: Push weight changes to the browser (Server-Sent Events
+#   on WEIGHIT_WEIGHT_STREAM_PORT). Set to 0 to fall back to polling.
+export WEIGHIT_WEIGHT_PUSH="${WEIGHIT_WEIGHT_PUSH:-1}"
+export WEIGHIT_WEIGHT_STREAM_PORT="${WEIGHIT_WEIGHT_STREAM_PORT:-8502}"
+
+# WEIGHIT_WEIGHT_UPDATE_INTERVAL: How often weight display updates when polling (in seconds)
 #   - Set to 3 for moderate performance (default)
 #   - Set to 5 for better performance
 #   - Set to 0 to disable auto-update entirely (best performance)
@@ -63,19 +68,28 @@ export WEIGHIT_WEIGHT_UPDATE_INTERVAL="${WEIGHIT_WEIGHT_UPDATE_INTERVAL:-3}"
 #   - Higher = better performance, slightly less fresh data
 export WEIGHIT_CACHE_TTL="${WEIGHIT_CACHE_TTL:-5.0}"
 
+# WEIGHIT_IDLE_AFTER: Seconds of zero weight and no activity before the scale
+#   reader and weight display drop to a low-power cadence (0 = never)
+export WEIGHIT_IDLE_AFTER="${WEIGHIT_IDLE_AFTER:-600}"
+
 # Change to weighit directory
 cd /home/alarm/weighit
 
-# Start Streamlit with performance flags
-streamlit run src/weigh/app.py \
+# Prewarm (open scale, warm database, render logos) in the server process,
+# then start Streamlit with performance flags. Step timings go to the console.
+python -m weigh.prewarm --serve \
   --server.port=8501 \
   --server.headless=true \
   --server.runOnSave=false \
   --server.fileWatcherType=none \
+  --server.enableStaticServing=true \
   --browser.gatherUsageStats=false &
 
-# Wait for Streamlit to be ready (you can adjust this timing)
-sleep 3
+# Wait for Streamlit to be ready (prewarm runs first, so poll instead of a fixed sleep)
+for _ in $(seq 1 60); do
+    curl -sf http://localhost:8501/_stcore/health > /dev/null && break
+    sleep 0.5
+done
 
 # Launch browser based on selection
 case $BROWSER in
@@ -25,7 +25,7 @@ setup(
     ],
     python_requires=">=3.12",
     install_requires=[
-        "streamlit>=1.31.0",
+        "streamlit>=1.57.0",
         "pillow>=10.0.0",
         "hidapi>=0.14.0",
         "click>=8.1.0",
@@ -35,6 +35,13 @@ setup(
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
         ],
+        "lite": [
+            "uvicorn>=0.20.0",
+        ],
+        "export": [
+            "numpy>=1.24.0",
+            "pyarrow>=14.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -44,8 +51,12 @@ setup(
     package_data={
         "weigh": [
             "schema.sql",
+            "change_feed.sql",
+            "summary_cache.sql",
+            "outbox.sql",
             "assets/*.png",
             "assets/*.css",
+            "assets/*.js",
         ],
     },
     include_package_data=True,
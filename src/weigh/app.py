@@ -1,6 +1,8 @@
 # src/weigh/app.py
 from __future__ import annotations
 
+import base64
+import json
 import os
 import signal
 import time
@@ -8,12 +10,15 @@ import textwrap
 from datetime import datetime, date, timezone
 from pathlib import Path
 from typing import List, Optional
+from urllib.parse import quote
 
 import streamlit as st
 import streamlit.components.v1 as components
-from PIL import Image
 import logging
 
+# Start of this script run (see WEIGHIT_PROFILE_RERUNS)
+_script_started = time.perf_counter()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,17 +35,35 @@ if str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
 
 try:
-    from weigh import logger_core, report_utils, db_backend, scale_backend, system_time
+    from weigh import logger_core, db_backend, batch_weigh, entry_flow, history, weight_stream, profiling, asset_pipeline, quick_entry, runtime, stations
+    from weigh.lazy_imports import lazy_import
+    # Admin-only / background modules load on first use (WEIGHIT_LAZY_IMPORTS)
+    report_utils = lazy_import("weigh.report_utils")
+    system_time = lazy_import("weigh.system_time")
+    outbox = lazy_import("weigh.outbox")
 except ImportError:
     # Fallback for direct execution from weigh directory
+    import asset_pipeline
+    import batch_weigh
+    import entry_flow
+    import history
+    import profiling
+    import quick_entry
+    import runtime
+    import stations
+    import weight_stream
     import logger_core
-    import report_utils
     import db_backend
-    import scale_backend
-    import system_time
+    from lazy_imports import lazy_import
+    report_utils = lazy_import("report_utils")
+    system_time = lazy_import("system_time")
+    outbox = lazy_import("outbox")
 
 ASSETS_DIR = Path(__file__).parent / "assets"
 STYLE_CSS = ASSETS_DIR / "style.css"
+KIOSK_JS = ASSETS_DIR / "kiosk.js"
+KEYPAD_JS = ASSETS_DIR / "keypad.js"
+KEYPAD_CSS = ASSETS_DIR / "keypad.css"
 PANTRY_LOGO = ASSETS_DIR / "slfp_logo.png"
 SCALE_LOGO = ASSETS_DIR / "scale_icon.png"
 
@@ -49,6 +72,16 @@ SCALE_LOGO = ASSETS_DIR / "scale_icon.png"
 # Set to 0 to disable auto-updates entirely (weight only updates on button click)
 WEIGHT_UPDATE_INTERVAL = float(os.getenv("WEIGHIT_WEIGHT_UPDATE_INTERVAL", "3"))  # Default: 3 seconds
 CACHE_TTL = float(os.getenv("WEIGHIT_CACHE_TTL", "5.0"))  # Default: 5 seconds
+# Refresh rate of the running total while a batch weigh session is active
+BATCH_UPDATE_INTERVAL = float(os.getenv("WEIGHIT_BATCH_UPDATE_INTERVAL", "1"))  # Default: 1 second
+# How often a pending entry's database write is checked (see pending_writes_watch)
+PENDING_POLL_INTERVAL = float(os.getenv("WEIGHIT_PENDING_POLL_INTERVAL", "0.5"))  # Default: 0.5 seconds
+# Touch keypad for temperatures / manual weight (0 = st.number_input fields)
+try:
+    import streamlit.components.v2 as components_v2
+except ImportError:  # Streamlit without custom components v2
+    components_v2 = None
+KEYPAD = os.getenv("WEIGHIT_KEYPAD", "1") == "1" and components_v2 is not None
 
 # ---------------- Streamlit page config ----------------
 st.set_page_config(
@@ -60,16 +93,21 @@ st.set_page_config(
 # ---------------- helpers ----------------
 
 @st.cache_resource
-def load_css(css_path: Path):
-    """Load CSS once and cache it"""
-    if css_path.exists():
-        with open(css_path) as f:
-            return f"<style>{f.read()}</style>"
-    return ""
-
-@st.cache_resource
-def get_scale() -> "scale_backend.DymoHIDScale":
-    return scale_backend.DymoHIDScale()
+def read_asset(path: Path) -> str:
+    """Asset text for inline delivery (static serving off)"""
+    return path.read_text() if path.exists() else ""
+
+# Process-wide resources (created by `weigh prewarm` or the first session)
+get_idle_governor = runtime.get_idle_governor
+get_scale = runtime.get_scale
+get_weight_stream = runtime.get_weight_stream
+get_time_monitor = runtime.get_time_monitor
+get_entry_writer = runtime.get_entry_writer
+get_outbox_worker = runtime.get_outbox_worker
+
+def station_scale():
+    """Scale of this session's station (see stations.py)"""
+    return get_scale(st.session_state.station.scale)
 
 @st.cache_data(ttl=60.0)
 def get_sources() -> List[str]:
@@ -89,10 +127,11 @@ def get_types() -> List[dict]:
     return sorted(types_list, key=lambda x: x["sort_order"])
 
 @st.cache_data(ttl=CACHE_TTL)
-def get_daily_totals_line(source: Optional[str], view_date: Optional[str]) -> str:
+def get_daily_totals(source: Optional[str], view_date: Optional[str]) -> dict:
     """Cache totals to reduce DB queries (configurable via WEIGHIT_CACHE_TTL)"""
-    totals = db_backend.get_daily_totals(source=source, date=view_date)
+    return db_backend.get_daily_totals(source=source, date=view_date)
 
+def totals_line(totals: dict) -> str:
     # Get all types to show them all (even if 0.0)
     all_types = get_types()
 
@@ -105,87 +144,32 @@ def get_daily_totals_line(source: Optional[str], view_date: Optional[str]) -> st
 
     return " | ".join(parts)
 
-@st.cache_data(ttl=CACHE_TTL)
-def get_history_html(source: Optional[str], view_date: Optional[str], has_pending: bool) -> str:
-    """Cache history table to reduce DB queries (configurable via WEIGHIT_CACHE_TTL)"""
-    limit = 15
-
-    rows_html = ""
-
-    # Check if we have a pending manual entry
-    pending_entry = st.session_state.get("pending_manual_entry", None) if has_pending else None
-    
-    # 0. If pending manual entry, add indicator row at top
-    if pending_entry:
-        type_info = pending_entry["type_info"]
-        source = pending_entry["source"]
-        
-        # Current timestamp
-        ts_str = datetime.now().strftime("%m/%d %H:%M")
-        
-        # Indicator row (no input field, just shows what's being entered)
-        rows_html += (
-            f'<tr style="background-color: #fffacd;">'
-            f'<td>{ts_str}</td>'
-            f'<td>{source}</td>'
-            f'<td>{type_info["name"]}</td>'
-            f'<td style="color: #888;">—</td>'
-            f'<td style="color: #888;">Pending...</td>'
-            f'</tr>'
-        )
-    
-    entries = logger_core.get_recent_entries(limit, source=source, date=view_date)
-    
-    # 1. Render actual data rows
-    for row in entries:
-        try:
-            dt = datetime.fromisoformat(row["timestamp"]).astimezone()
-            ts_str = dt.strftime("%m/%d %H:%M")
-        except Exception:
-            ts_str = row["timestamp"]
-
-        # Add temperature info if present
-        temp_info = ""
-        if row.get("temp_pickup_f") is not None or row.get("temp_dropoff_f") is not None:
-            temps = []
-            if row.get("temp_pickup_f") is not None:
-                temps.append(f"Pick:{row['temp_pickup_f']:.1f}°F")
-            if row.get("temp_dropoff_f") is not None:
-                temps.append(f"Drop:{row['temp_dropoff_f']:.1f}°F")
-            temp_info = f" ({', '.join(temps)})"
-
-        rows_html += (
-            f"<tr>"
-            f"<td>{ts_str}</td>"
-            f"<td>{row['source']}</td>"
-            f"<td>{row['type']}{temp_info}</td>"
-            f"<td>{row['weight_lb']:.2f} lb</td>"
-            f"<td>Logged</td>"
-            f"</tr>"
-        )
-    
-    # 2. Render blank filler rows to maintain constant height
-    # Adjust for pending entry row if present
-    actual_rows = len(entries) + (1 if pending_entry else 0)
-    slots_needed = limit - actual_rows
-    if slots_needed > 0:
-        blank_row = "<tr><td>&nbsp;</td><td></td><td></td><td></td><td></td></tr>"
-        rows_html += blank_row * slots_needed
-
-    return (
-        f'<table class="history-table">'
-        f'<thead><tr><th>Date/Time</th><th>Source</th><th>Type</th><th>Weight</th><th>Action</th></tr></thead>'
-        f'<tbody>{rows_html}</tbody>'
-        f'</table>'
-    )
-
-def load_logo(path: Path, height_px: int = 100) -> Optional[Image.Image]:
-    if not path.exists():
-        return None
-    img = Image.open(path).convert("RGBA")
-    w, h = img.size
-    scale = height_px / float(h)
-    return img.resize((int(w * scale), height_px), Image.LANCZOS)
+# This session's entries whose write has not been confirmed / has failed
+PENDING_ROW_STYLE = "background-color: #fffacd;"
+FAILED_ROW_STYLE = "background-color: #ffe4e1; color: #b00020;"
+
+def write_row_html(write: "entry_flow.PendingWrite", action: str, style: str) -> str:
+    entry = write.entry
+    return history.row_html(write.timestamp.astimezone().strftime("%m/%d %H:%M"), entry.source,
+                            entry.type_name, entry.weight_lb, entry.temp_pickup_f,
+                            entry.temp_dropoff_f, action, style)
+
+def show_logo(path: Path, height_px: int = 100, css_class: str = "logo"):
+    """
+    Show a logo pre-rendered at height_px by asset_pipeline: as a static URL
+    the browser caches when static serving is on, else inlined from the
+    cached PNG bytes (st.image would import PIL on the first render).
+    """
+    url = None
+    if st.get_option("server.enableStaticServing"):
+        url = asset_pipeline.image_url(path, height_px)
+    if not url:
+        data = asset_pipeline.image_bytes(path, height_px)
+        if not data:
+            return
+        url = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+    st.markdown(f'<img class="{css_class}" src="{url}" height="{height_px}">',
+                unsafe_allow_html=True)
 
 def chunk_types(types: List[dict]) -> List[List[dict]]:
     if len(types) == 0: return []
@@ -193,39 +177,171 @@ def chunk_types(types: List[dict]) -> List[List[dict]]:
     mid = (len(types) + 1) // 2
     return [types[:mid], types[mid:]]
 
-if WEIGHT_UPDATE_INTERVAL > 0:
-    @st.fragment(run_every=f"{WEIGHT_UPDATE_INTERVAL}s")
-    def display_weight():
-        """Auto-updating weight display (configurable via WEIGHIT_WEIGHT_UPDATE_INTERVAL)"""
-        try:
-            scale = get_scale()
+def render_weight_box():
+    """Weight box contents (runs as a fragment when auto-refresh is enabled)"""
+    governor = get_idle_governor()
+    governor.record_wakeup("display")
+    try:
+        scale = station_scale()
+        reading = scale.get_latest()
+
+        # Single retry only - the scale thread is continuously reading
+        if reading is None:
+            time.sleep(0.05)
             reading = scale.get_latest()
 
-            # Single retry only - the scale thread is continuously reading
-            if reading is None:
-                time.sleep(0.05)
-                reading = scale.get_latest()
+        weight_str = weight_stream.format_weight(reading)
+    except Exception as e:
+        weight_str = "Err"
+        logging.error(f"Scale error in weight display: {type(e).__name__}: {e}")
 
-            weight_str = f"{reading.value:.1f} lbs" if reading and reading.unit == "lb" else "—"
-        except Exception as e:
-            weight_str = "Err"
-            logging.error(f"Scale error in fragment: {type(e).__name__}: {e}")
-
-        # This markdown will update without redrawing the whole app
-        st.markdown(f'<div class="weight-box">{weight_str}</div>', unsafe_allow_html=True)
-else:
-    # No auto-update - display static weight (updates only on button clicks)
-    def display_weight():
-        """Static weight display - no auto-refresh for better performance"""
+    # This markdown will update without redrawing the whole app
+    st.markdown(f'<div class="weight-box">{weight_str}</div>', unsafe_allow_html=True)
+
+    # Idle governor changed state since this fragment was set up: rebuild it
+    # with the new cadence (flagged so it doesn't count as volunteer activity)
+    interval = governor.display_interval(WEIGHT_UPDATE_INTERVAL)
+    if interval != st.session_state.get("weight_interval", interval):
+        st.session_state.idle_switch = True
+        st.rerun(scope="app")
+
+# Opens one EventSource in the parent window (so it survives iframe re-creation)
+# and writes every pushed weight into the .live-weight box
+WEIGHT_STREAM_JS = """
+<script>
+(function() {
+    const win = window.parent;
+    if (win.__weighitWeightStream) return;
+    const url = win.location.protocol + '//' + win.location.hostname + ':__PORT__/weight__QUERY__';
+    const es = new win.EventSource(url);
+    es.onmessage = function(e) {
+        const text = JSON.parse(e.data).text;
+        win.document.querySelectorAll('.live-weight').forEach(function(el) {
+            el.textContent = text;
+        });
+    };
+    win.__weighitWeightStream = es;
+})();
+</script>
+"""
+
+def display_weight():
+    """
+    Weight display.
+
+    By default the weight is pushed from the scale over Server-Sent Events
+    (WEIGHIT_WEIGHT_PUSH=1), so nothing reruns while the weight is static.
+    Otherwise it auto-refreshes every WEIGHIT_WEIGHT_UPDATE_INTERVAL seconds
+    (0 = static, updates only on button clicks), slowed down to
+    WEIGHIT_IDLE_WEIGHT_UPDATE_INTERVAL while the idle governor is idle.
+    Only the pushed display wakes at once: a polling one sees a load placed
+    while idle on its next idle refresh (or the next click).
+    """
+    if weight_stream.WEIGHT_PUSH:
+        scale_path = st.session_state.station.scale
         try:
-            scale = get_scale()
-            reading = scale.get_latest()
-            weight_str = f"{reading.value:.1f} lbs" if reading and reading.unit == "lb" else "—"
+            server = get_weight_stream(scale_path)
         except Exception as e:
-            weight_str = "Err"
-            logging.error(f"Scale error: {type(e).__name__}: {e}")
+            server = None
+            logging.error(f"Weight stream error: {type(e).__name__}: {e}")
+        if server is not None:
+            text, _ = server.broadcasters[scale_path or ""].current()
+            query = f"?scale={quote(scale_path)}" if scale_path else ""
+            st.markdown(f'<div class="weight-box live-weight">{text}</div>', unsafe_allow_html=True)
+            components.html(WEIGHT_STREAM_JS.replace("__PORT__", str(server.port))
+                            .replace("__QUERY__", query), height=0, width=0)
+            return
+
+    interval = get_idle_governor().display_interval(WEIGHT_UPDATE_INTERVAL)
+    st.session_state.weight_interval = interval
+    if interval > 0:
+        st.fragment(render_weight_box, run_every=interval)()
+    else:
+        render_weight_box()
+
+def invalidate_entry_caches():
+    """Drop cached totals after this session changed the logs (history follows log_changes)"""
+    get_daily_totals.clear()
+
+def start_batch_session():
+    """
+    Attach a new batch weigh accumulator to the scale reader thread. The
+    scale holds it weakly, so a session closed with a batch open does not
+    keep it fed.
+    """
+    session = batch_weigh.BatchWeighSession()
+    try:
+        station_scale().add_listener(session.feed, weak=True)
+    except Exception as e:
+        logging.error(f"Scale error starting batch: {type(e).__name__}: {e}")
+    st.session_state.batch_session = session
+
+def stop_batch_session():
+    session = st.session_state.get("batch_session")
+    if session is not None:
+        try:
+            station_scale().remove_listener(session.feed)
+        except Exception:
+            pass
+    st.session_state.batch_session = None
+
+@st.fragment(run_every=BATCH_UPDATE_INTERVAL)
+def batch_weigh_panel(types: List[dict]):
+    """Running total of a batch weigh session (reruns on its own, not the whole page)"""
+    session = st.session_state.get("batch_session")
+    if session is None:
+        return
 
-        st.markdown(f'<div class="weight-box">{weight_str}</div>', unsafe_allow_html=True)
+    placements = session.placements
+    pending = session.pending
+    summary = f"Batch: {len(placements)} item(s) — {session.total:.1f} lbs"
+    if pending is not None:
+        summary += f" (on scale: {pending:.1f} lbs, lift to add)"
+    st.markdown(f'<div class="totals-box">{summary}</div>', unsafe_allow_html=True)
+
+    type_names = [t["name"] for t in types]
+    c_type, c_one, c_each, c_undo, c_end = st.columns([2, 2, 2, 1, 1], gap="small")
+    with c_type:
+        type_name = st.selectbox("Batch type", type_names, key="batch_type",
+                                 label_visibility="collapsed")
+    type_info = next((t for t in types if t["name"] == type_name), None)
+
+    temp_pickup = temp_dropoff = None
+    if type_info and type_info["requires_temp"]:
+        c_pick, c_drop = st.columns(2)
+        with c_pick:
+            temp_pickup = st.number_input("Pickup Temperature (°F)", min_value=-40.0,
+                                          max_value=200.0, value=40.0, step=1.0,
+                                          format="%.1f", key="batch_temp_pickup")
+        with c_drop:
+            temp_dropoff = st.number_input("Dropoff Temperature (°F)", min_value=-40.0,
+                                           max_value=200.0, value=38.0, step=1.0,
+                                           format="%.1f", key="batch_temp_dropoff")
+
+    def commit(split: bool):
+        session.commit(st.session_state.source, type_name, split=split,
+                       temp_pickup_f=temp_pickup, temp_dropoff_f=temp_dropoff,
+                       station=st.session_state.station.name)
+        invalidate_entry_caches()
+        # Totals and history live outside this fragment
+        st.rerun(scope="app")
+
+    with c_one:
+        if st.button("Log as One Entry", use_container_width=True, key="batch_commit_one",
+                     disabled=not placements):
+            commit(split=False)
+    with c_each:
+        if st.button("Log Each Item", use_container_width=True, key="batch_commit_each",
+                     disabled=not placements):
+            commit(split=True)
+    with c_undo:
+        st.button("↶", use_container_width=True, key="batch_remove_last",
+                  help="Remove last item", disabled=not placements,
+                  on_click=session.remove_last)
+    with c_end:
+        if st.button("✗", use_container_width=True, key="batch_end", help="End batch"):
+            stop_batch_session()
+            st.rerun(scope="app")
 
 def safe_rerun():
     if hasattr(st, "rerun"):
@@ -266,394 +382,213 @@ def cheatsheet_dialog():
     else:
         st.error("Cheat sheet not found!")
     
-    # Scroll to top of dialog
-    components.html("""
-    <script>
-    const doc = window.parent.document;
-    // Find the dialog and scroll to top
-    function scrollToTop() {
-        const dialogs = doc.querySelectorAll('[role="dialog"]');
-        if (dialogs.length > 0) {
-            const dialog = dialogs[dialogs.length - 1];
-            dialog.scrollTop = 0;
-            
-            // Also scroll any scrollable children
-            const scrollableContent = dialog.querySelector('[data-testid="stVerticalBlock"]');
-            if (scrollableContent) {
-                scrollableContent.scrollTop = 0;
-            }
-            
-            // Scroll the dialog's first child (the content container)
-            if (dialog.firstElementChild) {
-                dialog.firstElementChild.scrollTop = 0;
-            }
-        }
-    }
-    
-    // Try multiple times to ensure it works
-    setTimeout(scrollToTop, 50);
-    setTimeout(scrollToTop, 200);
-    setTimeout(scrollToTop, 500);
-    </script>
-    """, height=0, width=0)
-    
     if st.button("Close", type="primary", use_container_width=True):
         st.rerun()
 
 
-@st.dialog("Temperature Recording")
-def temperature_dialog():
-    """Modal dialog for recording temperatures"""
-    entry = st.session_state.pending_entry
-    if not entry or st.session_state.get("dialog_processed", False):
-        st.session_state.show_temp_dialog = False
-        st.session_state.dialog_processed = False
-        st.rerun()
+# ---------------- QUICK ENTRY ----------------
+# Hotkeys and scanned barcodes (see quick_entry.py) arrive from kiosk.js in
+# the hidden "quick_entry" input of the entry panel, a whole burst per
+# value, so a scan is one rerun of the panel however many keys it has.
+# Tokens wait in st.session_state.quick_queue while an entry step (e.g. the
+# temperatures of a Meat scan) is open and run once it is saved/cancelled.
+
+def select_source(name: str):
+    st.session_state.source = name
+    st.session_state.donor_select_main = name
+    # The donor is shown by the header: entry_panel reruns the app once
+    st.session_state.quick_source_changed = True
+
+def run_quick_entries():
+    queue = st.session_state.quick_queue
+    if not queue:
         return
-    
-    type_name = entry["type"]
-    weight = entry["weight"]
-    source = entry["source"]
-    
-    st.write(f"Recording temperatures for **{type_name}**")
-    st.write(f"Weight: **{weight:.2f} lb** from **{source}**")
-    
-    st.divider()
-    
-    # Temperature inputs with number_input for better mobile experience
-    temp_pickup = st.number_input(
+    flow = get_entry_flow()
+    types = {t["name"]: t for t in get_types()}
+    resolver = quick_entry.get_quick_entry(get_sources(), list(types))
+    while queue:
+        action = resolver.resolve(queue[0])
+        if action is not None and flow.active and action.kind != quick_entry.CANCEL:
+            break
+        token = queue.pop(0)
+        if action is None:
+            st.session_state.quick_unknown = token.partition(":")[2]
+        elif action.kind == quick_entry.LOG:
+            on_log(types[action.value])
+        elif action.kind == quick_entry.SOURCE:
+            select_source(action.value)
+        elif action.kind == quick_entry.UNDO:
+            undo_entry()
+        elif action.kind == quick_entry.REDO:
+            redo_entry()
+        elif action.kind == quick_entry.CANCEL:
+            flow.cancel()
+
+def on_quick_entry():
+    st.session_state.quick_queue.extend(quick_entry.split_batch(st.session_state.quick_entry))
+    # Empty again: kiosk.js sends the next batch once it sees the input cleared
+    st.session_state.quick_entry = ""
+    run_quick_entries()
+
+def quick_entry_input():
+    st.text_input("Quick entry", key="quick_entry", on_change=on_quick_entry,
+                  label_visibility="collapsed")
+    if st.session_state.pop("quick_source_changed", False):
+        st.rerun(scope="app")
+    unknown = st.session_state.pop("quick_unknown", None)
+    if unknown:
+        st.warning(f"Unknown code: {unknown}")
+
+
+# ---------------- ENTRY FLOW ----------------
+# One entry is made through st.session_state.entry_flow (see entry_flow.py).
+# Its steps are drawn inline by entry_panel as a modal card, and every button
+# moves the flow in its on_click callback, so each action is one rerun of
+# the entry panel (an st.dialog needs an extra full rerun to close).
+# Complete entries are written by the background writer; entry_panel shows
+# them as pending right away and pending_writes_watch reconciles them once
+# the write has finished.
+
+def get_entry_flow() -> "entry_flow.EntryFlow":
+    return st.session_state.entry_flow
+
+def log_flow_entry(entry: Optional["entry_flow.Entry"]):
+    if entry is not None:
+        get_entry_flow().track(get_entry_writer().submit(entry))
+
+def save_flow_entry():
+    flow = get_entry_flow()
+    serial = flow.serial
+    log_flow_entry(flow.save(
+        weight_lb=st.session_state.get(f"manual_weight_input_{serial}"),
+        temp_pickup_f=st.session_state.get(f"temp_pickup_input_{serial}"),
+        temp_dropoff_f=st.session_state.get(f"temp_dropoff_input_{serial}"),
+    ))
+    run_quick_entries()
+
+def cancel_flow_entry():
+    get_entry_flow().cancel()
+    run_quick_entries()
+
+def save_keypad_entry():
+    flow = get_entry_flow()
+    values = st.session_state[f"entry_keypad_{flow.serial}"]["submit"] or {}
+    log_flow_entry(flow.save(
+        weight_lb=values.get("weight"),
+        temp_pickup_f=values.get("temp_pickup"),
+        temp_dropoff_f=values.get("temp_dropoff"),
+    ))
+    run_quick_entries()
+
+def keypad_fields(flow: "entry_flow.EntryFlow") -> List[dict]:
+    fields = []
+    if flow.step == entry_flow.MANUAL:
+        fields.append({"name": "weight", "label": "Weight (lbs)", "value": 0.0,
+                       "min": 0.0, "max": 500.0, "decimals": 1})
+    if flow.requires_temp:
+        fields.append({"name": "temp_pickup", "label": "Pickup Temperature (°F)",
+                       "value": entry_flow.DEFAULT_TEMP_PICKUP_F, "min": -40.0, "max": 200.0, "decimals": 1})
+        fields.append({"name": "temp_dropoff", "label": "Dropoff Temperature (°F)",
+                       "value": entry_flow.DEFAULT_TEMP_DROPOFF_F, "min": -40.0, "max": 200.0, "decimals": 1})
+    return fields
+
+def entry_keypad(flow: "entry_flow.EntryFlow"):
+    """
+    The card's inputs and Save/Cancel as one keypad component (keypad.js):
+    typing and validation stay in the browser, Save is the only rerun.
+    """
+    if flow.error:
+        st.error(flow.error)
+    keypad = components_v2.component("entry_keypad", html='<div class="keypad"></div>',
+                                     css=read_asset(KEYPAD_CSS), js=read_asset(KEYPAD_JS))
+    keypad(key=f"entry_keypad_{flow.serial}", data={"fields": keypad_fields(flow)},
+           on_submit_change=save_keypad_entry, on_cancel_change=cancel_flow_entry)
+
+def temperature_inputs(serial: int):
+    st.number_input(
         "Pickup Temperature (°F)",
         min_value=-40.0,
         max_value=200.0,
-        value=40.0,
+        value=entry_flow.DEFAULT_TEMP_PICKUP_F,
         step=1.0,
         format="%.1f",
         help="Temperature at pickup location",
-        key="temp_pickup_input"
+        key=f"temp_pickup_input_{serial}"
     )
-    
-    temp_dropoff = st.number_input(
+    st.number_input(
         "Dropoff Temperature (°F)",
         min_value=-40.0,
         max_value=200.0,
-        value=38.0,
+        value=entry_flow.DEFAULT_TEMP_DROPOFF_F,
         step=1.0,
         format="%.1f",
         help="Temperature at dropoff/storage location",
-        key="temp_dropoff_input"
+        key=f"temp_dropoff_input_{serial}"
     )
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("Cancel", use_container_width=True, key="cancel_temp"):
-            st.session_state.show_temp_dialog = False
-            st.session_state.pending_entry = None
-            st.session_state.dialog_processed = True
-            st.rerun()
-    
-    with col2:
-        if st.button("Save Entry", type="primary", use_container_width=True, key="save_temp"):
-            # Log the entry with temperatures
-            logger_core.log_entry(
-                weight, 
-                source, 
-                type_name,
-                temp_pickup_f=temp_pickup,
-                temp_dropoff_f=temp_dropoff
-            )
-            
-            # Mark as processed and clear
-            st.session_state.dialog_processed = True
-            st.session_state.show_temp_dialog = False
-            st.session_state.pending_entry = None
-            
-            # Force dialog to close
-            st.rerun()
-
-    # Inject JS for input behavior (Select All on Focus + Input Validation + Enter Key + Auto-select first input)
-    # We use a MutationObserver to attach listeners to the number inputs in the dialog
-    components.html("""
-    <script>
-    const doc = window.parent.document;
-
-    function attachListeners() {
-        // Target the specific number inputs by their aria-labels or just all number inputs in the dialog
-        // Streamlit number inputs are usually <input type="number"> or <input type="text" inputmode="decimal">
-        const inputs = Array.from(doc.querySelectorAll('input[type="number"], input[inputmode="decimal"]'));
-
-        if (inputs.length === 0) return;
-
-        inputs.forEach(input => {
-            if (input.dataset.listenersAttached) return;
-
-            // Helper to select text
-            const selectText = () => {
-                input.select();
-            };
-
-            // 1. Select All on Focus
-            input.addEventListener('focus', function(e) {
-                // Small timeout to ensure browser default behavior doesn't override us
-                setTimeout(selectText, 50);
-            });
-
-            // Handle click/touch specifically (fixes selection clearing on mobile)
-            input.addEventListener('mouseup', function(e) {
-                // Prevent default to stop browser from clearing selection
-                e.preventDefault();
-                setTimeout(selectText, 50);
-            });
-
-            // 2. Strict Input Validation (Digits, one dot, one minus at start)
-            input.addEventListener('input', function(e) {
-                let val = this.value;
-
-                // Allow: digits, dot, minus
-                const clean = val.replace(/[^0-9.-]/g, '');
-
-                // Handle multiple dots: keep only the first
-                const parts = clean.split('.');
-                let final = parts[0];
-                if (parts.length > 1) {
-                    final += '.' + parts.slice(1).join('');
-                }
-
-                // Handle minus: only allowed at start
-                if (final.indexOf('-') > 0) {
-                    final = final.replace(/-/g, '');
-                }
-
-                if (val !== final) {
-                    this.value = final;
-                }
-            });
-
-            // 3. Enter key submits the form (clicks Save Entry button)
-            input.addEventListener('keydown', function(e) {
-                if (e.key === 'Enter') {
-                    e.preventDefault();
-                    const buttons = Array.from(doc.querySelectorAll('button'));
-                    const saveBtn = buttons.find(el => el.innerText.includes("Save Entry"));
-                    if (saveBtn) {
-                        saveBtn.click();
-                    }
-                }
-            });
-
-            input.dataset.listenersAttached = 'true';
-        });
-
-        // Auto-select first input (pickup temp) when dialog opens
-        if (inputs.length > 0 && !inputs[0].dataset.autoSelected) {
-            inputs[0].focus();
-            setTimeout(() => inputs[0].select(), 100);
-            inputs[0].dataset.autoSelected = 'true';
-        }
-    }
-
-    // Observe changes to detect when dialog opens
-    const observer = new MutationObserver(() => {
-        attachListeners();
-    });
-
-    observer.observe(doc.body, { childList: true, subtree: true });
-
-    // Initial run and retry to ensure it catches the dialog
-    setTimeout(attachListeners, 100);
-    setTimeout(attachListeners, 300);
-    setTimeout(attachListeners, 500);
-    </script>
-    """, height=0, width=0)
 
-
-@st.dialog("⚖️ Manual Weight Entry")
-def manual_weight_entry_dialog():
-    """Modal dialog for manually entering weight when scale is not available"""
-    type_info = st.session_state.manual_entry_type_info
-    if not type_info or st.session_state.get("manual_dialog_processed", False):
-        st.session_state.show_manual_entry_dialog = False
-        st.session_state.manual_dialog_processed = False
-        st.rerun()
-        return
-    
-    type_name = type_info["name"]
-    requires_temp = type_info["requires_temp"]
-    source = st.session_state.source
-    
-    st.warning("**Scale not readable** - Please enter weight manually")
-    st.write(f"Recording **{type_name}** from **{source}**")
-    
-    st.divider()
-    
-    # Weight input
-    manual_weight = st.number_input(
-        "Weight (lbs)",
-        min_value=0.0,
-        max_value=500.0,
-        value=0.0,
-        step=0.1,
-        format="%.1f",
-        help="Enter the weight in pounds",
-        key="manual_weight_input"
-    )
-    
-    # Temperature inputs if required
-    temp_pickup = None
-    temp_dropoff = None
-    
-    if requires_temp:
-        st.divider()
-        st.write("**Temperature Recording**")
-        
-        temp_pickup = st.number_input(
-            "Pickup Temperature (°F)",
-            min_value=-40.0,
-            max_value=200.0,
-            value=40.0,
-            step=1.0,
-            format="%.1f",
-            help="Temperature at pickup location",
-            key="manual_temp_pickup_input"
-        )
-        
-        temp_dropoff = st.number_input(
-            "Dropoff Temperature (°F)",
-            min_value=-40.0,
-            max_value=200.0,
-            value=38.0,
-            step=1.0,
-            format="%.1f",
-            help="Temperature at dropoff/storage location",
-            key="manual_temp_dropoff_input"
-        )
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("Cancel", use_container_width=True, key="cancel_manual"):
-            st.session_state.show_manual_entry_dialog = False
-            st.session_state.manual_entry_type_info = None
-            st.session_state.manual_dialog_processed = True
-            st.rerun()
-    
-    with col2:
-        if st.button("Save Entry", type="primary", use_container_width=True, key="save_manual"):
-            if manual_weight > 0:
-                # Log the entry with or without temperatures
-                if requires_temp:
-                    logger_core.log_entry(
-                        manual_weight,
-                        source,
-                        type_name,
-                        temp_pickup_f=temp_pickup,
-                        temp_dropoff_f=temp_dropoff
-                    )
-                else:
-                    logger_core.log_entry(manual_weight, source, type_name)
-                
-                # Mark as processed and clear
-                st.session_state.manual_dialog_processed = True
-                st.session_state.show_manual_entry_dialog = False
-                st.session_state.manual_entry_type_info = None
-                st.rerun()
+def entry_flow_card(flow: "entry_flow.EntryFlow"):
+    """Temperature / manual weight step of the current entry (modal card)"""
+    with st.container(key="entry_flow"):
+        with st.container(border=True, key="entry_flow_card"):
+            if flow.step == entry_flow.TEMPERATURE:
+                st.subheader("Temperature Recording")
+                st.write(f"Recording temperatures for **{flow.type_name}**")
+                st.write(f"Weight: **{flow.weight_lb:.2f} lb** from **{flow.source}**")
+                st.divider()
+                if KEYPAD:
+                    entry_keypad(flow)
+                    return
+                temperature_inputs(flow.serial)
+                save_key = "save_temp"
             else:
-                st.error("Please enter a weight greater than 0")
-
-    # Inject JS for input behavior (Select All on Focus + Enter Key + Auto-select first input)
-    components.html("""
-    <script>
-    const doc = window.parent.document;
-
-    function attachListeners() {
-        const inputs = Array.from(doc.querySelectorAll('input[type="number"], input[inputmode="decimal"]'));
-
-        if (inputs.length === 0) return;
-
-        inputs.forEach(input => {
-            if (input.dataset.listenersAttached) return;
-
-            const selectText = () => {
-                input.select();
-            };
-
-            // Select All on Focus
-            input.addEventListener('focus', function(e) {
-                setTimeout(selectText, 50);
-            });
-
-            input.addEventListener('mouseup', function(e) {
-                e.preventDefault();
-                setTimeout(selectText, 50);
-            });
-
-            // Input Validation
-            input.addEventListener('input', function(e) {
-                let val = this.value;
-                const clean = val.replace(/[^0-9.-]/g, '');
-                const parts = clean.split('.');
-                let final = parts[0];
-                if (parts.length > 1) {
-                    final += '.' + parts.slice(1).join('');
-                }
-                if (final.indexOf('-') > 0) {
-                    final = final.replace(/-/g, '');
-                }
-                if (val !== final) {
-                    this.value = final;
-                }
-            });
-
-            // Enter key submits
-            input.addEventListener('keydown', function(e) {
-                if (e.key === 'Enter') {
-                    e.preventDefault();
-                    const buttons = Array.from(doc.querySelectorAll('button'));
-                    const saveBtn = buttons.find(el => el.innerText.includes("Save Entry"));
-                    if (saveBtn) {
-                        saveBtn.click();
-                    }
-                }
-            });
-
-            input.dataset.listenersAttached = 'true';
-        });
-
-        // Auto-select first input (weight) when dialog opens
-        if (inputs.length > 0 && !inputs[0].dataset.autoSelected) {
-            inputs[0].focus();
-            setTimeout(() => inputs[0].select(), 100);
-            inputs[0].dataset.autoSelected = 'true';
-        }
-    }
+                st.subheader("Manual Weight Entry")
+                st.warning("**Scale not readable** - Please enter weight manually")
+                st.write(f"Recording **{flow.type_name}** from **{flow.source}**")
+                st.divider()
+                if KEYPAD:
+                    entry_keypad(flow)
+                    return
+                st.number_input(
+                    "Weight (lbs)",
+                    min_value=0.0,
+                    max_value=500.0,
+                    value=0.0,
+                    step=0.1,
+                    format="%.1f",
+                    help="Enter the weight in pounds",
+                    key=f"manual_weight_input_{flow.serial}"
+                )
+                if flow.requires_temp:
+                    st.divider()
+                    st.write("**Temperature Recording**")
+                    temperature_inputs(flow.serial)
+                save_key = "save_manual"
+
+            st.divider()
 
-    const observer = new MutationObserver(() => {
-        attachListeners();
-    });
-
-    observer.observe(doc.body, { childList: true, subtree: true });
-
-    setTimeout(attachListeners, 100);
-    setTimeout(attachListeners, 300);
-    setTimeout(attachListeners, 500);
-    </script>
-    """, height=0, width=0)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button("Cancel", use_container_width=True, key="cancel_entry",
+                          on_click=cancel_flow_entry)
+            with col2:
+                st.button("Save Entry", type="primary", use_container_width=True, key=save_key,
+                          on_click=save_flow_entry)
 
+            if flow.error:
+                st.error(flow.error)
 
 
 @st.dialog("🕐 Set System Date & Time", width="large")
 def datetime_setup_dialog():
     """Modal dialog for setting system date/time (automatic on startup or manual from admin)"""
 
-    # Get current time sync status
-    time_status = system_time.get_time_sync_status()
-    
+    # Get current time sync status (cached by the background monitor)
+    time_status = get_time_monitor().get_status()
+
     # Show conditional warning based on internet/NTP status
-    if not time_status["has_internet"]:
+    if time_status is None:
+        st.info("**Checking internet and NTP status...**")
+    elif not time_status["has_internet"]:
         st.warning("**No internet connection detected** - System time may be incorrect!")
     elif not time_status["ntp_synced"]:
         st.info("**Internet available but NTP not synchronized** - You can manually set the time if needed.")
@@ -711,8 +646,8 @@ def datetime_setup_dialog():
                     time.sleep(1)
                     st.session_state.time_setup_complete = True
                     st.session_state.show_time_dialog = False
-                    # Refresh time status
-                    st.session_state.time_status = system_time.get_time_sync_status()
+                    # Re-check NTP status in the background
+                    get_time_monitor().request_refresh()
                     st.rerun()
                 else:
                     st.error(f"❌ {message}")
@@ -732,78 +667,64 @@ def datetime_setup_dialog():
 
 
 # ---------------- INIT ----------------
-# Load CSS once and cache it
-css_content = load_css(STYLE_CSS)
-if css_content:
-    st.markdown(css_content, unsafe_allow_html=True)
-
-# Consolidated JavaScript injection (all UI enhancements in one place for better performance)
-components.html("""
+# Stylesheet and kiosk.js are added to the page <head> once per browser
+# session instead of being re-sent and re-run on every rerun.
+KIOSK_BOOTSTRAP_JS = """
 <script>
 (function() {
     const doc = window.parent.document;
-
-    // 1. Keyboard event listeners (Ctrl-Z / Ctrl-Y / Alt-F4 / F1)
-    doc.addEventListener('keydown', function(e) {
-        const buttons = Array.from(doc.querySelectorAll('button'));
-
-        // Ctrl+Z = Undo
-        if (e.ctrlKey && e.key.toLowerCase() === 'z') {
-            const undoBtn = buttons.find(el => el.innerText.includes("Undo Last Entry"));
-            if (undoBtn) undoBtn.click();
-        }
-        // Ctrl+Y = Redo
-        else if (e.ctrlKey && e.key.toLowerCase() === 'y') {
-            const redoBtn = buttons.find(el => el.innerText.includes("Redo Last Undo"));
-            if (redoBtn) redoBtn.click();
-        }
-        // F1 = Show Volunteer Cheat Sheet
-        else if (e.key === 'F1') {
-            e.preventDefault();
-            const cheatsheetBtn = buttons.find(el => el.innerText.includes("View Volunteer Cheat Sheet"));
-            if (cheatsheetBtn) cheatsheetBtn.click();
-        }
-        // Alt+F4 = Close Application
-        else if (e.altKey && e.key === 'F4') {
-            e.preventDefault();
-            const closeBtn = buttons.find(el => el.innerText.includes("Close Application"));
-            if (closeBtn) closeBtn.click();
-        }
-    });
-
-    // 2. Make scale image clickable for refresh
-    function makeScaleClickable() {
-        const buttons = Array.from(doc.querySelectorAll('button'));
-        const refreshBtn = buttons.find(el => el.innerText.includes("refresh_hidden"));
-
-        if (refreshBtn) {
-            refreshBtn.style.display = 'none';
-            const images = Array.from(doc.querySelectorAll('img'));
-            const scaleImg = images[images.length - 1];
-
-            if (scaleImg && !scaleImg.dataset.clickable) {
-                scaleImg.style.cursor = 'pointer';
-                scaleImg.onclick = function() { refreshBtn.click(); };
-                scaleImg.dataset.clickable = 'true';
-            }
-        }
+    function add(tag, id, props) {
+        if (doc.getElementById(id)) return;
+        const el = doc.createElement(tag);
+        el.id = id;
+        Object.assign(el, props);
+        doc.head.appendChild(el);
     }
-
-    // Run scale clickable setup
-    setTimeout(makeScaleClickable, 100);
+    __ASSETS__
 })();
 </script>
-""", height=0, width=0)
+"""
+
+def load_kiosk_assets():
+    """
+    Load style.css and kiosk.js into the page. With static serving they are
+    content-hashed static files the browser caches; otherwise their text is
+    inlined. Either way the bootstrap is sent on the first run of a session
+    only: the elements it adds stay in <head> after its iframe goes away.
+    """
+    if st.session_state.get("kiosk_assets_sent"):
+        return
+    st.session_state.kiosk_assets_sent = True
+
+    if st.get_option("server.enableStaticServing"):
+        css = asset_pipeline.publish(STYLE_CSS)
+        js = asset_pipeline.publish(KIOSK_JS)
+        css_url = asset_pipeline.static_url(css) if css else None
+        js_url = asset_pipeline.static_url(js) if js else None
+        if css_url and js_url:
+            assets = (
+                f"add('link', 'weighit-css-{css.stem}', {{rel: 'stylesheet', href: {json.dumps(css_url)}}});\n"
+                f"    add('script', 'weighit-js-{js.stem}', {{src: {json.dumps(js_url)}}});"
+            )
+            components.html(KIOSK_BOOTSTRAP_JS.replace("__ASSETS__", assets), height=0, width=0)
+            return
+
+    assets = (
+        f"add('style', 'weighit-css', {{textContent: {json.dumps(read_asset(STYLE_CSS))}}});\n"
+        f"    add('script', 'weighit-js', {{textContent: {json.dumps(read_asset(KIOSK_JS))}}});"
+    )
+    components.html(KIOSK_BOOTSTRAP_JS.replace("__ASSETS__", assets), height=0, width=0)
+
+load_kiosk_assets()
 
 # Session State Defaults
+# Station of this tablet (?station=NAME): scale, default donor and undo scope
+if "station" not in st.session_state:
+    st.session_state.station = stations.get_station(st.query_params.get("station"))
 if "last_refresh_t" not in st.session_state:
     st.session_state.last_refresh_t = 0.0
-if "show_temp_dialog" not in st.session_state:
-    st.session_state.show_temp_dialog = False
-if "pending_entry" not in st.session_state:
-    st.session_state.pending_entry = None
-if "dialog_processed" not in st.session_state:
-    st.session_state.dialog_processed = False
+if "entry_flow" not in st.session_state:
+    st.session_state.entry_flow = entry_flow.EntryFlow(station=st.session_state.station.name)
 if "show_cheatsheet" not in st.session_state:
     st.session_state.show_cheatsheet = False
 if "time_setup_complete" not in st.session_state:
@@ -814,17 +735,31 @@ if "time_status_checked" not in st.session_state:
     st.session_state.time_status_checked = False
 if "show_time_dialog" not in st.session_state:
     st.session_state.show_time_dialog = False
-if "show_manual_entry_dialog" not in st.session_state:
-    st.session_state.show_manual_entry_dialog = False
-if "manual_entry_type_info" not in st.session_state:
-    st.session_state.manual_entry_type_info = None
-if "manual_dialog_processed" not in st.session_state:
-    st.session_state.manual_dialog_processed = False
-
-# Check system time on first run
+if "admin_open" not in st.session_state:
+    st.session_state.admin_open = False
+if "quick_queue" not in st.session_state:
+    st.session_state.quick_queue = []
+
+# Every full rerun is a session connecting or a volunteer acting, except the
+# cadence switch requested by the weight display itself
+if not st.session_state.pop("idle_switch", False):
+    get_idle_governor().note_session()
+
+@st.fragment(run_every=1.0)
+def time_status_watch():
+    """Polls (only until the first time check finishes) and then reruns the app"""
+    if get_time_monitor().get_status() is not None:
+        st.rerun()
+
+# Check system time on first run (without waiting on the network: until the
+# background check has a result the UI renders and time_status_watch polls)
+time_status = None
 if not st.session_state.time_status_checked:
-    time_status = system_time.get_time_sync_status()
-    st.session_state.time_status = time_status
+    time_status = get_time_monitor().get_status()
+    if time_status is None:
+        time_status_watch()
+
+if time_status is not None:
     st.session_state.time_status_checked = True
 
     # If no internet and not NTP synced, prompt for time setup
@@ -843,13 +778,92 @@ if st.session_state.get("show_time_dialog", False):
         st.stop()  # Don't render main UI until time is set on first run
 
 
-# Sidebar
-with st.sidebar:
-    st.header("Admin")
+# Defaults shared by the admin panel and the main screen
+if "source" not in st.session_state:
+    sources = get_sources()
+    if st.session_state.station.source in sources:
+        st.session_state.source = st.session_state.station.source
+    else:
+        st.session_state.source = sources[0] if sources else "Unknown"
+if "view_date" not in st.session_state:
+    st.session_state.view_date = datetime.now(timezone.utc).date()
+
+
+# ---------------- ADMIN (sidebar) ----------------
+# Each area of the screen is a fragment: a widget inside one reruns only that
+# fragment. Actions that change what other areas show call st.rerun() (app).
+#
+# The sidebar always holds the quick actions (also bound to kiosk.js hotkeys)
+# and an "Admin Tools" button. The tools themselves (time status, view date,
+# reports, secrets, scale telemetry) are only mounted while open, so reruns
+# of the main screen don't execute them; they close again when the next
+# entry is logged.
+
+def scale_error():
+    """Scale fault line for the always-mounted sidebar (the reader is shared, so this is cheap)"""
+    try:
+        station_scale()
+    except Exception as e:
+        logging.error(f"Scale error: {type(e).__name__}: {e}")
+        st.error(f"Scale Error: {type(e).__name__}: {str(e)}")
+
+def scale_status():
+    """Scale telemetry for the admin panel (a scale that cannot be opened is shown by scale_error)"""
+    try:
+        scale = station_scale()
+    except Exception:
+        return
 
+    # Unit codes the backend could not convert to pounds
+    unknown_units = scale.get_telemetry()["unknown_unit_codes"]
+    if unknown_units:
+        codes = ", ".join(f"{code} ({n}x)" for code, n in unknown_units.items())
+        st.warning(f"Scale sent unknown unit codes: {codes}")
+
+def undo_entry():
+    get_entry_writer().flush()  # undo what the volunteer last saw logged
+    logger_core.undo_last_entry(st.session_state.station.undo_station)
+    invalidate_entry_caches()
+
+def redo_entry():
+    get_entry_writer().flush()
+    logger_core.redo_last_entry(st.session_state.station.undo_station)
+    invalidate_entry_caches()
+
+def outbox_status():
+    """Queued / failed report emails (see outbox.py)"""
+    status = outbox.get_status()
+    if status.queued:
+        when = status.next_attempt.astimezone().strftime("%H:%M:%S") if status.next_attempt else "now"
+        message = f"📤 {status.queued} email(s) waiting to be sent (next attempt {when})"
+        if status.last_error:
+            st.warning(f"{message}. Last error: {status.last_error}")
+        else:
+            st.info(message)
+    if status.failed:
+        st.error(f"✉️ {status.failed} email(s) could not be sent: {status.failed_error}")
+    if status.queued or status.failed:
+        if st.button("Retry emails now", key="outbox_retry", use_container_width=True):
+            get_outbox_worker().retry_now()
+            st.rerun(scope="fragment")
+    elif status.last_sent:
+        sent_at = datetime.fromisoformat(status.last_sent["sent_at"]).astimezone().strftime("%m/%d %H:%M")
+        st.caption(f"Last email sent {sent_at} to {status.last_sent['recipient']}")
+
+def open_admin_tools():
+    st.session_state.admin_open = True
+
+def close_admin_tools():
+    st.session_state.admin_open = False
+
+@st.fragment
+@profiling.profiled("admin_panel")
+def admin_panel():
     # Time sync status indicator
-    if "time_status" in st.session_state:
-        time_status = st.session_state.time_status
+    time_status = get_time_monitor().get_status()
+    if time_status is None:
+        st.info("🕐 Time: checking...")
+    else:
         if time_status["time_valid"]:
             if time_status["ntp_synced"]:
                 st.success("🕐 Time: NTP Synced")
@@ -863,26 +877,16 @@ with st.sidebar:
         else:
             st.error(f"❌ Time: {time_status['time_warning']}")
 
-        # Button to manually set time
-        if st.button("🕐 Set Date/Time", use_container_width=True):
-            st.session_state.show_time_dialog = True
-            st.rerun()
+    # Button to manually set time
+    if st.button("🕐 Set Date/Time", use_container_width=True):
+        st.session_state.show_time_dialog = True
+        st.rerun()
 
     st.divider()
 
-    sources = get_sources()
-
-    # Initialize source if not set (will be displayed on main screen)
-    if "source" not in st.session_state:
-        st.session_state.source = sources[0] if sources else "Unknown"
-
     # --- DATE FILTER ---
     st.subheader("View Date")
 
-    # Initialize view_date in session state if not set
-    if "view_date" not in st.session_state:
-        st.session_state.view_date = datetime.now(timezone.utc).date()
-
     selected_date = st.date_input(
         "Select date to view",
         value=st.session_state.view_date,
@@ -891,9 +895,10 @@ with st.sidebar:
         label_visibility="collapsed"
     )
 
-    # Update session state
+    # Update session state (totals and history live outside this fragment)
     if selected_date != st.session_state.view_date:
         st.session_state.view_date = selected_date
+        st.rerun()
 
     # Quick date buttons
     col1, col2 = st.columns(2)
@@ -909,26 +914,6 @@ with st.sidebar:
 
     st.divider()
 
-    # --- Undo / Redo ---
-    c_undo, c_redo = st.columns(2)
-    with c_undo:
-        if st.button("Undo Last Entry"):
-            logger_core.undo_last_entry()
-            safe_rerun()
-    with c_redo:
-        if st.button("Redo Last Undo"):
-            logger_core.redo_last_entry()
-            safe_rerun()
-
-    st.divider()
-    
-    # --- VOLUNTEER CHEAT SHEET ---
-    if st.button("📋 View Volunteer Cheat Sheet", use_container_width=True):
-        st.session_state.show_cheatsheet = True
-        st.rerun()
-    
-    st.divider()
-    
     # --- REPORTING SECTION ---
     st.subheader("Send Report")
     
@@ -943,6 +928,10 @@ with st.sidebar:
         pass
 
     recipient = st.text_input("Recipient Email", value=default_email)
+    report_format = st.radio(
+        "Format", ["csv", "xlsx"], horizontal=True,
+        format_func=lambda fmt: {"csv": "CSV", "xlsx": "Excel (Summary, Per-Source, Detail sheets)"}[fmt],
+    )
     
     # Optional note field
     email_note = st.text_area(
@@ -952,48 +941,102 @@ with st.sidebar:
         height=100
     )
 
-    # EMAIL BUTTON
-    if st.button("Email CSV", type="primary"):
+    # EMAIL BUTTON: queued in the outbox, sent by the background worker
+    if st.button("Email Report", type="primary"):
         if not recipient:
             st.error("Enter an email address.")
         else:
-            with st.spinner("Sending email..."):
-                try:
-                    csv_bytes = report_utils.generate_report_csv(
-                        d_start.isoformat(), d_end.isoformat()
-                    )
-                    fname = f"report_{d_start}_{d_end}.csv"
-                    
-                    # Pass note to email function (only if not empty)
-                    note_to_send = email_note.strip() if email_note.strip() else None
-                    
-                    report_utils.send_email_with_attachment(
-                        to_email=recipient,
-                        subject=f"Donation Report: {d_start} - {d_end}",
-                        body=f"Attached is the donation log for {d_start} to {d_end}.",
-                        attachment_bytes=csv_bytes,
-                        filename=fname,
-                        note=note_to_send
+            try:
+                with st.spinner("Preparing report..."):
+                    report_path = report_utils.get_report_file(
+                        d_start.isoformat(), d_end.isoformat(), report_format
                     )
-                    st.success("Email Sent!")
-                    time.sleep(2) 
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                fname = f"report_{d_start}_{d_end}.{report_format}"
+
+                # Pass note to email function (only if not empty)
+                note_to_send = email_note.strip() if email_note.strip() else None
+
+                outbox.enqueue(
+                    recipient=recipient,
+                    subject=f"Donation Report: {d_start} - {d_end}",
+                    body=f"Attached is the donation log for {d_start} to {d_end}.",
+                    filename=fname,
+                    attachment_path=report_path,
+                    note=note_to_send,
+                )
+                get_outbox_worker().wake()
+                st.success(f"Report queued for {recipient}. It is sent in the background.")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+    outbox_status()
 
     st.caption("Or download directly:")
-    csv_bytes_dl = report_utils.generate_report_csv(d_start.isoformat(), d_end.isoformat())
+    # Generated only when clicked (cached per date range until the logs change)
+    start_iso, end_iso = d_start.isoformat(), d_end.isoformat()
     st.download_button(
-        "Download CSV",
-        csv_bytes_dl,
-        f"report_{d_start}_{d_end}.csv",
-        "text/csv",
-        use_container_width=True
+        "Download Excel" if report_format == "xlsx" else "Download CSV",
+        lambda: report_utils.get_report_bytes(start_iso, end_iso, report_format),
+        f"report_{d_start}_{d_end}.{report_format}",
+        report_utils.REPORT_MIME_TYPES[report_format],
+        use_container_width=True,
+        on_click="ignore"
     )
 
     st.divider()
 
+    # --- IDLE MEASUREMENT (WEIGHIT_IDLE_MEASURE=1) ---
+    governor = get_idle_governor()
+    if governor.measure:
+        rates = governor.wakeups_per_minute()
+        state = "idle" if governor.is_idle() else "active"
+        st.caption(f"Wakeups/min ({state}): " + ", ".join(f"{k} {v}" for k, v in sorted(rates.items())))
+
+    # --- SCALE STATUS ---
+    scale_status()
+
+@st.fragment
+@profiling.profiled("admin_sidebar")
+def admin_sidebar():
+    st.header("Admin")
+    station = st.session_state.station
+    if station.name != stations.DEFAULT_NAME:
+        st.caption(f"Station {station.name}")
+    scale_error()
+
+    # --- Undo / Redo ---
+    c_undo, c_redo = st.columns(2)
+    with c_undo:
+        if st.button("Undo Last Entry", key="undo_last"):
+            undo_entry()
+            safe_rerun()
+    with c_redo:
+        if st.button("Redo Last Undo", key="redo_last"):
+            redo_entry()
+            safe_rerun()
+
+    st.divider()
+    
+    # --- VOLUNTEER CHEAT SHEET ---
+    if st.button("📋 View Volunteer Cheat Sheet", use_container_width=True, key="cheatsheet_btn"):
+        st.session_state.show_cheatsheet = True
+        st.rerun()
+    
+    st.divider()
+
+    # --- ADMIN TOOLS (mounted on demand) ---
+    if st.session_state.admin_open:
+        st.button("Hide Admin Tools", use_container_width=True, key="admin_close",
+                  on_click=close_admin_tools)
+        admin_panel()
+    else:
+        st.button("Admin Tools", use_container_width=True, key="admin_open_btn",
+                  on_click=open_admin_tools)
+
+    st.divider()
+
     # --- CLOSE APPLICATION ---
-    if st.button("Close Application", type="secondary", use_container_width=True):
+    if st.button("Close Application", type="secondary", use_container_width=True, key="close_app"):
         st.warning("Shutting down...")
         # Kill all browsers and streamlit
         os.system("pkill -f chromium")
@@ -1004,183 +1047,162 @@ with st.sidebar:
 
 # ---------------- MAIN UI ----------------
 
-# 1. Get Weight (initial check, actual display uses fragment)
-try:
-    scale = get_scale()
-    # Single quick check - the background thread is continuously reading
-    reading = scale.get_latest()
-    if reading is None:
-        time.sleep(0.05)
-        reading = scale.get_latest()
-
-    weight_str = f"{reading.value:.1f} lbs" if reading and reading.unit == "lb" else "—"
-except Exception as e:
-    scale = None
-    weight_str = "Err"
-    # Log the error for debugging
-    logging.error(f"Scale error: {type(e).__name__}: {e}")
-    # Show error in sidebar for debugging
-    with st.sidebar:
-        st.error(f"Scale Error: {type(e).__name__}: {str(e)}")
-
-# 2. Top Row: Logo | Weight | Logo
-c1, c2, c3 = st.columns([1, 5, 1], gap="small", vertical_alignment="center")
-
-with c1:
-    img = load_logo(PANTRY_LOGO, height_px=138)
-    if img: st.image(img)
+@st.fragment
+@profiling.profiled("header")
+def header():
+    """Top Row: Logo | Donor + Weight | Logo"""
+    c1, c2, c3 = st.columns([1, 5, 1], gap="small", vertical_alignment="center")
+
+    with c1:
+        show_logo(PANTRY_LOGO, height_px=asset_pipeline.LOGO_HEIGHT_PX, css_class="pantry-logo")
+
+    with c2:
+        # Compact donor dropdown above weight
+        sources = get_sources()
+        current_idx = 0
+        if st.session_state.source in sources:
+            current_idx = sources.index(st.session_state.source)
+
+        selected = st.selectbox(
+            "Current Donor",
+            sources,
+            index=current_idx,
+            key="donor_select_main",
+            label_visibility="collapsed"
+        )
+        if selected != st.session_state.source:
+            # Totals and history are filtered by donor
+            st.session_state.source = selected
+            st.rerun()
 
-with c2:
-    # Compact donor dropdown above weight
-    sources = get_sources()
-    current_idx = 0
-    if st.session_state.source in sources:
-        current_idx = sources.index(st.session_state.source)
-    
-    st.session_state.source = st.selectbox(
-        "Current Donor",
-        sources,
-        index=current_idx,
-        key="donor_select_main",
-        label_visibility="collapsed"
-    )
-    
-    #weight_ph = st.empty()
-    
-    #weight_ph.markdown(f'<div class="weight-box">{weight_str}</div>', unsafe_allow_html=True)
-    display_weight()
-
-with c3:
-    img = load_logo(SCALE_LOGO, height_px=138)
-    if img:
-        # Hidden button for refresh
-        if st.button("refresh_hidden", key="refresh_scale", help="Click scale to refresh"):
-            safe_rerun()
-        # Show image with click handler
-        st.image(img, use_container_width=False)
+        display_weight()
 
-# 3. Buttons
-types = get_types()
-rows = chunk_types(types)
+    with c3:
+        if SCALE_LOGO.exists():
+            # Hidden button for refresh (clicking it reruns this fragment only)
+            st.button("refresh_hidden", key="refresh_scale", help="Click scale to refresh")
+            # kiosk.js turns a click on the image into a click on the button
+            with st.container(key="scale_logo"):
+                show_logo(SCALE_LOGO, height_px=asset_pipeline.LOGO_HEIGHT_PX, css_class="scale-logo")
 
 def on_log(type_info):
-    """Handle button click - check if temperature is required"""
+    """Type button clicked: log now, or open the step that needs more input"""
+    # The kiosk is in use again: stop mounting the admin tools
+    close_admin_tools()
     try:
-        scale = get_scale()
-        r = scale.read_stable_weight(timeout_s=0.5) if scale else None
-        
-        # Check if we got a valid reading
-        if r and r.unit == "lb" and r.value > 0.0:
-            # Scale reading successful
-            src = st.session_state.source
-            
-            # Check if this type requires temperature
-            if type_info["requires_temp"]:
-                # Store pending entry and show dialog
-                st.session_state.pending_entry = {
-                    "weight": r.value,
-                    "source": src,
-                    "type": type_info["name"]
-                }
-                st.session_state.show_temp_dialog = True
-                st.session_state.dialog_processed = False  # Reset the flag
-            else:
-                # Log directly without temperature
-                logger_core.log_entry(r.value, src, type_info["name"])
-        else:
-            # Scale reading failed or returned zero - show manual entry dialog
-            st.session_state.manual_entry_type_info = type_info
-            st.session_state.show_manual_entry_dialog = True
-            st.session_state.manual_dialog_processed = False
+        scale = station_scale()
+        reading = scale.read_stable_weight(timeout_s=0.5) if scale else None
     except (OSError, Exception) as e:
-        # Scale device error (e.g., not connected) - show manual entry dialog
+        # Scale device error (e.g., not connected) - ask for the weight
         logging.error(f"Scale error in on_log: {type(e).__name__}: {e}")
-        st.session_state.manual_entry_type_info = type_info
-        st.session_state.show_manual_entry_dialog = True
-        st.session_state.manual_dialog_processed = False
-
-for i, row in enumerate(rows):
-    cols = st.columns(len(row), gap="small")
-    for idx, type_info in enumerate(row):
-        cols[idx].button(
-            type_info["name"], 
-            on_click=on_log, 
-            args=(type_info,), 
-            use_container_width=True, 
-            key=f"btn_{i}_{idx}"
-        )
+        reading = None
+    log_flow_entry(get_entry_flow().start(type_info, st.session_state.source, reading))
+
+def shown_writes(writes: List["entry_flow.PendingWrite"]) -> List["entry_flow.PendingWrite"]:
+    """Writes of this session that belong to the current donor and view date, newest first"""
+    source = st.session_state.get("source", None)
+    view_date = st.session_state.get("view_date", None)
+    return [w for w in reversed(writes)
+            if w.entry.source == source and w.timestamp.date() == view_date]
+
+def render_totals(flow: "entry_flow.EntryFlow"):
+    """Daily totals line for the current donor and view date (pending entries included)"""
+    view_date = st.session_state.get("view_date", None)
+    view_date_iso = view_date.isoformat() if view_date else None
+    totals = dict(get_daily_totals(st.session_state.get("source", None), view_date_iso))
+    for write in shown_writes(flow.pending):
+        totals[write.entry.type_name] = totals.get(write.entry.type_name, 0.0) + write.entry.weight_lb
+    st.markdown(f'<div class="totals-box">{totals_line(totals)}</div>', unsafe_allow_html=True)
+
+def render_history(flow: "entry_flow.EntryFlow"):
+    """History table for the current donor and view date, pending/failed entries on top"""
+    view_date = st.session_state.get("view_date", None)
+    view_date_iso = view_date.isoformat() if view_date else None
+    rows = (
+        [write_row_html(w, "Not saved", FAILED_ROW_STYLE) for w in shown_writes(flow.failed)] +
+        [write_row_html(w, "Pending...", PENDING_ROW_STYLE) for w in shown_writes(flow.pending)] +
+        history.get_rows(st.session_state.get("source", None), view_date_iso)
+    )
+    st.markdown(history.table_html(rows), unsafe_allow_html=True)
+
+def render_results(flow: "entry_flow.EntryFlow"):
+    for write in flow.failed:
+        entry = write.entry
+        st.error(f"Not saved: {entry.type_name} {entry.weight_lb:.2f} lb from {entry.source} "
+                 f"({write.error}). Please log it again.")
+    render_totals(flow)
+    render_history(flow)
+
+@st.fragment(run_every=PENDING_POLL_INTERVAL)
+def pending_writes_watch():
+    """Polls (only while writes are pending) and reruns the app once they have settled"""
+    # Mounted by entry_panel, which has just drawn the current state
+    if st.session_state.pop("pending_watch_mounted", False):
+        return
+    flow = get_entry_flow()
+    if flow.reconcile():
+        invalidate_entry_caches()
+    if not flow.pending:
+        st.rerun()
+
+@st.fragment
+@profiling.profiled("entry_panel")
+def entry_panel():
+    """
+    Type buttons, entry flow card, totals and history.
+
+    A log click (and every Save/Cancel of the entry flow) reruns only this
+    fragment: the buttons are re-registered (cheap), and the totals and
+    history are re-rendered. Header, weight, CSS/JS and the admin panel are
+    not re-executed.
+    """
+    quick_entry_input()
+
+    types = get_types()
+    for i, row in enumerate(chunk_types(types)):
+        cols = st.columns(len(row), gap="small")
+        for idx, type_info in enumerate(row):
+            cols[idx].button(
+                type_info["name"],
+                on_click=on_log,
+                args=(type_info,),
+                use_container_width=True,
+                key=f"btn_{i}_{idx}"
+            )
 
-# Show temperature dialog if needed
-if st.session_state.get("show_temp_dialog", False):
-    temperature_dialog()
+    # Batch weighing (loads heavier than the scale's capacity)
+    if st.session_state.get("batch_session") is None:
+        st.button("Batch Weigh (multiple items)", key="batch_start", on_click=start_batch_session)
+    else:
+        batch_weigh_panel(types)
+
+    # Temperature / manual weight step of the entry being made
+    flow = get_entry_flow()
+    if flow.active:
+        entry_flow_card(flow)
 
-# Show manual entry dialog if needed
-if st.session_state.get("show_manual_entry_dialog", False):
-    manual_weight_entry_dialog()
+    # Optimistic: new entries show as pending at once, without waiting for
+    # their writes; pending_writes_watch confirms or rolls them back later
+    if flow.reconcile():
+        invalidate_entry_caches()
+    render_results(flow)
+    if flow.pending:
+        st.session_state.pending_watch_mounted = True
+        pending_writes_watch()
+
+
+with st.sidebar:
+    admin_sidebar()
+
+header()
+entry_panel()
 
 # Show cheat sheet dialog if requested
 if st.session_state.get("show_cheatsheet", False):
     st.session_state.show_cheatsheet = False
     cheatsheet_dialog()
 
-# 4. Daily Totals
-current_source = st.session_state.get("source", None)
-view_date = st.session_state.get("view_date", None)
-view_date_iso = view_date.isoformat() if view_date else None
-
-totals_ph = st.empty()
-totals_ph.markdown(f'<div class="totals-box">{get_daily_totals_line(current_source, view_date_iso)}</div>', unsafe_allow_html=True)
-
-# 5. History Table
-has_pending = st.session_state.get("pending_manual_entry") is not None
-history_ph = st.empty()
-history_ph.markdown(get_history_html(current_source, view_date_iso, has_pending), unsafe_allow_html=True)
-
-# Handle manual weight entry if pending
-if st.session_state.get("pending_manual_entry"):
-    pending = st.session_state.pending_manual_entry
-    type_info = pending["type_info"]
-    source = pending["source"]
-    
-    st.markdown(f"**Entering weight for {type_info['name']} from {source}**")
-    
-    with st.form(key="manual_weight_form", clear_on_submit=True):
-        col1, col2, col3 = st.columns([2, 1, 1])
-        with col1:
-            manual_weight = st.number_input(
-                "Weight (lbs)",
-                min_value=0.0,
-                max_value=500.0,
-                step=0.1,
-                format="%.1f",
-                key="manual_weight_input_form"
-            )
-        with col2:
-            submitted = st.form_submit_button("✓ Save", type="primary", use_container_width=True)
-        with col3:
-            cancelled = st.form_submit_button("✗ Cancel", use_container_width=True)
-        
-        if submitted and manual_weight > 0:
-            # Check if temperature is required
-            if type_info["requires_temp"]:
-                # Set up for temperature dialog
-                st.session_state.pending_entry = {
-                    "weight": manual_weight,
-                    "source": source,
-                    "type": type_info["name"]
-                }
-                st.session_state.show_temp_dialog = True
-                st.session_state.dialog_processed = False
-                st.session_state.pending_manual_entry = None
-                st.rerun()
-            else:
-                # Log directly without temperature
-                logger_core.log_entry(manual_weight, source, type_info["name"])
-                st.session_state.pending_manual_entry = None
-                st.rerun()
-        elif cancelled:
-            st.session_state.pending_manual_entry = None
-            st.rerun()
+profiling.record("script", _script_started)
 
 
 # 6. Auto-Refresh - DISABLED when dialog exists
@@ -0,0 +1,186 @@
+# src/weigh/asset_pipeline.py
+"""
+Pre-rendered, cached image and script assets for the kiosk.
+
+Logos used to be opened, converted and LANCZOS-resized with PIL on every
+rerun, then re-encoded by st.image. Here each (source image, target height)
+is rendered once to an optimized PNG whose file name carries the source
+mtime and height, so:
+
+- the disk copy survives restarts and is rebuilt only when the source changes
+- an in-memory index skips even the stat of the rendered file after first use
+- files under src/weigh/static/ are served by Streamlit at app/static/...
+  (server.enableStaticServing) and, being immutable per name, can be
+  cached by the browser
+
+Stylesheets and scripts go through publish(): they are copied to the same
+cache under a content-hashed name, so the browser fetches them once and a
+changed file gets a new URL.
+
+Configuration (environment variables):
+    WEIGHIT_ASSET_CACHE   directory for rendered images
+                          (default src/weigh/static/cache, falls back to
+                          ~/.cache/weighit/assets if that is not writable)
+"""
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL_PREFIX = "app/static"
+CACHE_DIR = Path(os.getenv("WEIGHIT_ASSET_CACHE", str(STATIC_DIR / "cache")))
+FALLBACK_CACHE_DIR = Path.home() / ".cache" / "weighit" / "assets"
+
+# Header logos and the height they are shown at
+KIOSK_LOGOS = (ASSETS_DIR / "slfp_logo.png", ASSETS_DIR / "scale_icon.png")
+LOGO_HEIGHT_PX = 138
+
+# (source path, source mtime_ns, height) -> rendered file
+_rendered: Dict[Tuple[str, int, int], Path] = {}
+_bytes: Dict[Path, bytes] = {}
+# (source path, source mtime_ns) -> published copy
+_published: Dict[Tuple[str, int], Path] = {}
+_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    for candidate in (CACHE_DIR, FALLBACK_CACHE_DIR):
+        try:
+            candidate.mkdir(parents=True, exist_ok=True)
+            if os.access(candidate, os.W_OK):
+                return candidate
+        except OSError:
+            continue
+    raise OSError("No writable asset cache directory")
+
+
+def rendered_name(source: Path, height_px: int, mtime_ns: int) -> str:
+    return f"{source.stem}-{height_px}px-{mtime_ns:x}.png"
+
+
+def _render(source: Path, height_px: int, target: Path) -> None:
+    from PIL import Image  # only needed on a cache miss
+
+    img = Image.open(source).convert("RGBA")
+    w, h = img.size
+    scale = height_px / float(h)
+    img = img.resize((int(w * scale), height_px), Image.LANCZOS)
+
+    tmp = target.with_suffix(".tmp")
+    img.save(tmp, format="PNG", optimize=True)
+    os.replace(tmp, target)
+
+    # Drop renders of older versions of the same source/height
+    for stale in target.parent.glob(f"{source.stem}-{height_px}px-*.png"):
+        if stale != target:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    logger.info(f"Rendered {source.name} at {height_px}px -> {target}")
+
+
+def render_image(source: Path, height_px: int) -> Optional[Path]:
+    """
+    Return the path of `source` resized to `height_px` tall, rendering it
+    only if no render for the current source mtime exists yet.
+    Returns None if the source image is missing.
+    """
+    try:
+        mtime_ns = source.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    key = (str(source), mtime_ns, height_px)
+    with _lock:
+        cached = _rendered.get(key)
+    if cached is not None:
+        return cached
+
+    target = _cache_dir() / rendered_name(source, height_px, mtime_ns)
+    if not target.exists():
+        _render(source, height_px, target)
+
+    with _lock:
+        _rendered[key] = target
+    return target
+
+
+def static_url(target: Path) -> Optional[str]:
+    """URL of a cached file, or None if it lives outside the static folder."""
+    try:
+        relative = target.resolve().relative_to(STATIC_DIR.resolve())
+    except ValueError:
+        return None
+    return f"{STATIC_URL_PREFIX}/{relative.as_posix()}"
+
+
+def image_url(source: Path, height_px: int) -> Optional[str]:
+    """
+    Static URL of the rendered image, or None if it lives outside the
+    static folder (read-only install) or the source is missing.
+    """
+    target = render_image(source, height_px)
+    if target is None:
+        return None
+    return static_url(target)
+
+
+def published_name(source: Path, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return f"{source.stem}-{digest}{source.suffix}"
+
+
+def publish(source: Path) -> Optional[Path]:
+    """
+    Copy a text asset (CSS/JS) into the cache under a content-hashed name.
+    Returns None if the source is missing.
+    """
+    try:
+        mtime_ns = source.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    key = (str(source), mtime_ns)
+    with _lock:
+        cached = _published.get(key)
+    if cached is not None:
+        return cached
+
+    data = source.read_bytes()
+    target = _cache_dir() / published_name(source, data)
+    if not target.exists():
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        for stale in target.parent.glob(f"{source.stem}-*{source.suffix}"):
+            if stale != target:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+        logger.info(f"Published {source.name} -> {target}")
+
+    with _lock:
+        _published[key] = target
+    return target
+
+
+def image_bytes(source: Path, height_px: int) -> Optional[bytes]:
+    """PNG bytes of the rendered image (for st.image when not served statically)."""
+    target = render_image(source, height_px)
+    if target is None:
+        return None
+    with _lock:
+        data = _bytes.get(target)
+    if data is None:
+        data = target.read_bytes()
+        with _lock:
+            _bytes[target] = data
+    return data
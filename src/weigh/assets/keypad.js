@@ -0,0 +1,139 @@
+/*
+ * src/weigh/assets/keypad.js
+ *
+ * Touch keypad of the entry flow card (an st.components.v2 component, see
+ * entry_keypad() in app.py). Typing, switching fields and validation all
+ * happen here, so Python hears from the card once: the "submit" trigger
+ * with {field name: number} when Save is pressed, or "cancel".
+ *
+ * data: {fields: [{name, label, value, min, max, decimals}]}
+ * A field's first key replaces its starting value (like select-on-focus).
+ */
+export default function (component) {
+    const { data, parentElement, setTriggerValue } = component;
+    const root = parentElement.querySelector('.keypad');
+    const fields = data.fields.map(function (f) {
+        return Object.assign({ text: f.value.toFixed(f.decimals), fresh: true }, f);
+    });
+    let active = 0;
+    let sent = false;
+
+    function valueOf(f) {
+        const n = Number(f.text);
+        return f.text !== '' && f.text !== '-' && f.text !== '.' && isFinite(n) ? n : null;
+    }
+
+    function problem(f) {
+        const n = valueOf(f);
+        if (n === null) return 'Enter a number';
+        if (n < f.min || n > f.max) return 'Must be ' + f.min + ' to ' + f.max;
+        return '';
+    }
+
+    const KEYS = ['7', '8', '9', '4', '5', '6', '1', '2', '3', '-', '0', '.'];
+    root.innerHTML =
+        fields.map(function (f, i) {
+            return '<button type="button" class="field" data-field="' + i + '">' +
+                '<span class="label"></span><span class="value"></span><span class="problem"></span></button>';
+        }).join('') +
+        '<div class="keys">' +
+        KEYS.map(function (k) { return '<button type="button" data-key="' + k + '">' + k + '</button>'; }).join('') +
+        '<button type="button" data-key="clear">C</button><button type="button" data-key="back">⌫</button>' +
+        '</div><div class="actions">' +
+        '<button type="button" data-action="cancel">Cancel</button>' +
+        '<button type="button" class="primary" data-action="save">Save Entry</button></div>';
+    const rows = root.querySelectorAll('.field');
+    fields.forEach(function (f, i) { rows[i].querySelector('.label').textContent = f.label; });
+
+    function render() {
+        fields.forEach(function (f, i) {
+            rows[i].classList.toggle('active', i === active);
+            rows[i].classList.toggle('fresh', f.fresh);
+            rows[i].querySelector('.value').textContent = f.text || ' ';
+            rows[i].querySelector('.problem').textContent = f.fresh ? '' : problem(f);
+        });
+    }
+
+    function press(key) {
+        const f = fields[active];
+        let t = f.fresh ? '' : f.text;
+        if (key === 'back') {
+            t = t.slice(0, -1);
+        } else if (key === 'clear') {
+            t = '';
+        } else if (key === '-') {
+            if (f.min >= 0) return;
+            t = t.charAt(0) === '-' ? t.slice(1) : '-' + t;
+        } else if (key === '.') {
+            if (f.decimals === 0 || t.indexOf('.') >= 0) return;
+            t += '.';
+        } else {
+            const dot = t.indexOf('.');
+            if (dot >= 0 && t.length - dot > f.decimals) return;
+            t += key;
+        }
+        f.text = t;
+        f.fresh = false;
+        render();
+    }
+
+    function submit() {
+        if (sent) return;
+        const bad = fields.findIndex(function (f) { return problem(f) !== ''; });
+        if (bad >= 0) {
+            active = bad;
+            fields[bad].fresh = false;
+            render();
+            return;
+        }
+        sent = true;
+        const values = {};
+        fields.forEach(function (f) { values[f.name] = valueOf(f); });
+        setTriggerValue('submit', values);
+    }
+
+    function cancel() {
+        if (sent) return;
+        sent = true;
+        setTriggerValue('cancel', true);
+    }
+
+    root.addEventListener('click', function (e) {
+        const btn = e.target.closest('button');
+        if (!btn) return;
+        if (btn.dataset.field !== undefined) {
+            active = Number(btn.dataset.field);
+            render();
+        } else if (btn.dataset.key) {
+            press(btn.dataset.key);
+        } else if (btn.dataset.action === 'save') {
+            submit();
+        } else if (btn.dataset.action === 'cancel') {
+            cancel();
+        }
+    });
+
+    // Physical keyboard / number pad while the card is open
+    function onKey(e) {
+        if (e.ctrlKey || e.altKey || e.metaKey) return;
+        let handled = true;
+        if (/^[0-9.-]$/.test(e.key)) press(e.key);
+        else if (e.key === 'Backspace') press('back');
+        else if (e.key === 'Delete') press('clear');
+        else if (e.key === 'Enter') submit();
+        else if (e.key === 'Escape') cancel();
+        else if (e.key === 'Tab' || e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            const step = e.key === 'ArrowUp' || e.shiftKey ? -1 : 1;
+            active = (active + step + fields.length) % fields.length;
+            render();
+        } else handled = false;
+        if (handled) {
+            e.preventDefault();
+            e.stopPropagation();
+        }
+    }
+    document.addEventListener('keydown', onKey, true);
+
+    render();
+    return function () { document.removeEventListener('keydown', onKey, true); };
+}
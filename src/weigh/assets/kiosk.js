@@ -0,0 +1,211 @@
+/*
+ * src/weigh/assets/kiosk.js
+ *
+ * Kiosk browser behaviour, loaded once per browser session from a static,
+ * content-hashed URL (see the bootstrap in app.py). Everything is done with
+ * a few delegated listeners on the page document, so nothing has to be
+ * re-attached when Streamlit re-renders elements, and no MutationObserver or
+ * "find the button by its text" scan runs on reruns.
+ *
+ * Buttons are addressed by their Streamlit key: st.button(..., key="x")
+ * renders inside an element with class "st-key-x".
+ */
+(function () {
+    'use strict';
+    if (window.__weighitKiosk) return;
+    window.__weighitKiosk = true;
+
+    const doc = document;
+
+    function clickKey(key) {
+        const btn = doc.querySelector('.st-key-' + key + ' button');
+        if (btn) btn.click();
+        return !!btn;
+    }
+
+    // Streamlit dialogs and the entry flow card (drawn inline by app.py)
+    const DIALOG_SELECTOR = '[role="dialog"], .st-key-entry_flow_card';
+    // Save buttons of the entry flow (Enter in a number input)
+    const DIALOG_SAVE_KEYS = ['save_temp', 'save_manual'];
+
+    function isDialogNumberInput(el) {
+        return el instanceof HTMLInputElement &&
+            (el.type === 'number' || el.inputMode === 'decimal') &&
+            el.closest(DIALOG_SELECTOR) !== null;
+    }
+
+    // Main-thread measurement: set localStorage.weighitPerf = '1' and reload.
+    // Handler time and long tasks are summed and logged every 10 s.
+    const perf = (function () {
+        if (localStorage.getItem('weighitPerf') !== '1') return null;
+        const totals = { handlers: 0, longtasks: 0, events: 0 };
+        if ('PerformanceObserver' in window) {
+            try {
+                new PerformanceObserver(function (list) {
+                    list.getEntries().forEach(function (e) { totals.longtasks += e.duration; });
+                }).observe({ type: 'longtask', buffered: true });
+            } catch (err) { /* longtask not supported */ }
+        }
+        setInterval(function () {
+            console.log('[weighit] main thread (10 s): handlers ' + totals.handlers.toFixed(1) +
+                ' ms over ' + totals.events + ' events, long tasks ' + totals.longtasks.toFixed(1) + ' ms');
+            totals.handlers = totals.longtasks = totals.events = 0;
+        }, 10000);
+        return totals;
+    })();
+
+    function on(type, handler, capture) {
+        doc.addEventListener(type, perf ? function (e) {
+            const t0 = performance.now();
+            handler(e);
+            perf.handlers += performance.now() - t0;
+            perf.events += 1;
+        } : handler, capture);
+    }
+
+    // 1. Keyboard shortcuts (Enter / Esc in the entry flow, Ctrl-Z / Ctrl-Y /
+    // F1 / Alt-F4)
+    on('keydown', function (e) {
+        if (e.key === 'Enter' && isDialogNumberInput(e.target)) {
+            e.preventDefault();
+            DIALOG_SAVE_KEYS.some(clickKey);
+        } else if (e.key === 'Escape' && clickKey('cancel_entry')) {
+            e.preventDefault();
+        } else if (e.ctrlKey && e.key.toLowerCase() === 'z') {
+            clickKey('undo_last');
+        } else if (e.ctrlKey && e.key.toLowerCase() === 'y') {
+            clickKey('redo_last');
+        } else if (e.key === 'F1') {
+            e.preventDefault();
+            clickKey('cheatsheet_btn');
+        } else if (e.altKey && e.key === 'F4') {
+            e.preventDefault();
+            clickKey('close_app');
+        }
+    });
+
+    // 2. Dialog number inputs: select all on focus/tap, digits/dot/minus only
+    function selectSoon(input) {
+        // Small timeout so the browser's own caret placement doesn't win
+        setTimeout(function () { input.select(); }, 50);
+    }
+
+    on('focusin', function (e) {
+        if (isDialogNumberInput(e.target)) selectSoon(e.target);
+    });
+
+    on('mouseup', function (e) {
+        if (isDialogNumberInput(e.target)) {
+            // Stop the browser from clearing the selection (mobile)
+            e.preventDefault();
+            selectSoon(e.target);
+        }
+    });
+
+    on('input', function (e) {
+        const input = e.target;
+        if (!isDialogNumberInput(input)) return;
+        const val = input.value;
+        const parts = val.replace(/[^0-9.-]/g, '').split('.');
+        let clean = parts[0];
+        if (parts.length > 1) clean += '.' + parts.slice(1).join('');
+        // Minus only allowed at the start
+        if (clean.indexOf('-') > 0) clean = clean.replace(/-/g, '');
+        if (val !== clean) input.value = clean;
+    });
+
+    // 3. Newly rendered dialogs: style.css gives dialogs and their number
+    // inputs a 1 ms "weighit-appear" animation, so animationstart tells us
+    // when one appears. Dialogs open scrolled to the top; the first number
+    // input gets focus with its text selected.
+    on('animationstart', function (e) {
+        if (e.animationName !== 'weighit-appear') return;
+        const el = e.target;
+        if (el.matches(DIALOG_SELECTOR)) {
+            el.scrollTop = 0;
+            if (el.firstElementChild) el.firstElementChild.scrollTop = 0;
+            return;
+        }
+        if (!isDialogNumberInput(el)) return;
+        const dialog = el.closest(DIALOG_SELECTOR);
+        const first = dialog.querySelector('input[type="number"], input[inputmode="decimal"]');
+        if (el === first && !dialog.dataset.weighitFocused) {
+            dialog.dataset.weighitFocused = 'true';
+            el.focus();
+            selectSoon(el);
+        }
+    }, true);
+
+    // 4. Clicking the scale image refreshes the header (hidden button)
+    on('click', function (e) {
+        if (e.target instanceof Element && e.target.closest('.st-key-scale_logo img')) {
+            clickKey('refresh_scale');
+        }
+    });
+
+    // 5. Hotkeys and barcode scanners (see quick_entry.py). Keys typed
+    // outside input fields are buffered: a lone key is a hotkey, a burst (a
+    // scanner types a code in a few ms, then Enter) is one scan. Tokens are
+    // queued and sent together through the hidden "quick_entry" input, one
+    // batch per rerun: the next batch goes once the app has cleared it.
+    const SCAN_GAP_MS = 40;      // scanners type faster than this per key
+    const HOTKEY_WAIT_MS = 60;   // a lone key waits this long for a burst
+    const SEPARATOR = '\x1e';
+    const setInputValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    let buffer = '';
+    let lastKeyAt = 0;
+    let flushTimer = null;
+    let sendTimer = null;
+    const queue = [];
+
+    function isEditable(el) {
+        return el instanceof HTMLElement &&
+            (el.isContentEditable || /^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName));
+    }
+
+    function sendQueue() {
+        sendTimer = null;
+        if (!queue.length) return;
+        const input = doc.querySelector('.st-key-quick_entry input');
+        if (!input || input.value) {
+            // Panel not rendered yet, or the previous batch still running
+            sendTimer = setTimeout(sendQueue, 50);
+            return;
+        }
+        setInputValue.call(input, queue.splice(0).join(SEPARATOR));
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+        input.dispatchEvent(new KeyboardEvent('keydown', { key: 'Enter', keyCode: 13, bubbles: true }));
+    }
+
+    function flushBuffer() {
+        clearTimeout(flushTimer);
+        if (!buffer) return;
+        queue.push((buffer.length === 1 ? 'key:' : 'scan:') + buffer);
+        buffer = '';
+        if (!sendTimer) sendQueue();
+    }
+
+    // The entry keypad (keypad.js) takes the keyboard while it is shown
+    const KEYPAD_SELECTOR = '[class*="st-key-entry_keypad_"]';
+
+    on('keydown', function (e) {
+        if (e.ctrlKey || e.altKey || e.metaKey || isEditable(e.target)) return;
+        if (doc.querySelector(KEYPAD_SELECTOR)) return;
+        if (e.key === 'Enter') {
+            if (buffer) {
+                e.preventDefault();
+                flushBuffer();
+            }
+            return;
+        }
+        if (e.key.length !== 1) return;
+        const now = performance.now();
+        // A slow key after a buffered one: the buffer was a hotkey of its own
+        if (buffer && now - lastKeyAt > SCAN_GAP_MS) flushBuffer();
+        e.preventDefault();
+        buffer += e.key;
+        lastKeyAt = now;
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushBuffer, HOTKEY_WAIT_MS);
+    }, true);
+})();
@@ -0,0 +1,67 @@
+/*
+ * src/weigh/assets/lite.js
+ *
+ * Browser side of the lite kiosk (kiosk_lite.py). Buttons carry a
+ * data-action; a click POSTs the action with the donor, the station and the
+ * fields of the entry card it sits in, and the returned HTML replaces the
+ * panel. The live weight arrives over one EventSource.
+ */
+(function () {
+    'use strict';
+    const doc = document;
+    const station = doc.body.dataset.station || '';
+    const donor = doc.getElementById('donor');
+    const panel = doc.getElementById('panel');
+    const weight = doc.getElementById('weight');
+    let busy = false;
+
+    async function post(action, fields) {
+        if (busy) return;  // one action at a time (double taps)
+        busy = true;
+        const body = new URLSearchParams(fields);
+        body.set('station', station);
+        body.set('source', donor.value);
+        try {
+            const resp = await fetch('/' + action, {method: 'POST', body: body});
+            panel.innerHTML = await resp.text();
+            const input = panel.querySelector('.entry-card input[type="number"]');
+            if (input) input.select();
+        } finally {
+            busy = false;
+        }
+    }
+
+    function card() {
+        return panel.querySelector('.entry-card');
+    }
+
+    doc.addEventListener('click', function (e) {
+        const btn = e.target.closest('[data-action]');
+        if (!btn) return;
+        e.preventDefault();
+        const form = btn.closest('form');
+        const fields = form ? new FormData(form) : new FormData();
+        if (btn.dataset.type) fields.set('type', btn.dataset.type);
+        post(btn.dataset.action, fields);
+    });
+
+    doc.addEventListener('keydown', function (e) {
+        if (!card()) return;
+        if (e.key === 'Escape') {
+            e.preventDefault();
+            post('cancel', new FormData());
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            post('save', new FormData(card()));
+        }
+    });
+
+    donor.addEventListener('change', function () {
+        post('source', new FormData());
+    });
+
+    const query = station ? '?station=' + encodeURIComponent(station) : '';
+    new EventSource('/weight' + query).onmessage = function (e) {
+        weight.textContent = JSON.parse(e.data).text;
+    };
+})();
@@ -0,0 +1,136 @@
+# src/weigh/batch_weigh.py
+"""
+Batch weighing for loads that exceed the scale's capacity.
+
+Volunteers weigh a pallet box by box. A BatchWeighSession listens to every
+reading from the scale's reader thread and records one "placement" each time
+an item settles on the scale and is then lifted off (return to zero). The
+accumulated placements can be committed as a single log entry (the sum) or as
+one entry per placement, in one action.
+"""
+import threading
+from typing import List, Optional
+
+from weigh import logger_core
+from weigh.scale_backend import ZERO_TOLERANCE_LB
+
+
+class BatchWeighSession:
+    """
+    Accumulates stable placements fed from DymoHIDScale.add_listener().
+
+    feed() is called from the scale reader thread, while the UI reads
+    total/placements from the Streamlit thread, so all state is guarded
+    by a lock.
+    """
+
+    def __init__(self, zero_tolerance_lb: float = ZERO_TOLERANCE_LB):
+        self.zero_tolerance_lb = zero_tolerance_lb
+        self._placements: List[float] = []
+        self._settled: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ---------- scale input ----------
+
+    def feed(self, reading) -> Optional[float]:
+        """
+        Process one ScaleReading. Returns the weight of a newly recorded
+        placement, or None if this reading did not complete one.
+
+        An item is recorded when it has produced at least one stable reading
+        and the scale then returns to zero. The last stable value before the
+        lift is used, so re-settling (e.g. nudging a box) simply updates it.
+        """
+        if reading is None or reading.unit != "lb":
+            return None
+
+        with self._lock:
+            if reading.value <= self.zero_tolerance_lb:
+                if self._settled is None:
+                    return None
+                placement = self._settled
+                self._placements.append(placement)
+                self._settled = None
+                return placement
+
+            if reading.is_stable:
+                self._settled = reading.value
+            return None
+
+    # ---------- accumulator ----------
+
+    @property
+    def placements(self) -> List[float]:
+        with self._lock:
+            return list(self._placements)
+
+    @property
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._placements)
+
+    @property
+    def pending(self) -> Optional[float]:
+        """Stable weight currently on the scale that has not been lifted yet."""
+        with self._lock:
+            return self._settled
+
+    def remove_last(self) -> Optional[float]:
+        """Drop the most recent placement (e.g. a box weighed twice)."""
+        with self._lock:
+            if not self._placements:
+                return None
+            return self._placements.pop()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._placements.clear()
+            self._settled = None
+
+    # ---------- commit ----------
+
+    def commit(
+        self,
+        source: str,
+        type_: str,
+        split: bool = False,
+        temp_pickup_f: Optional[float] = None,
+        temp_dropoff_f: Optional[float] = None,
+        station: Optional[str] = None
+    ) -> int:
+        """
+        Write the accumulated placements to the logs table and reset.
+
+        The placements are taken in the same step that empties the session,
+        so one recorded while the entries are written stays for the next
+        commit; if the write fails they are put back.
+
+        Args:
+            source: Source name
+            type_: Type name
+            split: If True, log one entry per placement; otherwise log the sum
+            temp_pickup_f: Pickup temperature applied to every entry (optional)
+            temp_dropoff_f: Dropoff temperature applied to every entry (optional)
+            station: Station that logged the entries (optional)
+
+        Returns:
+            Number of log entries written
+        """
+        with self._lock:
+            placements, self._placements = self._placements, []
+        if not placements:
+            return 0
+
+        weights = placements if split else [round(sum(placements), 2)]
+        try:
+            return logger_core.log_entries(
+                weights, source, type_,
+                temp_pickup_f=temp_pickup_f,
+                temp_dropoff_f=temp_dropoff_f,
+                station=station
+            )
+        except Exception:
+            with self._lock:
+                # Ahead of any placement recorded meanwhile
+                self._placements[:0] = placements
+            raise
@@ -0,0 +1,55 @@
+-- change_feed.sql
+-- Applied after schema.sql, and to existing databases on first connection
+-- (every statement is idempotent).
+--
+-- One row per insert/update/delete of a log entry, written by triggers, so
+-- every writer (kiosk, CLI, migration scripts) is covered. Renaming or
+-- deleting a source or type adds a row too (log_id 0, no day): reports and
+-- history show the names. MAX(seq) is the data-change token that keys
+-- cached reports.
+
+CREATE TABLE IF NOT EXISTS log_changes (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_id INTEGER NOT NULL,
+    op     TEXT NOT NULL,   -- 'insert', 'update' or 'delete'; 'source' or 'type' for names
+    day    TEXT             -- DATE(timestamp) of the affected entry
+);
+
+CREATE TRIGGER IF NOT EXISTS log_changes_insert AFTER INSERT ON logs
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (NEW.id, 'insert', DATE(NEW.timestamp));
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_update AFTER UPDATE ON logs
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (NEW.id, 'update', DATE(NEW.timestamp));
+    -- Entry moved to another day: that day changed too
+    INSERT INTO log_changes (log_id, op, day)
+        SELECT OLD.id, 'update', DATE(OLD.timestamp)
+        WHERE DATE(OLD.timestamp) IS NOT DATE(NEW.timestamp);
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_delete AFTER DELETE ON logs
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (OLD.id, 'delete', DATE(OLD.timestamp));
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_source_rename AFTER UPDATE OF name ON sources
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (0, 'source', NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_source_delete AFTER DELETE ON sources
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (0, 'source', NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_type_rename AFTER UPDATE OF name ON types
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (0, 'type', NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_changes_type_delete AFTER DELETE ON types
+BEGIN
+    INSERT INTO log_changes (log_id, op, day) VALUES (0, 'type', NULL);
+END;
@@ -117,6 +117,91 @@ def type_add(name):
     click.echo(f"Added type: {name}")
 
 
+# =====================================================
+# DIAGNOSTICS
+# =====================================================
+
+@cli.command("startup-profile")
+@click.option("--top", default=15, help="Rows per table")
+def startup_profile_cmd(top):
+    """Profile kiosk cold start (imports and time to first render)."""
+    from weigh import startup_profile
+    click.echo(startup_profile.format_report(startup_profile.run_profile(), top=top))
+
+
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.option("--serve", is_flag=True, help="Start the kiosk in this process after warming")
+@click.argument("streamlit_args", nargs=-1, type=click.UNPROCESSED)
+def prewarm(serve, streamlit_args):
+    """Warm scale, database and assets before the first session.
+
+    Extra arguments are passed to `streamlit run`, e.g.
+
+        weigh prewarm --serve --server.port=8501 --server.headless=true
+    """
+    from weigh import prewarm as prewarm_mod
+    click.echo(prewarm_mod.format_report(prewarm_mod.run()))
+    if serve:
+        prewarm_mod.serve(streamlit_args)
+
+
+@cli.command()
+@click.option("--host", default=None, help="Listen address (default WEIGHIT_LITE_HOST or 0.0.0.0)")
+@click.option("--port", default=None, type=int, help="Port (default WEIGHIT_LITE_PORT or 8503)")
+def lite(host, port):
+    """Run the lightweight kiosk frontend (no Streamlit, needs uvicorn)."""
+    from weigh import kiosk_lite
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        raise click.ClickException("The lite kiosk needs uvicorn: pip install uvicorn")
+    kiosk_lite.serve(host or kiosk_lite.LITE_HOST, port or kiosk_lite.LITE_PORT)
+
+
+@cli.command()
+def scales():
+    """List connected Dymo scales and the configured stations."""
+    from weigh import scale_backend, stations
+    paths = scale_backend.find_scales()
+    if not paths:
+        click.echo("No Dymo scales found.")
+    for path in paths:
+        click.echo(path)
+    for station in stations.load_stations().values():
+        click.echo(f"Station {station.name}: scale={station.scale or 'first found'}, "
+                   f"source={station.source or 'first'}, undo={station.undo}")
+
+
+@cli.command("export")
+@click.argument("out_dir", type=click.Path(file_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["parquet", "arrow", "npz"]), default="parquet",
+              show_default=True, help="File format of the month partitions")
+@click.option("--full", is_flag=True, help="Rewrite every month, not just the changed ones")
+def export_cmd(out_dir, fmt, full):
+    """Export the logs as columnar files, one per month, for analysis.
+
+    Repeat exports into OUT_DIR rewrite only the months changed since.
+    """
+    from weigh import export
+    try:
+        import numpy  # noqa: F401
+        if fmt != "npz":
+            import pyarrow  # noqa: F401
+    except ImportError:
+        raise click.ClickException("weigh export needs numpy and pyarrow: pip install weighit[export]")
+    result = export.export_logs(out_dir, fmt, full=full)
+    if not result.written and not result.removed:
+        click.echo(f"{out_dir} is up to date.")
+        return
+    rate = result.rows / result.seconds if result.seconds else 0.0
+    click.echo(f"Exported {result.rows} rows to {out_dir} ({fmt}) in {result.seconds:.2f} s "
+               f"({rate:,.0f} rows/s)")
+    if result.written:
+        click.echo(f"  written: {', '.join(result.written)}")
+    if result.removed:
+        click.echo(f"  removed: {', '.join(result.removed)}")
+
+
 # =====================================================
 # ENTRY POINT
 # =====================================================
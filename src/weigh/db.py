@@ -10,6 +10,9 @@ from threading import Lock
 
 DB_PATH = None
 SCHEMA_PATH = None
+CHANGE_FEED_PATH = os.path.join(os.path.dirname(__file__), "change_feed.sql")
+SUMMARY_CACHE_PATH = os.path.join(os.path.dirname(__file__), "summary_cache.sql")
+OUTBOX_PATH = os.path.join(os.path.dirname(__file__), "outbox.sql")
 
 # IMPORTANT:
 # We no longer keep a long-lived connection in memory.
@@ -70,12 +73,62 @@ def initialize_schema_if_needed():
                     with open(SCHEMA_PATH, "r") as f:
                         conn.executescript(f.read())
                     conn.commit()
+            # Existing databases predate the change feed and stations
+            apply_change_feed(conn)
+            apply_summary_cache(conn)
+            apply_outbox(conn)
+            ensure_station_column(conn)
         finally:
             conn.close()
 
         _schema_initialized = True
 
 
+def apply_change_feed(conn):
+    """Create the log_changes table and its triggers if missing."""
+    cur = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name LIKE 'log_changes_%'"
+    )
+    if cur.fetchone()[0] == 7:
+        return
+    with open(CHANGE_FEED_PATH, "r") as f:
+        conn.executescript(f.read())
+    conn.commit()
+
+
+def apply_summary_cache(conn):
+    """Create the day_summaries table and its trigger if missing."""
+    cur = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name='day_summaries_invalidate'"
+    )
+    if cur.fetchone()[0] == 1:
+        return
+    with open(SUMMARY_CACHE_PATH, "r") as f:
+        conn.executescript(f.read())
+    conn.commit()
+
+
+def apply_outbox(conn):
+    """Create the outbox table if missing."""
+    cur = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='outbox'"
+    )
+    if cur.fetchone()[0] == 1:
+        return
+    with open(OUTBOX_PATH, "r") as f:
+        conn.executescript(f.read())
+    conn.commit()
+
+
+def ensure_station_column(conn):
+    """Add logs.station to databases created before stations."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(logs)")]
+    if "station" in columns:
+        return
+    conn.execute("ALTER TABLE logs ADD COLUMN station TEXT")
+    conn.commit()
+
+
 def init_db():
     """Force regenerate schema (only used manually or by tests)."""
     set_defaults_if_needed()
@@ -84,6 +137,10 @@ def init_db():
         with open(SCHEMA_PATH, "r") as f:
             conn.executescript(f.read())
         conn.commit()
+        apply_change_feed(conn)
+        apply_summary_cache(conn)
+        apply_outbox(conn)
+        ensure_station_column(conn)
     finally:
         conn.close()
 
@@ -139,6 +196,19 @@ def fetch_sources():
         conn.close()
 
 
+def fetch_change_token():
+    """
+    Data-change token: the last log_changes sequence number. It changes
+    whenever any log entry is inserted, updated or deleted, and whenever a
+    source or type is renamed or deleted.
+    """
+    conn = get_conn()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM log_changes").fetchone()[0]
+    finally:
+        conn.close()
+
+
 def fetch_types():
     conn = get_conn()
     try:
@@ -0,0 +1,203 @@
+# src/weigh/entry_flow.py
+"""
+State machine for logging one entry from the kiosk's type buttons.
+
+    IDLE --type click, stable reading, no temperatures--> log, IDLE
+    IDLE --type click, stable reading, temperatures-----> TEMPERATURE
+    IDLE --type click, no usable reading----------------> MANUAL
+    TEMPERATURE / MANUAL --save-------------------------> log, IDLE
+    MANUAL --save without a weight----------------------> MANUAL, error
+    TEMPERATURE / MANUAL --cancel-----------------------> IDLE
+
+All state of the entry being made lives in one EntryFlow (app.py keeps it
+in st.session_state). The app calls the transitions from button callbacks,
+so a volunteer action costs exactly one rerun of the entry panel: the
+callback moves the flow and logs, and the rerun Streamlit does for the
+click renders the new step. Nothing in the flow needs st.rerun().
+
+Entries are written optimistically: EntryWriter.submit() hands the insert
+to one background writer thread and returns a PendingWrite at once, which
+the flow tracks in `pending`. The kiosk shows pending entries in the
+history and totals straight away and reconciles them when the write
+finishes: confirmed writes are dropped from `pending` (the database now
+has them), failed ones move to `failed` and are shown as rolled back
+until the next entry is started.
+"""
+import concurrent.futures
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from weigh import logger_core
+
+IDLE = "idle"
+TEMPERATURE = "temperature"
+MANUAL = "manual"
+
+# Values the temperature inputs start from
+DEFAULT_TEMP_PICKUP_F = 40.0
+DEFAULT_TEMP_DROPOFF_F = 38.0
+
+
+@dataclass(frozen=True)
+class Entry:
+    """A complete entry, ready to be written"""
+    weight_lb: float
+    source: str
+    type_name: str
+    temp_pickup_f: Optional[float] = None
+    temp_dropoff_f: Optional[float] = None
+    station: Optional[str] = None
+
+    def log(self) -> None:
+        logger_core.log_entry(
+            self.weight_lb,
+            self.source,
+            self.type_name,
+            temp_pickup_f=self.temp_pickup_f,
+            temp_dropoff_f=self.temp_dropoff_f,
+            station=self.station,
+        )
+
+
+@dataclass
+class PendingWrite:
+    """An entry handed to the EntryWriter, with the write's future"""
+    entry: Entry
+    timestamp: datetime
+    future: "concurrent.futures.Future"
+
+    @property
+    def error(self) -> Optional[str]:
+        if not self.future.done() or self.future.exception() is None:
+            return None
+        e = self.future.exception()
+        return f"{type(e).__name__}: {e}"
+
+
+class EntryWriter:
+    """
+    Writes entries on one background thread, in submission order (one
+    writer keeps SQLite inserts from the kiosk sessions serialized).
+    """
+
+    def __init__(self):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="weighit-writer")
+
+    def submit(self, entry: Entry) -> PendingWrite:
+        return PendingWrite(entry, datetime.now(timezone.utc), self._executor.submit(entry.log))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every write submitted so far has finished"""
+        self._executor.submit(lambda: None).result(timeout)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+@dataclass
+class EntryFlow:
+    # Station whose entries this flow logs (None = not recorded)
+    station: Optional[str] = None
+    step: str = IDLE
+    type_name: Optional[str] = None
+    requires_temp: bool = False
+    source: Optional[str] = None
+    # Stable scale reading (TEMPERATURE); entered by hand in MANUAL
+    weight_lb: Optional[float] = None
+    error: Optional[str] = None
+    # Incremented per flow, so input widgets keyed by it start from defaults
+    serial: int = 0
+    # Optimistic writes not confirmed yet / failed since the last start()
+    pending: List[PendingWrite] = field(default_factory=list)
+    failed: List[PendingWrite] = field(default_factory=list)
+
+    @property
+    def active(self) -> bool:
+        return self.step != IDLE
+
+    def start(self, type_info: dict, source: str, reading) -> Optional[Entry]:
+        """
+        A type button was clicked. `reading` is the scale's stable reading
+        (or None if the scale could not be read). Returns the entry when it
+        is already complete, else opens the step that asks for the rest.
+        """
+        self._clear()
+        self.serial += 1
+        self.failed.clear()
+        self.type_name = type_info["name"]
+        self.requires_temp = bool(type_info["requires_temp"])
+        self.source = source
+
+        if reading is None or reading.unit != "lb" or reading.value <= 0.0:
+            self.step = MANUAL
+            return None
+        if not self.requires_temp:
+            entry = Entry(reading.value, source, self.type_name, station=self.station)
+            self._clear()
+            return entry
+        self.weight_lb = reading.value
+        self.step = TEMPERATURE
+        return None
+
+    def save(
+        self,
+        weight_lb: Optional[float] = None,
+        temp_pickup_f: Optional[float] = None,
+        temp_dropoff_f: Optional[float] = None,
+    ) -> Optional[Entry]:
+        """
+        Save pressed. Returns the entry to log and goes back to IDLE, or
+        returns None and sets `error` if the input is not usable.
+        """
+        if not self.active:
+            return None
+        if self.step == MANUAL:
+            if weight_lb is None or weight_lb <= 0:
+                self.error = "Please enter a weight greater than 0"
+                return None
+        else:
+            weight_lb = self.weight_lb
+
+        if self.requires_temp:
+            entry = Entry(weight_lb, self.source, self.type_name, temp_pickup_f, temp_dropoff_f,
+                          station=self.station)
+        else:
+            entry = Entry(weight_lb, self.source, self.type_name, station=self.station)
+        self._clear()
+        return entry
+
+    def cancel(self) -> None:
+        self._clear()
+
+    def track(self, write: PendingWrite) -> None:
+        self.pending.append(write)
+
+    def reconcile(self, timeout: float = 0.0) -> int:
+        """
+        Wait up to `timeout` seconds for pending writes, then settle the
+        finished ones. Returns how many were confirmed.
+        """
+        if not self.pending:
+            return 0
+        concurrent.futures.wait([w.future for w in self.pending], timeout=timeout)
+        confirmed = 0
+        still_pending = []
+        for write in self.pending:
+            if not write.future.done():
+                still_pending.append(write)
+            elif write.error is None:
+                confirmed += 1
+            else:
+                self.failed.append(write)
+        self.pending = still_pending
+        return confirmed
+
+    def _clear(self) -> None:
+        self.step = IDLE
+        self.type_name = None
+        self.requires_temp = False
+        self.source = None
+        self.weight_lb = None
+        self.error = None
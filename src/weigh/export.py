@@ -0,0 +1,343 @@
+# src/weigh/export.py
+"""
+Columnar export of the logs for analysis (`weigh export`).
+
+Writes every entry (undone ones excluded), joined with its donor and type,
+as typed, compressed columns, one partition per month (UTC, like the
+reports):
+
+    OUT/month=2025-03/logs.parquet     (--format parquet, zstd, pyarrow)
+    OUT/month=2025-03/logs.arrow       (--format arrow, Arrow IPC file, zstd)
+    OUT/month=2025-03/logs.npz         (--format npz, numpy.savez_compressed,
+                                        no pyarrow needed)
+    OUT/_export.json                   (format, log_changes position, rows per month,
+                                        dictionaries)
+
+Columns: id, timestamp (UTC, microseconds), weight_lb, source, type,
+temp_pickup_f, temp_dropoff_f (null/NaN when not recorded), station.
+source, type and station are dictionary-encoded with the same dictionary
+in every partition (all donors / types, by id); in npz files they are
+int32 codes plus a "<name>_names" array (-1 = none).
+
+Parquet and Arrow directories read as one hive-partitioned dataset, e.g.
+pyarrow.dataset.dataset(OUT, partitioning="hive") or
+pandas.read_parquet(OUT).
+
+A repeat export into the same directory reads the change feed
+(log_changes, see change_feed.sql) after the position recorded in
+_export.json and rewrites only the months of the changed days; a month
+left with no entries loses its partition. A new directory, another format,
+a rebuilt database (the feed went backwards) or dictionaries that differ
+from the recorded ones (a donor, type or station added, renamed or
+removed) export everything, so every partition keeps sharing one
+dictionary.
+
+Needs numpy and pyarrow (pip install weighit[export]); npz needs numpy
+only.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from weigh import db
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("parquet", "arrow", "npz")
+STATE_FILE = "_export.json"
+# Rows fetched from SQLite at a time
+FETCH_ROWS = 50_000
+
+_QUERY = """
+    SELECT SUBSTR(DATE(l.timestamp), 1, 7) AS month, l.id, l.timestamp, l.weight_lb,
+           l.source_id, l.type_id, l.temp_pickup_f, l.temp_dropoff_f, l.station
+    FROM logs l
+    WHERE l.deleted = 0 {where}
+    ORDER BY month, l.id
+"""
+
+
+@dataclass
+class ExportResult:
+    fmt: str
+    rows: int = 0
+    # Months written / removed by this export (unchanged months are not listed)
+    written: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    full: bool = False
+    seconds: float = 0.0
+
+
+def partition_path(out_dir: Path, month: str, fmt: str) -> Path:
+    return Path(out_dir) / f"month={month}" / f"logs.{fmt}"
+
+
+def read_state(out_dir: Path) -> Optional[dict]:
+    path = Path(out_dir) / STATE_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def changed_months(conn, since_seq: int) -> Set[str]:
+    """Months of the days touched by log_changes after since_seq"""
+    rows = conn.execute(
+        "SELECT DISTINCT SUBSTR(day, 1, 7) FROM log_changes WHERE seq > ? AND day IS NOT NULL",
+        (since_seq,)).fetchall()
+    return {row[0] for row in rows}
+
+
+class _Columns:
+    """One month of rows as Python lists, one per column"""
+
+    def __init__(self):
+        self.id, self.timestamp, self.weight_lb = [], [], []
+        self.source_id, self.type_id = [], []
+        self.temp_pickup_f, self.temp_dropoff_f, self.station = [], [], []
+
+    def extend(self, rows) -> None:
+        columns = list(zip(*rows))
+        for name, values in zip(("id", "timestamp", "weight_lb", "source_id", "type_id",
+                                 "temp_pickup_f", "temp_dropoff_f", "station"), columns[1:]):
+            getattr(self, name).extend(values)
+
+    def __len__(self):
+        return len(self.id)
+
+
+class _Dictionary:
+    """Fixed dictionary for a name column: name list plus key -> code"""
+
+    def __init__(self, names_by_key: Dict):
+        self.names = [names_by_key[key] for key in sorted(names_by_key)]
+        self.codes = {key: code for code, key in enumerate(sorted(names_by_key))}
+
+    def state(self) -> list:
+        """[key, name] pairs in code order, as recorded in _export.json"""
+        return [[key, name] for key, name in zip(self.codes, self.names)]
+
+    def encode(self, values):
+        """int32 codes of values (-1 = None or not in the dictionary)"""
+        import numpy as np
+        if self.codes and all(isinstance(key, int) for key in self.codes):
+            # Row ids: one table lookup for the whole column
+            table = np.full(max(self.codes) + 2, -1, dtype=np.int32)
+            for key, code in self.codes.items():
+                table[key] = code
+            ids = np.asarray(values, dtype=np.int64)
+            return table[np.where((ids >= 0) & (ids < len(table)), ids, -1)]
+        return np.fromiter((self.codes.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+
+
+def _timestamps_us(values: List[str]):
+    """ISO timestamps as int64 microseconds since the epoch (naive = UTC)"""
+    import numpy as np
+
+    # The app writes UTC timestamps: numpy parses them once the offset is dropped
+    text = np.char.replace(np.char.replace(np.asarray(values, dtype=str), "+00:00", ""), "Z", "")
+    if not ((np.char.find(text, "+", 10) >= 0) | (np.char.find(text, "-", 10) >= 0)).any():
+        try:
+            return text.astype("datetime64[us]").astype(np.int64)
+        except ValueError:
+            pass
+    return _parse_timestamps(values)
+
+
+def _arrow_timestamps(values: List[str]):
+    """ISO timestamps as a UTC timestamp[us] array, parsed by Arrow when it can"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    utc = pa.timestamp("us", tz="UTC")
+    try:
+        return pc.cast(pa.array(values, pa.string()), utc)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pa.array(_parse_timestamps(values), pa.int64()).cast(utc)
+
+
+def _parse_timestamps(values: List[str]):
+    """Row by row fallback for offsets other than UTC"""
+    import numpy as np
+
+    out = np.empty(len(values), dtype=np.int64)
+    for i, text in enumerate(values):
+        ts = datetime.fromisoformat(text)
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        out[i] = int(ts.timestamp() * 1_000_000)
+    return out
+
+
+def _floats(values):
+    import numpy as np
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _arrow_table(cols: _Columns, sources: _Dictionary, types: _Dictionary, stations: _Dictionary):
+    import numpy as np
+    import pyarrow as pa
+
+    def dictionary(codes, names):
+        indices = pa.array(codes, mask=codes < 0, type=pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(names, pa.string()))
+
+    station_codes = stations.encode(cols.station)
+    return pa.table({
+        "id": pa.array(np.asarray(cols.id, dtype=np.int64)),
+        "timestamp": _arrow_timestamps(cols.timestamp),
+        "weight_lb": pa.array(np.asarray(cols.weight_lb, dtype=np.float64)),
+        "source": dictionary(sources.encode(cols.source_id), sources.names),
+        "type": dictionary(types.encode(cols.type_id), types.names),
+        "temp_pickup_f": pa.array(cols.temp_pickup_f, pa.float64()),
+        "temp_dropoff_f": pa.array(cols.temp_dropoff_f, pa.float64()),
+        "station": dictionary(station_codes, stations.names),
+    })
+
+
+def _write_partition(path: Path, fmt: str, cols: _Columns, sources: _Dictionary,
+                     types: _Dictionary, stations: _Dictionary) -> None:
+    """Write one month, replacing the old file only once the new one is complete"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    os.close(fd)
+    try:
+        if fmt == "npz":
+            import numpy as np
+            with open(tmp, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    id=np.asarray(cols.id, dtype=np.int64),
+                    timestamp=_timestamps_us(cols.timestamp).astype("datetime64[us]"),
+                    weight_lb=np.asarray(cols.weight_lb, dtype=np.float64),
+                    source=sources.encode(cols.source_id), source_names=np.array(sources.names, dtype=str),
+                    type=types.encode(cols.type_id), type_names=np.array(types.names, dtype=str),
+                    temp_pickup_f=_floats(cols.temp_pickup_f),
+                    temp_dropoff_f=_floats(cols.temp_dropoff_f),
+                    station=stations.encode(cols.station), station_names=np.array(stations.names, dtype=str),
+                )
+        else:
+            import pyarrow as pa
+            table = _arrow_table(cols, sources, types, stations)
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, tmp, compression="zstd", use_dictionary=True)
+            else:
+                options = pa.ipc.IpcWriteOptions(compression="zstd")
+                with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def export_logs(out_dir, fmt: str = "parquet", full: bool = False) -> ExportResult:
+    """
+    Export the logs to out_dir (see module docstring); only the months
+    changed since the last export into out_dir are rewritten unless full.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (choose from {', '.join(FORMATS)})")
+    started = datetime.now(timezone.utc)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    result = ExportResult(fmt)
+
+    conn = db.get_conn()
+    try:
+        # The export reflects one snapshot of the database
+        conn.execute("BEGIN")
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM log_changes").fetchone()[0]
+        sources = _Dictionary({row["id"]: row["name"] for row in conn.execute("SELECT id, name FROM sources")})
+        types = _Dictionary({row["id"]: row["name"] for row in conn.execute("SELECT id, name FROM types")})
+        stations = _Dictionary({name: name for (name,) in conn.execute(
+            "SELECT DISTINCT station FROM logs WHERE station IS NOT NULL")})
+        dictionaries = {"source": sources.state(), "type": types.state(), "station": stations.state()}
+
+        state = read_state(out_dir)
+        months: Dict[str, int] = {}
+        if (full or state is None or state.get("format") != fmt or state.get("seq", 0) > seq
+                or state.get("dictionaries") != dictionaries):
+            result.full = True
+            targets = None
+        else:
+            months = dict(state.get("months", {}))
+            targets = changed_months(conn, state["seq"])
+
+        where, params = "", ()
+        if targets is not None:
+            where = f"AND SUBSTR(DATE(l.timestamp), 1, 7) IN ({', '.join('?' * len(targets))})"
+            params = tuple(sorted(targets))
+
+        def flush(month: str, cols: _Columns) -> None:
+            _write_partition(partition_path(out_dir, month, fmt), fmt, cols, sources, types, stations)
+            months[month] = len(cols)
+            result.written.append(month)
+            result.rows += len(cols)
+
+        if targets is None or targets:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples
+            cursor.execute(_QUERY.format(where=where), params)
+            month, cols = None, _Columns()
+            while True:
+                rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    break
+                # Rows arrive sorted by month: a month may span several batches
+                for row_month, group in groupby(rows, key=itemgetter(0)):
+                    if row_month != month:
+                        if len(cols):
+                            flush(month, cols)
+                            cols = _Columns()
+                        month = row_month
+                    if row_month is None:
+                        logger.warning("Skipping entries whose timestamp has no date")
+                        continue
+                    cols.extend(list(group))
+            if len(cols):
+                flush(month, cols)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    # Months that were exported before and now have no entries
+    stale = set(months) - set(result.written)
+    if targets is not None:
+        stale &= targets
+    for gone in sorted(stale):
+        shutil.rmtree(out_dir / f"month={gone}", ignore_errors=True)
+        del months[gone]
+        result.removed.append(gone)
+    if result.full:
+        # Partitions of an earlier export (other format or database)
+        for old in out_dir.glob("month=*"):
+            if old.name[len("month="):] not in months:
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                for other in old.glob("logs.*"):
+                    if other.suffix != f".{fmt}":
+                        other.unlink()
+
+    _write_state(out_dir, fmt, seq, months, dictionaries)
+    result.seconds = (datetime.now(timezone.utc) - started).total_seconds()
+    logger.info(f"Exported {result.rows} rows in {len(result.written)} month(s) to {out_dir} ({fmt})")
+    return result
+
+
+def _write_state(out_dir: Path, fmt: str, seq: int, months: Dict[str, int],
+                 dictionaries: Dict[str, list]) -> None:
+    tmp = out_dir / (STATE_FILE + ".part")
+    with open(tmp, "w") as f:
+        json.dump({"format": fmt, "seq": seq, "months": dict(sorted(months.items())),
+                   "dictionaries": dictionaries}, f, indent=1)
+    os.replace(tmp, out_dir / STATE_FILE)
@@ -0,0 +1,217 @@
+# src/weigh/history.py
+"""
+Incremental history table for the kiosk.
+
+The kiosk shows the latest HISTORY_ROWS entries of one (source, day) view.
+A HistoryView keeps those rows as rendered HTML fragments, keyed by log id,
+together with the log_changes position (see change_feed.sql) they reflect.
+On refresh it reads only the changes after that position, joined with the
+current state of each changed entry, in one query on the log_changes
+primary key:
+
+- a new entry of this view is rendered and prepended
+- an undone (deleted = 1) or moved entry is dropped, and the row below the
+  table is fetched to keep it full
+- a redone or edited entry is rendered again and put back in id order
+- a renamed or deleted source or type reloads the view (rows show names)
+
+Untouched rows are never queried or rendered again, so a refresh after one
+new entry costs one query and one row render, and a refresh with no
+changes one query and nothing else. Views are shared by all sessions.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from weigh import db
+
+HISTORY_ROWS = 15
+# (source, day) views kept in memory
+VIEW_CACHE_SIZE = 8
+
+_ROW_COLUMNS = """
+    l.id, l.timestamp, l.weight_lb, s.name AS source, t.name AS type,
+    l.temp_pickup_f, l.temp_dropoff_f, l.deleted, DATE(l.timestamp) AS day
+"""
+
+
+def format_timestamp(timestamp: str) -> str:
+    try:
+        return datetime.fromisoformat(timestamp).astimezone().strftime("%m/%d %H:%M")
+    except Exception:
+        return timestamp
+
+
+def row_html(ts_str: str, source: str, type_name: str, weight_lb: float,
+             temp_pickup_f: Optional[float], temp_dropoff_f: Optional[float],
+             action: str, style: str = "") -> str:
+    # Add temperature info if present
+    temp_info = ""
+    if temp_pickup_f is not None or temp_dropoff_f is not None:
+        temps = []
+        if temp_pickup_f is not None:
+            temps.append(f"Pick:{temp_pickup_f:.1f}°F")
+        if temp_dropoff_f is not None:
+            temps.append(f"Drop:{temp_dropoff_f:.1f}°F")
+        temp_info = f" ({', '.join(temps)})"
+
+    return (
+        (f'<tr style="{style}">' if style else "<tr>") +
+        f"<td>{ts_str}</td>"
+        f"<td>{source}</td>"
+        f"<td>{type_name}{temp_info}</td>"
+        f"<td>{weight_lb:.2f} lb</td>"
+        f"<td>{action}</td>"
+        f"</tr>"
+    )
+
+
+def table_html(rows: List[str], limit: int = HISTORY_ROWS) -> str:
+    rows = rows[:limit]
+    rows_html = "".join(rows)
+
+    # Blank filler rows keep the table height constant
+    slots_needed = limit - len(rows)
+    if slots_needed > 0:
+        blank_row = "<tr><td>&nbsp;</td><td></td><td></td><td></td><td></td></tr>"
+        rows_html += blank_row * slots_needed
+
+    return (
+        f'<table class="history-table">'
+        f'<thead><tr><th>Date/Time</th><th>Source</th><th>Type</th><th>Weight</th><th>Action</th></tr></thead>'
+        f'<tbody>{rows_html}</tbody>'
+        f'</table>'
+    )
+
+
+class HistoryView:
+    """Latest `limit` entries of one source (None = all) on one day (YYYY-MM-DD)"""
+
+    def __init__(self, source: Optional[str], day: str, limit: int = HISTORY_ROWS):
+        self.source = source
+        self.day = day
+        self.limit = limit
+        # Newest first. While fewer than `limit`, these are all the view's rows.
+        self._rows: List[Tuple[int, str]] = []
+        self._seq: Optional[int] = None
+        self._lock = threading.Lock()
+        # Work counters (tests, benchmarks)
+        self.queries = 0
+        self.rendered = 0
+
+    def rows(self) -> List[str]:
+        """Rendered rows, newest first, after applying changes since the last call"""
+        with self._lock:
+            conn = db.get_conn()
+            try:
+                if self._seq is None:
+                    self._load(conn)
+                else:
+                    self._apply_changes(conn)
+            finally:
+                conn.close()
+            return [html for _, html in self._rows]
+
+    def _render(self, row) -> str:
+        self.rendered += 1
+        return row_html(format_timestamp(row["timestamp"]), row["source"], row["type"],
+                        row["weight_lb"], row["temp_pickup_f"], row["temp_dropoff_f"], "Logged")
+
+    def _visible(self, row) -> bool:
+        return (row["id"] is not None and not row["deleted"] and row["day"] == self.day
+                and (self.source is None or row["source"] == self.source))
+
+    def _fetch(self, conn, before_id: Optional[int], limit: int):
+        self.queries += 1
+        sql = f"""
+            SELECT {_ROW_COLUMNS}
+            FROM logs l
+            JOIN sources s ON l.source_id = s.id
+            JOIN types t   ON l.type_id = t.id
+            WHERE l.deleted = 0
+              AND DATE(l.timestamp) = ?
+        """
+        params: list = [self.day]
+        if self.source is not None:
+            sql += " AND s.name = ?"
+            params.append(self.source)
+        if before_id is not None:
+            sql += " AND l.id < ?"
+            params.append(before_id)
+        sql += " ORDER BY l.id DESC LIMIT ?"
+        params.append(limit)
+        return conn.execute(sql, params).fetchall()
+
+    def _load(self, conn) -> None:
+        # Position first: changes racing the load are applied again next time
+        self.queries += 1
+        self._seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM log_changes").fetchone()[0]
+        self._rows = [(row["id"], self._render(row)) for row in self._fetch(conn, None, self.limit)]
+
+    def _apply_changes(self, conn) -> None:
+        self.queries += 1
+        changes = conn.execute(f"""
+            SELECT c.seq, c.log_id, c.op, {_ROW_COLUMNS}
+            FROM log_changes c
+            LEFT JOIN logs l    ON l.id = c.log_id
+            LEFT JOIN sources s ON l.source_id = s.id
+            LEFT JOIN types t   ON l.type_id = t.id
+            WHERE c.seq > ?
+            ORDER BY c.seq
+        """, (self._seq,)).fetchall()
+        if not changes:
+            return
+        self._seq = changes[-1]["seq"]
+        if any(change["op"] in ("source", "type") for change in changes):
+            self._load(conn)
+            return
+
+        # Current state of each changed entry (the join gives the latest)
+        latest = {change["log_id"]: change for change in changes}
+        rows: Dict[int, str] = dict(self._rows)
+        full = len(rows) >= self.limit
+        oldest = min(rows) if rows else None
+        removed = False
+        for log_id, row in latest.items():
+            if self._visible(row):
+                # Older than the last row of a full table: not shown
+                if log_id in rows or not full or log_id > oldest:
+                    rows[log_id] = self._render(row)
+            elif log_id in rows:
+                del rows[log_id]
+                removed = True
+
+        self._rows = sorted(rows.items(), reverse=True)[:self.limit]
+        if removed and full and len(self._rows) < self.limit:
+            # Pull up the rows that were below the table
+            before = self._rows[-1][0] if self._rows else None
+            missing = self.limit - len(self._rows)
+            self._rows += [(row["id"], self._render(row)) for row in self._fetch(conn, before, missing)]
+
+
+_views: "OrderedDict[Tuple[Optional[str], Optional[str], str], HistoryView]" = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def get_view(source: Optional[str], day: str) -> HistoryView:
+    key = (db.DB_PATH, source, day)
+    with _views_lock:
+        view = _views.get(key)
+        if view is None:
+            view = _views[key] = HistoryView(source, day)
+            while len(_views) > VIEW_CACHE_SIZE:
+                _views.popitem(last=False)
+        _views.move_to_end(key)
+        return view
+
+
+def get_rows(source: Optional[str], day: str) -> List[str]:
+    """Rendered history rows of a view, newest first"""
+    return get_view(source, day).rows()
+
+
+def reset() -> None:
+    """Forget all views (tests)."""
+    with _views_lock:
+        _views.clear()
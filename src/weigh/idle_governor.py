@@ -0,0 +1,155 @@
+# src/weigh/idle_governor.py
+"""
+Idle governor for battery-powered kiosks (PineTab2).
+
+Overnight nobody touches the kiosk and the scale reads zero, yet the scale
+reader thread and the weight display keep waking the CPU. The governor tracks
+the last "activity" (a non-zero weight or a session connecting/interacting)
+and, after a quiet period, tells the reader thread to publish only the
+occasional packet (it still reads every one, so a load is seen with the next
+packet) and the display to drop to a low-power cadence. Any activity wakes
+it immediately; a polling weight
+display (WEIGHIT_WEIGHT_PUSH=0) still waits for its next idle refresh.
+
+Configuration (environment variables):
+    WEIGHIT_IDLE_AFTER                    quiet period in seconds (0 disables, default 600)
+    WEIGHIT_IDLE_READ_INTERVAL            seconds between packets published while idle (default 2)
+    WEIGHIT_IDLE_WEIGHT_UPDATE_INTERVAL   weight display refresh while idle (default 30)
+    WEIGHIT_IDLE_MEASURE                  1 = count wakeups and log wakeups/minute
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict
+
+from weigh.scale_backend import ZERO_TOLERANCE_LB
+
+logger = logging.getLogger(__name__)
+
+IDLE_AFTER_S = float(os.getenv("WEIGHIT_IDLE_AFTER", "600"))
+IDLE_READ_INTERVAL_S = float(os.getenv("WEIGHIT_IDLE_READ_INTERVAL", "2"))
+IDLE_WEIGHT_UPDATE_INTERVAL = float(os.getenv("WEIGHIT_IDLE_WEIGHT_UPDATE_INTERVAL", "30"))
+MEASURE = os.getenv("WEIGHIT_IDLE_MEASURE", "0") == "1"
+
+# Wakeup counters cover a sliding window of this many seconds
+MEASURE_WINDOW_S = 60.0
+
+
+class IdleGovernor:
+    """
+    Shared (one per process) activity tracker.
+
+    - note_reading() is called by the scale reader thread for every packet.
+    - note_session() is called when a browser session connects or a user acts.
+    - is_idle() / display_interval() tell consumers which cadence to use.
+    - skip_packet() throttles what the reader publishes while idle; the reader
+      keeps blocking on the device, so a load wakes it with the next packet.
+    """
+
+    def __init__(
+        self,
+        idle_after_s: float = IDLE_AFTER_S,
+        idle_read_interval_s: float = IDLE_READ_INTERVAL_S,
+        idle_display_interval_s: float = IDLE_WEIGHT_UPDATE_INTERVAL,
+        measure: bool = MEASURE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.idle_after_s = idle_after_s
+        self.idle_read_interval_s = idle_read_interval_s
+        self.idle_display_interval_s = idle_display_interval_s
+        self.measure = measure
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_activity = clock()
+        self._last_published = float("-inf")
+        self._was_idle = False
+        self._wakeups: Dict[str, Deque[float]] = defaultdict(deque)
+        self._last_report = clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_after_s > 0
+
+    # ---------- activity ----------
+
+    def _activity(self) -> None:
+        with self._lock:
+            self._last_activity = self._clock()
+
+    def note_reading(self, reading) -> None:
+        """Reader thread hook: any non-zero weight is activity."""
+        self.record_wakeup("reader")
+        if reading is not None and reading.value > ZERO_TOLERANCE_LB:
+            self._activity()
+
+    def note_session(self) -> None:
+        """A session connected or a volunteer interacted with the kiosk."""
+        self._activity()
+
+    # ---------- state ----------
+
+    def is_idle(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            idle = (self._clock() - self._last_activity) >= self.idle_after_s
+            changed = idle != self._was_idle
+            self._was_idle = idle
+        if changed:
+            logger.info("Idle governor: entering low-power mode" if idle
+                        else "Idle governor: back to full rate")
+        return idle
+
+    def display_interval(self, active_interval: float) -> float:
+        """Weight display refresh interval to use right now (0 = no auto-refresh)."""
+        if active_interval <= 0:
+            return active_interval
+        if self.is_idle():
+            return max(active_interval, self.idle_display_interval_s)
+        return active_interval
+
+    def skip_packet(self) -> bool:
+        """
+        Reader thread hook, after note_reading(): True if this packet should
+        not be published. While idle only one packet per idle_read_interval_s
+        reaches the listeners; a non-zero packet has already ended idle mode
+        in note_reading(), so it is published at once.
+        """
+        if not self.is_idle():
+            return False
+        now = self._clock()
+        with self._lock:
+            if now - self._last_published < self.idle_read_interval_s:
+                return True
+            self._last_published = now
+        return False
+
+    # ---------- measurement mode ----------
+
+    def record_wakeup(self, source: str) -> None:
+        """Count one wakeup of `source` ("reader", "display", ...) when measuring."""
+        if not self.measure:
+            return
+        now = self._clock()
+        with self._lock:
+            q = self._wakeups[source]
+            q.append(now)
+            while q and now - q[0] > MEASURE_WINDOW_S:
+                q.popleft()
+            report = now - self._last_report >= MEASURE_WINDOW_S
+            if report:
+                self._last_report = now
+        if report:
+            rates = ", ".join(f"{k}={v}" for k, v in sorted(self.wakeups_per_minute().items()))
+            logger.info(f"Wakeups/minute ({'idle' if self.is_idle() else 'active'}): {rates}")
+
+    def wakeups_per_minute(self) -> Dict[str, int]:
+        """Wakeups per source over the last minute (empty unless measuring)."""
+        now = self._clock()
+        with self._lock:
+            return {
+                source: sum(1 for t in q if now - t <= MEASURE_WINDOW_S)
+                for source, q in self._wakeups.items()
+            }
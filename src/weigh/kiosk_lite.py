@@ -0,0 +1,436 @@
+# src/weigh/kiosk_lite.py
+"""
+Lightweight kiosk frontend: a plain ASGI app, no Streamlit.
+
+    weigh lite [--host HOST] [--port PORT]     (needs uvicorn)
+
+The page is rendered once on the server (donor list, weight, type buttons,
+totals, history) and kept up to date by a ~2 KB script (assets/lite.js):
+
+    GET  /            whole page                   (?station=NAME as in app.py)
+    GET  /weight      live weight, Server-Sent Events
+    POST /log         type button     -> panel HTML (totals, history, entry card)
+    POST /save        entry card save -> panel HTML
+    POST /cancel      entry card Esc  -> panel HTML
+    POST /undo, /redo                 -> panel HTML
+    POST /source      donor changed   -> panel HTML
+    GET  /report.csv  ?start=YYYY-MM-DD&end=YYYY-MM-DD (report_utils)
+    GET  /report.xlsx same, as an Excel workbook
+
+A click is one small POST answered by the panel fragment; nothing else on
+the page is re-rendered and no script reruns. The server is stateless per
+browser: the donor comes from the page's select, and the temperature /
+manual step of an entry (entry_flow) is carried in the card's hidden fields.
+
+Logging, scale reading, history, stations and reports are the same modules
+the Streamlit kiosk uses (logger_core, scale_backend via runtime, history,
+stations, report_utils), so both frontends can run side by side on one
+database, e.g. Streamlit on 8501 and this one on WEIGHIT_LITE_PORT.
+"""
+import asyncio
+import html
+import json
+import logging
+import mimetypes
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote
+
+from weigh import (asset_pipeline, db, entry_flow, history, logger_core, runtime,
+                   stations, weight_stream)
+
+logger = logging.getLogger(__name__)
+
+LITE_HOST = os.getenv("WEIGHIT_LITE_HOST", "0.0.0.0")
+LITE_PORT = int(os.getenv("WEIGHIT_LITE_PORT", "8503"))
+# Cache lifetime of /assets/ files in the browser (seconds)
+ASSET_MAX_AGE = 3600
+# Files under /assets/ the page uses
+LITE_ASSETS = ("lite.css", "lite.js")
+
+
+# ---------------- data ----------------
+
+def get_sources() -> List[str]:
+    return sorted(logger_core.get_sources_dict().keys())
+
+
+def get_types() -> List[dict]:
+    """Type info dicts (name, requires_temp), in button order"""
+    types = [{"name": name, "sort_order": info["sort_order"], "requires_temp": info["requires_temp"]}
+             for name, info in logger_core.get_types_dict().items()]
+    return sorted(types, key=lambda t: t["sort_order"])
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def pick_source(form: Dict[str, str], station: "stations.Station") -> str:
+    sources = get_sources()
+    for source in (form.get("source"), station.source):
+        if source in sources:
+            return source
+    return sources[0] if sources else "Unknown"
+
+
+def parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+# ---------------- rendering ----------------
+
+def totals_html(source: str) -> str:
+    totals = logger_core.totals_today_weight_per_type(source=source, date=today())
+    line = " | ".join(f"{html.escape(t['name'])}: {totals.get(t['name'], 0.0):.1f}" for t in get_types())
+    return f'<div class="totals-box">{line}</div>'
+
+
+def number_input(name: str, label: str, value: float, step: float) -> str:
+    return (f'<label>{label}<input type="number" inputmode="decimal" name="{name}" '
+            f'value="{value:.1f}" step="{step}" min="-40" max="500"></label>')
+
+
+def card_html(flow: "entry_flow.EntryFlow") -> str:
+    """Temperature / manual weight step of an entry (modal card)"""
+    esc = html.escape
+    fields = [
+        f'<input type="hidden" name="step" value="{flow.step}">',
+        f'<input type="hidden" name="type" value="{esc(flow.type_name)}">',
+    ]
+    if flow.step == entry_flow.TEMPERATURE:
+        fields.append(f'<input type="hidden" name="weight_lb" value="{flow.weight_lb!r}">')
+        title = "Temperature Recording"
+        text = (f"<p>Recording temperatures for <b>{esc(flow.type_name)}</b></p>"
+                f"<p>Weight: <b>{flow.weight_lb:.2f} lb</b> from <b>{esc(flow.source)}</b></p>")
+    else:
+        title = "Manual Weight Entry"
+        text = (f'<p class="warning"><b>Scale not readable</b> - Please enter weight manually</p>'
+                f"<p>Recording <b>{esc(flow.type_name)}</b> from <b>{esc(flow.source)}</b></p>"
+                + number_input("weight", "Weight (lbs)", 0.0, 0.1))
+    if flow.requires_temp:
+        text += (number_input("temp_pickup", "Pickup Temperature (°F)",
+                              entry_flow.DEFAULT_TEMP_PICKUP_F, 1.0)
+                 + number_input("temp_dropoff", "Dropoff Temperature (°F)",
+                                entry_flow.DEFAULT_TEMP_DROPOFF_F, 1.0))
+    error = f'<p class="error">{esc(flow.error)}</p>' if flow.error else ""
+    return (
+        f'<div class="entry-backdrop"><form class="entry-card">'
+        f'<h3>{title}</h3>{text}{error}{"".join(fields)}'
+        f'<div class="card-buttons">'
+        f'<button type="button" data-action="cancel">Cancel</button>'
+        f'<button type="button" class="primary" data-action="save">Save Entry</button>'
+        f'</div></form></div>'
+    )
+
+
+def panel_html(source: str, flow: Optional["entry_flow.EntryFlow"] = None,
+               message: str = "") -> str:
+    """Everything a click can change: entry card, message, totals, history"""
+    card = card_html(flow) if flow is not None and flow.active else ""
+    note = f'<div class="message">{html.escape(message)}</div>' if message else '<div class="message"></div>'
+    return card + note + totals_html(source) + history.table_html(history.get_rows(source, today()))
+
+
+async def render_panel(source: str, flow: Optional["entry_flow.EntryFlow"] = None,
+                       message: str = "") -> str:
+    """panel_html() off the event loop (totals and history are SQLite reads)"""
+    return await asyncio.to_thread(panel_html, source, flow, message)
+
+
+def page_html(station: "stations.Station", source: str, weight_text: str) -> str:
+    esc = html.escape
+    options = "".join(
+        f'<option{" selected" if name == source else ""}>{esc(name)}</option>' for name in get_sources())
+    buttons = "".join(
+        f'<button type="button" class="type-button" data-action="log" data-type="{esc(t["name"])}">'
+        f'{esc(t["name"])}</button>' for t in get_types())
+    logo = '<img class="logo" src="/logo.png" alt="">' if asset_pipeline.KIOSK_LOGOS[0].exists() else ""
+    station_name = "" if station.name == stations.DEFAULT_NAME else station.name
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        '<title>Weigh Kiosk</title><link rel="stylesheet" href="/assets/lite.css">'
+        f'</head><body data-station="{esc(station_name)}">'
+        f'<header>{logo}<div class="center">'
+        f'<select id="donor" name="source">{options}</select>'
+        f'<div id="weight" class="weight-box">{esc(weight_text)}</div></div>'
+        f'<div class="actions"><button type="button" data-action="undo">Undo</button>'
+        f'<button type="button" data-action="redo">Redo</button></div></header>'
+        f'<main><div class="types">{buttons}</div>'
+        f'<div id="panel">{panel_html(source)}</div></main>'
+        '<script src="/assets/lite.js" defer></script></body></html>'
+    )
+
+
+# ---------------- actions ----------------
+
+def read_scale(station: "stations.Station"):
+    """Stable reading of the station's scale (None if it cannot be read)"""
+    try:
+        return runtime.get_scale(station.scale).read_stable_weight(timeout_s=0.5)
+    except Exception as e:
+        logger.error(f"Scale error in lite log: {type(e).__name__}: {e}")
+        return None
+
+
+async def write(entry: Optional["entry_flow.Entry"]) -> str:
+    """Store a finished entry on the shared writer; message for the panel"""
+    if entry is None:
+        return ""
+    try:
+        await asyncio.wrap_future(runtime.get_entry_writer().submit(entry).future)
+    except Exception as e:
+        logger.error(f"Lite write failed: {type(e).__name__}: {e}")
+        return f"Not saved: {entry.type_name} {entry.weight_lb:.2f} lb ({type(e).__name__}: {e})"
+    return f"Logged {entry.type_name} {entry.weight_lb:.2f} lb"
+
+
+def restore_flow(form: Dict[str, str], station: "stations.Station",
+                 source: str) -> "entry_flow.EntryFlow":
+    """The entry step carried by the card's hidden fields"""
+    types = logger_core.get_types_dict()
+    type_name = form.get("type")
+    step = form.get("step")
+    if type_name not in types or step not in (entry_flow.TEMPERATURE, entry_flow.MANUAL):
+        return entry_flow.EntryFlow(station=station.name)
+    return entry_flow.EntryFlow(
+        station=station.name, step=step, type_name=type_name,
+        requires_temp=bool(types[type_name]["requires_temp"]), source=source,
+        weight_lb=parse_float(form.get("weight_lb")) if step == entry_flow.TEMPERATURE else None,
+    )
+
+
+async def on_log(form, station, source) -> str:
+    type_name = form.get("type")
+    info = (await asyncio.to_thread(logger_core.get_types_dict)).get(type_name)
+    if info is None:
+        return await render_panel(source, message=f"Unknown type {type_name!r}")
+    reading = await asyncio.to_thread(read_scale, station)
+    flow = entry_flow.EntryFlow(station=station.name)
+    entry = flow.start({"name": type_name, "requires_temp": info["requires_temp"]}, source, reading)
+    return await render_panel(source, flow, await write(entry))
+
+
+async def on_save(form, station, source) -> str:
+    flow = await asyncio.to_thread(restore_flow, form, station, source)
+    entry = flow.save(parse_float(form.get("weight")), parse_float(form.get("temp_pickup")),
+                      parse_float(form.get("temp_dropoff")))
+    return await render_panel(source, flow, await write(entry))
+
+
+async def on_cancel(form, station, source) -> str:
+    return await render_panel(source)
+
+
+def undo_or_redo(action, station: "stations.Station"):
+    """Pending writes first, so the entry just logged is the one undone"""
+    runtime.get_entry_writer().flush()
+    return action(station.undo_station)
+
+
+async def on_undo(form, station, source) -> str:
+    undone = await asyncio.to_thread(undo_or_redo, logger_core.undo_last_entry, station)
+    return await render_panel(source, message="Undone" if undone else "Nothing to undo")
+
+
+async def on_redo(form, station, source) -> str:
+    redone = await asyncio.to_thread(undo_or_redo, logger_core.redo_last_entry, station)
+    return await render_panel(source, message="Redone" if redone else "Nothing to redo")
+
+
+async def on_source(form, station, source) -> str:
+    return await render_panel(source)
+
+
+ACTIONS = {
+    "/log": on_log,
+    "/save": on_save,
+    "/cancel": on_cancel,
+    "/undo": on_undo,
+    "/redo": on_redo,
+    "/source": on_source,
+}
+
+
+# ---------------- live weight ----------------
+
+_broadcasters: Dict[str, "weight_stream.WeightBroadcaster"] = {}
+
+
+def get_broadcaster(station: "stations.Station") -> "weight_stream.WeightBroadcaster":
+    """One broadcaster per scale, hooked onto its reader"""
+    name = station.scale or ""
+    broadcaster = _broadcasters.get(name)
+    if broadcaster is None:
+        scale = runtime.get_scale(station.scale)
+        broadcaster = weight_stream.WeightBroadcaster(weight_stream.format_weight(scale.get_latest()))
+        scale.add_listener(broadcaster.publish)
+        broadcaster = _broadcasters.setdefault(name, broadcaster)
+    return broadcaster
+
+
+def weight_text(station: "stations.Station") -> str:
+    try:
+        return get_broadcaster(station).current()[0]
+    except Exception as e:
+        logger.error(f"Scale error in lite page: {type(e).__name__}: {e}")
+        return "Err"
+
+
+async def stream_weight(station, receive, send) -> None:
+    """
+    SSE: the weight text whenever it changes, keepalives in between.
+
+    No thread waits per page: the broadcaster wakes this coroutine through
+    the event loop (call_soon_threadsafe) when the text changes.
+    """
+    broadcaster = await asyncio.to_thread(get_broadcaster, station)
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]})
+
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    disconnected = asyncio.Event()
+
+    def wake():
+        loop.call_soon_threadsafe(changed.set)
+
+    async def watch():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+        changed.set()
+
+    watcher = asyncio.ensure_future(watch())
+    broadcaster.add_listener(wake)
+    try:
+        seen = None
+        while not disconnected.is_set():
+            changed.clear()
+            text, version = broadcaster.current()
+            if version != seen:
+                seen = version
+                body = f"data: {json.dumps({'text': text})}\n\n"
+            else:
+                try:
+                    await asyncio.wait_for(changed.wait(), weight_stream.KEEPALIVE_S)
+                    continue
+                except asyncio.TimeoutError:
+                    body = ": keepalive\n\n"
+            await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+    except OSError:
+        pass
+    finally:
+        broadcaster.remove_listener(wake)
+        watcher.cancel()
+
+
+# ---------------- ASGI ----------------
+
+async def read_form(receive) -> Dict[str, str]:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return {k: v[-1] for k, v in parse_qs(body.decode("utf-8")).items()}
+
+
+async def respond(send, status: int, body: bytes, content_type: str,
+                  headers: tuple = ()) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", content_type.encode()),
+        (b"content-length", str(len(body)).encode()), *headers]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def respond_file(send, path, content_type: str, headers: tuple = (),
+                       chunk_size: int = 64 * 1024) -> None:
+    """Send a file in chunks (a report can be larger than we want in memory)"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(size).encode()), *headers]})
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            more = len(chunk) == chunk_size
+            await send({"type": "http.response.body", "body": chunk, "more_body": more})
+            if not more:
+                break
+
+
+async def serve_asset(send, name: str) -> None:
+    path = asset_pipeline.ASSETS_DIR / name
+    if name not in LITE_ASSETS or not path.exists():
+        await respond(send, 404, b"Not Found", "text/plain")
+        return
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    await respond(send, 200, path.read_bytes(), content_type,
+                  ((b"cache-control", f"max-age={ASSET_MAX_AGE}".encode()),))
+
+
+async def app(scope, receive, send) -> None:
+    """ASGI entry point (uvicorn weigh.kiosk_lite:app)"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                db.initialize_schema_if_needed()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                runtime.reset()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+    query = {k: v[-1] for k, v in parse_qs(scope["query_string"].decode()).items()}
+
+    if method == "POST" and path in ACTIONS:
+        form = await read_form(receive)
+        station = stations.get_station(form.get("station"))
+        source = await asyncio.to_thread(pick_source, form, station)
+        body = await ACTIONS[path](form, station, source)
+        await respond(send, 200, body.encode(), "text/html; charset=utf-8")
+    elif method != "GET":
+        await respond(send, 405, b"Method Not Allowed", "text/plain")
+    elif path == "/":
+        station = stations.get_station(query.get("station"))
+        body = await asyncio.to_thread(
+            lambda: page_html(station, pick_source(query, station), weight_text(station)))
+        await respond(send, 200, body.encode(), "text/html; charset=utf-8")
+    elif path == "/weight":
+        await stream_weight(stations.get_station(query.get("station")), receive, send)
+    elif path.startswith("/assets/"):
+        await serve_asset(send, path[len("/assets/"):])
+    elif path == "/logo.png":
+        data = await asyncio.to_thread(asset_pipeline.image_bytes, asset_pipeline.KIOSK_LOGOS[0],
+                                       asset_pipeline.LOGO_HEIGHT_PX)
+        if data is None:
+            await respond(send, 404, b"Not Found", "text/plain")
+        else:
+            await respond(send, 200, data, "image/png",
+                          ((b"cache-control", f"max-age={ASSET_MAX_AGE}".encode()),))
+    elif path in ("/report.csv", "/report.xlsx") and "start" in query and "end" in query:
+        from weigh import report_utils  # SMTP/MIME stack, loaded on first report
+        fmt = path.rsplit(".", 1)[1]
+        path = await asyncio.to_thread(report_utils.get_report_file, query["start"], query["end"], fmt)
+        filename = quote(f"weighit_report_{query['start']}_{query['end']}.{fmt}")
+        await respond_file(send, path, report_utils.REPORT_MIME_TYPES[fmt],
+                           ((b"content-disposition", f"attachment; filename={filename}".encode()),))
+    else:
+        await respond(send, 404, b"Not Found", "text/plain")
+
+
+def serve(host: str = LITE_HOST, port: int = LITE_PORT) -> None:
+    """Run the lite kiosk with uvicorn (blocks)."""
+    import uvicorn
+    uvicorn.run(app, host=host, port=port, log_level="warning")
@@ -0,0 +1,39 @@
+# src/weigh/lazy_imports.py
+"""
+Deferred imports for a fast kiosk cold start.
+
+lazy_import("weigh.report_utils") returns a module object whose code runs
+on first attribute access, so modules only the admin panel needs (email/SMTP
+stack, report generation) are not loaded while the first screen renders.
+
+Configuration (environment variables):
+    WEIGHIT_LAZY_IMPORTS   1 = defer (default), 0 = import immediately
+                           (surfaces import errors at startup)
+"""
+import importlib
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+LAZY_IMPORTS = os.getenv("WEIGHIT_LAZY_IMPORTS", "1") == "1"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import `name` now, or register it to be executed on first use."""
+    if not LAZY_IMPORTS or name in sys.modules:
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+    # Same parent binding a normal import creates (weigh.report_utils)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
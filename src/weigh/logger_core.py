@@ -1,25 +1,90 @@
 # src/weigh/logger_core.py
+from array import array
 from datetime import datetime, UTC
-from typing import Optional
+from typing import List, Optional, Sequence
 from weigh.db import get_conn, fetch_sources, fetch_types
 
+_LOGS_BETWEEN = """
+    SELECT l.id, l.timestamp, l.weight_lb, l.source_id, l.type_id,
+           s.name AS source, t.name AS type,
+           l.temp_pickup_f, l.temp_dropoff_f
+    FROM logs l
+    JOIN sources s ON l.source_id = s.id
+    JOIN types t   ON l.type_id = t.id
+    WHERE DATE(l.timestamp) BETWEEN ? AND ?
+      AND l.deleted = 0
+    ORDER BY l.timestamp ASC, l.id ASC;
+"""
+
 def get_logs_between(start_date: str, end_date: str):
+    return list(iter_logs_between(start_date, end_date))
+
+def iter_logs_between(start_date: str, end_date: str):
+    """get_logs_between() one row at a time, read from the cursor as it goes"""
+    conn = get_conn()
+    try:
+        for row in conn.execute(_LOGS_BETWEEN, (start_date, end_date)):
+            yield dict(row)
+    finally:
+        conn.close()
+
+_SUMMARY_ROWS = """
+    SELECT s.name, t.name, l.weight_lb, l.temp_pickup_f, l.temp_dropoff_f
+    FROM logs l
+    JOIN sources s ON l.source_id = s.id
+    JOIN types t   ON l.type_id = t.id
+    WHERE DATE(l.timestamp) BETWEEN ? AND ?
+      AND l.deleted = 0
+    ORDER BY l.timestamp ASC, l.id ASC;
+"""
+
+def summary_row(source: str, type_: str, weight_lb: float, entries: int,
+                pickups: Sequence[float], dropoffs: Sequence[float]) -> dict:
+    """One summarize_logs_between() row from a weight total and the recorded temperatures"""
+    return {
+        "source": source,
+        "type": type_,
+        "weight_lb": weight_lb,
+        "entries": entries,
+        "temp_pickup_avg": sum(pickups) / len(pickups) if pickups else None,
+        "temp_pickup_count": len(pickups),
+        "temp_dropoff_avg": sum(dropoffs) / len(dropoffs) if dropoffs else None,
+        "temp_dropoff_count": len(dropoffs),
+    }
+
+def summarize_logs_between(start_date: str, end_date: str):
+    """
+    Per source and type totals of the range, in the order each pair first
+    appears in the detailed section.
+
+    One row per (source, type) that has entries: weight_lb, the number of
+    entries, and the average and count of the pickup / dropoff temperatures
+    that were recorded (avg is None when count is 0). The figures are
+    computed the way the report always has: weights added one at a time in
+    entry order (timestamp, then id) and temperatures averaged with
+    sum() / len() in that order (the temperatures are kept as packed
+    arrays until then). Float rounding depends on that order, so
+    summing any other way (SQL SUM/AVG, math.fsum) can change the printed
+    totals and averages.
+    """
+    totals = {}
     conn = get_conn()
     try:
-        rows = conn.execute("""
-            SELECT l.id, l.timestamp, l.weight_lb, l.source_id, l.type_id,
-                   s.name AS source, t.name AS type,
-                   l.temp_pickup_f, l.temp_dropoff_f
-            FROM logs l
-            JOIN sources s ON l.source_id = s.id
-            JOIN types t   ON l.type_id = t.id
-            WHERE DATE(l.timestamp) BETWEEN ? AND ?
-              AND l.deleted = 0
-            ORDER BY l.timestamp ASC;
-        """, (start_date, end_date)).fetchall()
-        return [dict(row) for row in rows]
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples
+        for source, type_, weight, pickup, dropoff in cursor.execute(_SUMMARY_ROWS, (start_date, end_date)):
+            acc = totals.get((source, type_))
+            if acc is None:
+                acc = totals[source, type_] = [0.0, 0, array("d"), array("d")]
+            acc[0] += weight
+            acc[1] += 1
+            if pickup is not None:
+                acc[2].append(pickup)
+            if dropoff is not None:
+                acc[3].append(dropoff)
     finally:
         conn.close()
+    return [summary_row(source, type_, *acc) for (source, type_), acc in totals.items()]
 
 def get_recent_entries(limit: int = 5, source: Optional[str] = None, date: Optional[str] = None):
     conn = get_conn()
@@ -121,7 +186,8 @@ def log_entry(
     source: str,
     type_: str,
     temp_pickup_f: Optional[float] = None,
-    temp_dropoff_f: Optional[float] = None
+    temp_dropoff_f: Optional[float] = None,
+    station: Optional[str] = None
 ):
     """
     Log a weight entry with optional temperature data.
@@ -132,6 +198,7 @@ def log_entry(
         type_: Type name (e.g., "Meat", "Produce")
         temp_pickup_f: Temperature at pickup in Fahrenheit (optional)
         temp_dropoff_f: Temperature at dropoff in Fahrenheit (optional)
+        station: Station that logged the entry (optional, see stations.py)
     """
     conn = get_conn()
     try:
@@ -141,21 +208,64 @@ def log_entry(
 
         conn.execute("""
             INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
-                             temp_pickup_f, temp_dropoff_f)
-            VALUES (?, ?, ?, ?, 0, ?, ?)
+                             temp_pickup_f, temp_dropoff_f, station)
+            VALUES (?, ?, ?, ?, 0, ?, ?, ?)
         """, (ts, weight_lb, sources[source], types[type_]["id"],
-              temp_pickup_f, temp_dropoff_f))
+              temp_pickup_f, temp_dropoff_f, station))
+        conn.commit()
+    finally:
+        conn.close()
+
+def log_entries(
+    weights_lb: List[float],
+    source: str,
+    type_: str,
+    temp_pickup_f: Optional[float] = None,
+    temp_dropoff_f: Optional[float] = None,
+    station: Optional[str] = None
+) -> int:
+    """
+    Log several weight entries for the same source/type in one transaction.
+
+    Used by batch weighing to commit every placement with a single action.
+    Returns the number of rows inserted.
+    """
+    if not weights_lb:
+        return 0
+
+    conn = get_conn()
+    try:
+        sources = get_sources_dict()
+        types = get_types_dict()
+        ts = datetime.now(UTC).isoformat()
+        source_id = sources[source]
+        type_id = types[type_]["id"]
+
+        conn.executemany("""
+            INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                             temp_pickup_f, temp_dropoff_f, station)
+            VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+        """, [(ts, w, source_id, type_id, temp_pickup_f, temp_dropoff_f, station)
+              for w in weights_lb])
         conn.commit()
+        return len(weights_lb)
     finally:
         conn.close()
 
-def undo_last_entry():
+def undo_last_entry(station: Optional[str] = None):
+    """Undo the latest entry (of `station` only, if given)"""
     conn = get_conn()
     try:
         # Find most recent ACTIVE entry
-        row = conn.execute(
-            "SELECT id FROM logs WHERE deleted=0 ORDER BY id DESC LIMIT 1"
-        ).fetchone()
+        if station is None:
+            row = conn.execute(
+                "SELECT id FROM logs WHERE deleted=0 ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id FROM logs WHERE deleted=0 AND station=? ORDER BY id DESC LIMIT 1",
+                (station,)
+            ).fetchone()
 
         if not row:
             return None
@@ -166,13 +276,20 @@ def undo_last_entry():
     finally:
         conn.close()
 
-def redo_last_entry():
+def redo_last_entry(station: Optional[str] = None):
+    """Redo the latest entry (of `station` only, if given)"""
     conn = get_conn()
     try:
         # Find most recent DELETED entry (acting as a redo stack)
-        row = conn.execute(
-            "SELECT id FROM logs WHERE deleted=1 ORDER BY id DESC LIMIT 1"
-        ).fetchone()
+        if station is None:
+            row = conn.execute(
+                "SELECT id FROM logs WHERE deleted=1 ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id FROM logs WHERE deleted=1 AND station=? ORDER BY id DESC LIMIT 1",
+                (station,)
+            ).fetchone()
 
         if not row:
             return None
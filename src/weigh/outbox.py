@@ -0,0 +1,404 @@
+# src/weigh/outbox.py
+"""
+Persistent email outbox, sent by a background worker.
+
+The admin panel used to connect, STARTTLS, log in and send inside the
+button callback, so a slow or unreachable SMTP server froze it and a failed
+send lost the report. Now it only queues the email:
+
+    outbox.enqueue(recipient, subject, body, filename, report_path)
+    runtime.get_outbox_worker().wake()
+
+enqueue() links (or copies) the attachment into OUTBOX_DIR and inserts an
+`outbox` row (see outbox.sql), so queued reports survive a restart.
+OutboxWorker, one daemon thread per process, sends every due message over
+one SMTP session and keeps the session open for SESSION_IDLE_S after the
+queue drains, so the next report reuses it; the attachment is streamed from
+its file (report_utils.send_streamed). Per message:
+
+- sent: status 'sent', the attachment file is deleted
+- temporary failure (cannot connect or log in, timeout, 4xx reply, no
+  settings): stays 'queued', retried after RETRY_BASE_S doubling per
+  attempt up to RETRY_MAX_S; the other queued messages wait until then
+  too (the server is most likely down for all of them)
+- permanent failure (5xx reply, attachment file gone): status 'failed'
+  with the error, until retry() queues it again
+
+A message is claimed ('sending') before it is sent, so two processes on one
+database do not both send it; a claim older than CLAIM_TIMEOUT_S (the
+process died) is due again.
+"""
+import logging
+import os
+import secrets
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from weigh import db
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DIR = Path(os.getenv("WEIGHIT_OUTBOX_DIR", os.path.expanduser("~/weighit/outbox")))
+# First retry delay, doubled per failed attempt up to RETRY_MAX_S
+RETRY_BASE_S = float(os.getenv("WEIGHIT_OUTBOX_RETRY", "30"))
+RETRY_MAX_S = float(os.getenv("WEIGHIT_OUTBOX_RETRY_MAX", "3600"))
+# SMTP session kept open this long after the last message
+SESSION_IDLE_S = float(os.getenv("WEIGHIT_SMTP_SESSION_IDLE", "60"))
+SMTP_TIMEOUT_S = float(os.getenv("WEIGHIT_SMTP_TIMEOUT", "30"))
+# The worker also looks for messages queued by other processes this often
+POLL_S = 60.0
+CLAIM_TIMEOUT_S = 600.0
+
+QUEUED = "queued"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(ts: datetime) -> str:
+    return ts.isoformat(timespec="microseconds")
+
+
+@dataclass
+class OutboxStatus:
+    queued: int = 0
+    failed: int = 0
+    # Earliest attempt of a queued message, and the latest error of one
+    next_attempt: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # Error of the latest failed message
+    failed_error: Optional[str] = None
+    last_sent: Optional[dict] = None
+
+
+def enqueue(recipient: str, subject: str, body: str, filename: str, attachment_path,
+            note: Optional[str] = None) -> int:
+    """Queue an email with a copy of attachment_path; returns its outbox id"""
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    stored = OUTBOX_DIR / f"{secrets.token_hex(8)}_{filename}"
+    try:
+        # The report spool file may be replaced later; a link keeps this version
+        os.link(attachment_path, stored)
+    except OSError:
+        shutil.copyfile(attachment_path, stored)
+    if note:
+        body += f"\n\nNote: {note}"
+    now = _iso(_now())
+    conn = db.get_conn()
+    try:
+        cur = conn.execute("""
+            INSERT INTO outbox (created, recipient, subject, body, filename, attachment, next_attempt)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (now, recipient, subject, body, filename, str(stored), now))
+        conn.commit()
+        logger.info(f"Queued email {cur.lastrowid} to {recipient} ({filename})")
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def retry(message_id: Optional[int] = None) -> int:
+    """Make failed (and waiting queued) messages due now; returns how many"""
+    conn = db.get_conn()
+    try:
+        query = "UPDATE outbox SET status=?, next_attempt=? WHERE status IN (?, ?)"
+        params = [QUEUED, _iso(_now()), QUEUED, FAILED]
+        if message_id is not None:
+            query += " AND id=?"
+            params.append(message_id)
+        count = conn.execute(query, params).rowcount
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+
+def get_messages(limit: int = 20) -> List[dict]:
+    """Latest messages, newest first"""
+    conn = db.get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM outbox ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def has_unsent() -> bool:
+    conn = db.get_conn()
+    try:
+        return conn.execute("SELECT 1 FROM outbox WHERE status IN (?, ?) LIMIT 1",
+                            (QUEUED, SENDING)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def get_status() -> OutboxStatus:
+    conn = db.get_conn()
+    try:
+        status = OutboxStatus()
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"):
+            if row["status"] in (QUEUED, SENDING):
+                status.queued += row["n"]
+            elif row["status"] == FAILED:
+                status.failed = row["n"]
+        row = conn.execute("SELECT MIN(next_attempt) FROM outbox WHERE status=?", (QUEUED,)).fetchone()
+        if row[0] is not None:
+            status.next_attempt = datetime.fromisoformat(row[0])
+            row = conn.execute("""
+                SELECT last_error FROM outbox WHERE status=? AND last_error IS NOT NULL
+                ORDER BY id DESC LIMIT 1
+            """, (QUEUED,)).fetchone()
+            status.last_error = row[0] if row is not None else None
+        if status.failed:
+            status.failed_error = conn.execute(
+                "SELECT last_error FROM outbox WHERE status=? ORDER BY id DESC LIMIT 1", (FAILED,)
+            ).fetchone()["last_error"]
+        row = conn.execute("SELECT * FROM outbox WHERE status=? ORDER BY sent_at DESC LIMIT 1",
+                           (SENT,)).fetchone()
+        status.last_sent = dict(row) if row is not None else None
+        return status
+    finally:
+        conn.close()
+
+
+def _due(now: datetime) -> List[dict]:
+    conn = db.get_conn()
+    try:
+        rows = conn.execute("""
+            SELECT * FROM outbox
+            WHERE (status=? AND next_attempt <= ?) OR (status=? AND next_attempt <= ?)
+            ORDER BY id
+        """, (QUEUED, _iso(now), SENDING, _iso(now - timedelta(seconds=CLAIM_TIMEOUT_S)))).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _claim(message: dict, now: datetime) -> bool:
+    """Mark a due message 'sending' unless another worker got it first"""
+    conn = db.get_conn()
+    try:
+        claimed = conn.execute("""
+            UPDATE outbox SET status=?, next_attempt=?, attempts=attempts + 1
+            WHERE id=? AND status=? AND next_attempt=?
+        """, (SENDING, _iso(now), message["id"], message["status"], message["next_attempt"])).rowcount
+        conn.commit()
+        return claimed == 1
+    finally:
+        conn.close()
+
+
+def _finish(message_id: int, status: str, error: Optional[str] = None,
+            next_attempt: Optional[datetime] = None) -> None:
+    now = _now()
+    conn = db.get_conn()
+    try:
+        conn.execute("""
+            UPDATE outbox SET status=?, last_error=?, next_attempt=COALESCE(?, next_attempt),
+                              sent_at=CASE WHEN ? = 'sent' THEN ? END
+            WHERE id=?
+        """, (status, error, _iso(next_attempt) if next_attempt else None, status, _iso(now), message_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _postpone(until: datetime) -> None:
+    """Queued messages due before `until` wait until then (server unavailable)"""
+    conn = db.get_conn()
+    try:
+        conn.execute("UPDATE outbox SET next_attempt=? WHERE status=? AND next_attempt < ?",
+                     (_iso(until), QUEUED, _iso(until)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class _Retry(Exception):
+    """Temporary failure: the message stays queued"""
+
+
+class OutboxWorker:
+    """
+    Sends the outbox (see module docstring). start() launches the daemon
+    thread; run_once() sends what is due in the calling thread.
+    `settings` returns the report_utils.SMTPSettings to use (default: the
+    secrets file, read again for every batch).
+    """
+
+    def __init__(self, settings: Optional[Callable[[], object]] = None,
+                 retry_base_s: float = RETRY_BASE_S, retry_max_s: float = RETRY_MAX_S,
+                 session_idle_s: float = SESSION_IDLE_S, timeout_s: float = SMTP_TIMEOUT_S):
+        self._settings = settings
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self.session_idle_s = session_idle_s
+        self.timeout_s = timeout_s
+        self._smtp = None
+        self._smtp_key = None
+        self._session_until = 0.0  # time.monotonic()
+        # SMTP sessions opened so far
+        self.connections = 0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> "OutboxWorker":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self) -> None:
+        """Look at the queue now (a message was queued)"""
+        self._wake.set()
+
+    def retry_now(self, message_id: Optional[int] = None) -> int:
+        """retry() and look at the queue now"""
+        count = retry(message_id)
+        self.wake()
+        return count
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {type(e).__name__}: {e}")
+            self._wake.wait(self._wait_s())
+
+    def _wait_s(self) -> float:
+        wait = POLL_S
+        if self._smtp is not None:
+            wait = min(wait, max(self._session_until - time.monotonic(), 0.0))
+        next_attempt = get_status().next_attempt
+        if next_attempt is not None:
+            wait = min(wait, max((next_attempt - _now()).total_seconds(), 0.0))
+        return max(wait, 0.05)
+
+    def run_once(self) -> int:
+        """Send every due message; returns how many were sent"""
+        with self._lock:
+            sent = 0
+            for message in _due(_now()):
+                if self._stopped or not _claim(message, _now()):
+                    continue
+                status = self._send(message)
+                if status == SENT:
+                    sent += 1
+                elif status == QUEUED:
+                    # The others would most likely fail the same way
+                    break
+            if self._smtp is not None and (self._stopped or time.monotonic() >= self._session_until):
+                self._close_session()
+            return sent
+
+    def _send(self, message: dict) -> str:
+        """Send one claimed message; returns its new status"""
+        import smtplib
+        from weigh import report_utils
+
+        attempts = message["attempts"] + 1
+        try:
+            if not os.path.exists(message["attachment"]):
+                raise FileNotFoundError(f"Attachment {message['attachment']} is gone")
+            try:
+                settings = (self._settings or report_utils.smtp_settings)()
+                server = self._session(settings)
+            except (OSError, smtplib.SMTPException, ValueError) as e:
+                self._close_session()
+                raise _Retry(e)
+            msg = report_utils.build_message(settings.sender, message["recipient"], message["subject"],
+                                             message["body"], message["filename"])
+            try:
+                with open(message["attachment"], "rb") as f:
+                    report_utils.send_streamed(server, settings.sender, message["recipient"],
+                                               report_utils.iter_message(msg, f))
+            except smtplib.SMTPRecipientsRefused as e:
+                self._reset_session()
+                codes = [code for code, _ in e.recipients.values()]
+                if min(codes) < 500:
+                    raise _Retry(e)
+                raise
+            except smtplib.SMTPResponseException as e:
+                self._reset_session()
+                if e.smtp_code < 500:
+                    raise _Retry(e)
+                raise
+            except (OSError, smtplib.SMTPException) as e:
+                self._close_session()
+                raise _Retry(e)
+        except _Retry as e:
+            error = _describe(e.args[0])
+            delay = min(self.retry_max_s, self.retry_base_s * 2 ** (attempts - 1))
+            retry_at = _now() + timedelta(seconds=delay)
+            _finish(message["id"], QUEUED, error, retry_at)
+            _postpone(retry_at)
+            logger.warning(f"Email {message['id']} not sent ({error}), retrying in {delay:.0f} s")
+            return QUEUED
+        except Exception as e:
+            error = _describe(e)
+            _finish(message["id"], FAILED, error)
+            logger.error(f"Email {message['id']} to {message['recipient']} failed: {error}")
+            return FAILED
+
+        _finish(message["id"], SENT)
+        Path(message["attachment"]).unlink(missing_ok=True)
+        self._session_until = time.monotonic() + self.session_idle_s
+        logger.info(f"Sent email {message['id']} to {message['recipient']}")
+        return SENT
+
+    def _session(self, settings):
+        """The open SMTP session for settings (checked with NOOP), or a new one"""
+        from weigh import report_utils
+
+        if self._smtp is not None and self._smtp_key == settings:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except Exception:
+                pass
+        self._close_session()
+        self._smtp = report_utils.open_smtp(settings, timeout=self.timeout_s)
+        self._smtp_key = settings
+        self.connections += 1
+        return self._smtp
+
+    def _reset_session(self) -> None:
+        """Abort the refused transaction but keep the session"""
+        try:
+            self._smtp.rset()
+        except Exception:
+            self._close_session()
+
+    def _close_session(self) -> None:
+        smtp, self._smtp, self._smtp_key = self._smtp, None, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def close(self) -> None:
+        self._stopped = True
+        self.wake()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout_s)
+        with self._lock:
+            self._close_session()
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
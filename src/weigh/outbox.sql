@@ -0,0 +1,23 @@
+-- outbox.sql
+-- Applied after schema.sql, and to existing databases on first connection
+-- (every statement is idempotent).
+--
+-- Emails waiting to be sent by the background worker (see outbox.py). A
+-- row is kept after it is sent, for the admin panel's status.
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    created      TEXT NOT NULL,                   -- UTC ISO timestamps
+    recipient    TEXT NOT NULL,
+    subject      TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    filename     TEXT NOT NULL,
+    attachment   TEXT NOT NULL,                   -- file in the outbox directory
+    status       TEXT NOT NULL DEFAULT 'queued',  -- 'queued', 'sending', 'sent' or 'failed'
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt TEXT NOT NULL,                   -- 'sending': when it was claimed
+    last_error   TEXT,
+    sent_at      TEXT
+);
+
+CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, next_attempt);
@@ -0,0 +1,151 @@
+# src/weigh/prewarm.py
+"""
+Prewarm the kiosk server before the first volunteer connects.
+
+    weigh prewarm                      warm disk caches and report step timings
+    weigh prewarm --serve [ARGS...]    warm, then start the kiosk in this process
+                                       (ARGS are passed to `streamlit run`)
+
+Without prewarming, opening the scale, the schema check, the first DB reads,
+logo rendering and CSS/JS publishing all happen inside the first browser
+session. With --serve (used by launch.sh) they run in the server process
+itself before Streamlit starts listening, so the process-wide resources in
+weigh.runtime (scale reader, live weight stream, time monitor, and the
+outbox worker if emails are still queued) and the in-memory asset index are
+already in place when the first session starts.
+Each step is timed; a failing step (e.g. no scale plugged in) is reported
+and the remaining steps still run.
+"""
+import importlib
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from weigh import asset_pipeline, db, db_backend, history, logger_core, runtime, stations, weight_stream
+
+logger = logging.getLogger(__name__)
+
+APP_PATH = Path(__file__).parent / "app.py"
+# Imported by the first render but not by the modules above
+FIRST_RENDER_MODULES = ("streamlit", "streamlit.emojis", "weigh.batch_weigh", "weigh.profiling")
+
+
+@dataclass
+class StepResult:
+    name: str
+    ms: float
+    error: Optional[str] = None
+
+
+def open_scale() -> None:
+    """Open the scale of every station (see stations.py)."""
+    for path in sorted({station.scale or "" for station in stations.all_stations().values()}):
+        runtime.get_scale(path or None)
+        if weight_stream.WEIGHT_PUSH:
+            runtime.get_weight_stream(path or None)
+
+
+def start_time_monitor() -> None:
+    runtime.get_time_monitor()
+
+
+def resume_outbox() -> None:
+    """Start sending emails queued before the restart, if any."""
+    from weigh import outbox
+    if outbox.has_unsent():
+        runtime.get_outbox_worker()
+
+
+def warm_database() -> None:
+    """Schema check, then read the whole logs table and the first screen's queries."""
+    db.initialize_schema_if_needed()
+    conn = db.get_conn()
+    try:
+        # Pulls every table page into the OS cache
+        conn.execute("SELECT COUNT(*), SUM(weight_lb) FROM logs").fetchone()
+    finally:
+        conn.close()
+
+    sources = sorted(logger_core.get_sources_dict().keys())
+    logger_core.get_types_dict()
+    today = datetime.now(timezone.utc).date().isoformat()
+    # Each station's first screen: its default donor, else the first one
+    first = {station.source if station.source in sources else (sources[0] if sources else None)
+             for station in stations.all_stations().values()}
+    for source in sorted(first, key=str):
+        db_backend.get_daily_totals(source=source, date=today)
+        # Loads the shared history view the first screen shows
+        history.get_rows(source, today)
+
+
+def warm_assets() -> None:
+    """Render the header logos and publish the kiosk CSS/JS."""
+    for logo in asset_pipeline.KIOSK_LOGOS:
+        asset_pipeline.render_image(logo, asset_pipeline.LOGO_HEIGHT_PX)
+    for asset in (asset_pipeline.ASSETS_DIR / "style.css", asset_pipeline.ASSETS_DIR / "kiosk.js"):
+        asset_pipeline.publish(asset)
+
+
+def import_modules() -> None:
+    for name in FIRST_RENDER_MODULES:
+        importlib.import_module(name)
+
+
+STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("open scale", open_scale),
+    ("time status monitor", start_time_monitor),
+    ("database", warm_database),
+    ("email outbox", resume_outbox),
+    ("assets", warm_assets),
+    ("imports", import_modules),
+]
+
+
+def run(steps: Sequence[Tuple[str, Callable[[], None]]] = STEPS) -> List[StepResult]:
+    results = []
+    for name, step in steps:
+        started = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        result = StepResult(name, (time.perf_counter() - started) * 1000.0, error)
+        logger.info(f"Prewarm {name}: {result.ms:.1f} ms" + (f" ({error})" if error else ""))
+        results.append(result)
+    return results
+
+
+def format_report(results: List[StepResult]) -> str:
+    lines = ["Prewarm:"]
+    for r in results:
+        status = f"  FAILED: {r.error}" if r.error else ""
+        lines.append(f"  {r.name:22s} {r.ms:8.1f} ms{status}")
+    lines.append(f"  {'total':22s} {sum(r.ms for r in results):8.1f} ms")
+    return "\n".join(lines)
+
+
+def serve(streamlit_args: Sequence[str] = ()) -> None:
+    """Start the kiosk in this process (same as `streamlit run app.py ARGS`)."""
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", str(APP_PATH), *streamlit_args]
+    stcli.main()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    serve_after = "--serve" in args
+    if serve_after:
+        args.remove("--serve")
+    print(format_report(run()), flush=True)
+    if serve_after:
+        serve(args)
+
+
+if __name__ == "__main__":
+    main()
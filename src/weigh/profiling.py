@@ -0,0 +1,59 @@
+# src/weigh/profiling.py
+"""
+Lightweight timing of kiosk script runs and fragments.
+
+Enable with WEIGHIT_PROFILE_RERUNS=1: every timed section logs its wall time
+and is kept in a small in-memory ring buffer (used by the benchmarks).
+When disabled, timed()/profiled() cost one boolean check.
+"""
+import functools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_RERUNS = os.getenv("WEIGHIT_PROFILE_RERUNS", "0") == "1"
+
+_records: Deque[Tuple[str, float]] = deque(maxlen=1000)
+
+
+def record(name: str, started: float) -> None:
+    """Record a section that started at time.perf_counter() value `started`."""
+    if not PROFILE_RERUNS:
+        return
+    ms = (time.perf_counter() - started) * 1000.0
+    _records.append((name, ms))
+    logger.info(f"{name}: {ms:.1f} ms")
+
+
+@contextmanager
+def timed(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, started)
+
+
+def profiled(name: str):
+    """Decorator version of timed() (place it under @st.fragment)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def recent(name: Optional[str] = None) -> List[Tuple[str, float]]:
+    """Recorded (section, milliseconds) pairs, optionally for one section."""
+    return [r for r in _records if name is None or r[0] == name]
+
+
+def clear() -> None:
+    _records.clear()
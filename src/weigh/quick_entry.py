@@ -0,0 +1,144 @@
+# src/weigh/quick_entry.py
+"""
+Hotkeys and barcode scanners: keyboard input mapped to kiosk actions.
+
+kiosk.js collects keystrokes that are not typed into an input field. A
+single key is a hotkey; a burst of keys (a USB barcode scanner types a
+whole code, usually followed by Enter, within a few ms) is one scan. The
+tokens collected while the previous batch is still being handled are sent
+together, as one value of a hidden text input, so a burst costs one rerun
+however many keys it has:
+
+    "key:1" SEP "scan:4011" SEP "scan:SOURCE:Wegmans" ...   (SEP = SEPARATOR)
+
+QuickEntry.resolve() turns each token into an Action, the stable API the
+kiosk dispatches on (log a type, select a donor, undo, redo, cancel):
+
+- hotkeys: "1".."9" log the nth type button, unless [hotkeys] maps the key
+- scans: a code from [barcodes], a label "TYPE:<type>" / "SOURCE:<donor>" /
+  "UNDO" / "REDO" / "CANCEL", or just a type or donor name (any case)
+
+    # ~/weighit/quick_entry.toml (or WEIGHIT_QUICK_ENTRY_FILE)
+    [barcodes]
+    "0001" = "source:Wegmans"
+    "4011" = "type:Produce"
+
+    [hotkeys]
+    "u" = "undo"
+"""
+import logging
+import os
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+QUICK_ENTRY_FILE = Path(os.getenv("WEIGHIT_QUICK_ENTRY_FILE", os.path.expanduser("~/weighit/quick_entry.toml")))
+# Between the tokens of one batch (an <input> value cannot hold newlines)
+SEPARATOR = "\x1e"
+
+LOG = "log"
+SOURCE = "source"
+UNDO = "undo"
+REDO = "redo"
+CANCEL = "cancel"
+
+# Label prefixes accepted for each kind ("TYPE:Produce", "donor:Wegmans")
+_PREFIXES = {"type": LOG, "log": LOG, "source": SOURCE, "donor": SOURCE}
+_COMMANDS = {UNDO, REDO, CANCEL}
+
+
+@dataclass(frozen=True)
+class Action:
+    kind: str
+    # Type name (LOG) or donor name (SOURCE)
+    value: Optional[str] = None
+
+
+def split_batch(batch: str) -> List[str]:
+    """Tokens of one hidden-input value, in the order they were typed"""
+    return [token for token in batch.split(SEPARATOR) if token]
+
+
+def parse_action(text: str) -> Optional[Action]:
+    """Action for a label such as "type:Produce" or "undo" (None if not one)"""
+    text = text.strip()
+    if text.lower() in _COMMANDS:
+        return Action(text.lower())
+    prefix, sep, value = text.partition(":")
+    kind = _PREFIXES.get(prefix.strip().lower())
+    if sep and kind and value.strip():
+        return Action(kind, value.strip())
+    return None
+
+
+class QuickEntry:
+    """Resolves tokens against the current donors and types"""
+
+    def __init__(self, sources: Sequence[str], types: Sequence[str],
+                 barcodes: Dict[str, str] = None, hotkeys: Dict[str, str] = None):
+        self._sources = {name.lower(): name for name in sources}
+        self._types = {name.lower(): name for name in types}
+        self._barcodes = dict(barcodes or {})
+        # Default hotkeys: 1..9 log the type buttons in screen order
+        self._hotkeys = {str(i + 1): f"type:{name}" for i, name in enumerate(types[:9])}
+        self._hotkeys.update(hotkeys or {})
+
+    def resolve(self, token: str) -> Optional[Action]:
+        """Action for a "key:..." or "scan:..." token (None = not understood)"""
+        source, _, text = token.partition(":")
+        if source == "key":
+            label = self._hotkeys.get(text)
+            return self._checked(parse_action(label)) if label else None
+        if source != "scan":
+            return None
+        code = text.strip()
+        if code in self._barcodes:
+            return self._checked(parse_action(self._barcodes[code]))
+        action = parse_action(code)
+        if action is not None:
+            return self._checked(action)
+        if code.lower() in self._types:
+            return Action(LOG, self._types[code.lower()])
+        if code.lower() in self._sources:
+            return Action(SOURCE, self._sources[code.lower()])
+        return None
+
+    def _checked(self, action: Optional[Action]) -> Optional[Action]:
+        """Action with the canonical type/donor name (None if there is no such one)"""
+        if action is None or action.kind in _COMMANDS:
+            return action
+        names = self._types if action.kind == LOG else self._sources
+        name = names.get(action.value.lower())
+        return Action(action.kind, name) if name else None
+
+
+_config: Optional[dict] = None
+
+
+def load_config(path: Path = None) -> dict:
+    """[barcodes] and [hotkeys] tables of the config file (read once per process)"""
+    global _config
+    if _config is None or path is not None:
+        path = path or QUICK_ENTRY_FILE
+        _config = {}
+        if path.exists():
+            with open(path, "rb") as f:
+                config = tomllib.load(f)
+            _config = {table: {str(k): str(v) for k, v in config.get(table, {}).items()}
+                       for table in ("barcodes", "hotkeys")}
+            logger.info(f"Loaded {len(_config['barcodes'])} barcode(s) from {path}")
+    return _config
+
+
+def get_quick_entry(sources: Sequence[str], types: Sequence[str]) -> QuickEntry:
+    config = load_config()
+    return QuickEntry(sources, types, config.get("barcodes"), config.get("hotkeys"))
+
+
+def reset() -> None:
+    """Forget the loaded config (tests)."""
+    global _config
+    _config = None
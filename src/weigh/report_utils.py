@@ -1,45 +1,69 @@
 # src/weigh/report_utils.py
 import csv
 import io
-import smtplib
-from collections import defaultdict
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
 import streamlit as st
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email.mime.text import MIMEText
-from email import encoders
-from weigh import logger_core
-
-def generate_report_csv(start_date, end_date):
-    # 1. Fetch Data
-    logs = logger_core.get_logs_between(start_date, end_date)
-    
-    # 2. Calculate Summaries: totals[source][type] = {weight, pickup_temps, dropoff_temps}
-    totals = defaultdict(lambda: defaultdict(lambda: {
-        'weight': 0.0,
-        'pickup_temps': [],
-        'dropoff_temps': []
-    }))
-
-    for row in logs:
-        src = row["source"]
-        typ = row["type"]
-        totals[src][typ]['weight'] += row["weight_lb"]
-
-        # Collect temperature data separately for pickup and dropoff
-        if row.get('temp_pickup_f') is not None:
-            totals[src][typ]['pickup_temps'].append(row['temp_pickup_f'])
-        if row.get('temp_dropoff_f') is not None:
-            totals[src][typ]['dropoff_temps'].append(row['temp_dropoff_f'])
+from weigh import db, logger_core, summary_cache
+
+# Reports kept by get_report_file, keyed by (start, end, format, data-change token)
+REPORT_CACHE_SIZE = 8
+_report_cache: "OrderedDict[Tuple[str, str, str, int], Path]" = OrderedDict()
+_report_lock = threading.Lock()
+
+# Encoded CSV is handed out in chunks of about this size
+REPORT_CHUNK_SIZE = 64 * 1024
+# Where cached reports are spooled (default: a temp dir per process)
+REPORT_SPOOL_DIR = os.getenv("WEIGHIT_REPORT_SPOOL_DIR", "")
+_spool_dir: Optional[Path] = None
+
+# Rows per Detail sheet of the xlsx report, header included (Excel's limit)
+XLSX_DETAIL_ROWS = 1_048_576
+
+# Attachments are base64-encoded this many bytes at a time (whole 76-char lines)
+EMAIL_CHUNK_SIZE = 57 * 1024
+
+def generate_report_csv(start_date, end_date) -> bytes:
+    """The whole report as one byte string (see iter_report_csv)."""
+    return b"".join(iter_report_csv(start_date, end_date))
+
+def iter_report_csv(start_date, end_date) -> Iterator[bytes]:
+    """
+    Summary (per source and type) followed by every entry of the range,
+    as UTF-8 chunks of about REPORT_CHUNK_SIZE bytes.
+
+    The summary is composed from per-day blocks (summary_cache: stored once
+    per closed day, today aggregated live from the logs), so the raw entries of
+    closed days are not read for it; the detailed section is read from the
+    cursor and handed out as it fills a chunk, so memory does not grow with
+    the range.
+    """
+    # 1. Summaries: totals[source][type] = {weight, avg_pickup, avg_dropoff, ...}
+    totals = defaultdict(dict)
+    for row in summary_cache.summarize_between(start_date, end_date):
+        totals[row["source"]][row["type"]] = row
 
     buf = io.StringIO()
     writer = csv.writer(buf)
 
-    # 3. Calculate Grand Total (all sources, all types)
+    def take_chunk() -> bytes:
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    # 2. Calculate Grand Total (all sources, all types)
     grand_total = 0.0
     for src_data in totals.values():
         for type_data in src_data.values():
-            grand_total += type_data['weight']
+            grand_total += type_data['weight_lb']
 
     # Write Summary Section with Grand Total
     writer.writerow(["SUMMARY REPORT", f"{start_date} to {end_date}"])
@@ -52,15 +76,15 @@ def generate_report_csv(start_date, end_date):
         # Separate temp-controlled and non-temp items
         temp_items = {}
         non_temp_items = {}
-        
+
         for typ, data in totals[src].items():
-            if data['pickup_temps'] or data['dropoff_temps']:  # Has temperature data
+            if data['temp_pickup_count'] or data['temp_dropoff_count']:  # Has temperature data
                 temp_items[typ] = data
             else:
                 non_temp_items[typ] = data
-        
+
         # Calculate mini grand total for this source
-        source_total = sum(data['weight'] for data in totals[src].values())
+        source_total = sum(data['weight_lb'] for data in totals[src].values())
 
         # Write source name and mini total
         writer.writerow([src])
@@ -72,89 +96,323 @@ def generate_report_csv(start_date, end_date):
 
         # Non-temperature items (with empty temp columns)
         for typ in sorted(non_temp_items.keys()):
-            weight = non_temp_items[typ]['weight']
+            weight = non_temp_items[typ]['weight_lb']
             writer.writerow([typ, f"{weight:.2f}", "", ""])
 
         # Temperature-controlled items (with temp data)
         for typ in sorted(temp_items.keys()):
             data = temp_items[typ]
-            weight = data['weight']
-            avg_pickup = f"{sum(data['pickup_temps']) / len(data['pickup_temps']):.1f}" if data['pickup_temps'] else ""
-            avg_dropoff = f"{sum(data['dropoff_temps']) / len(data['dropoff_temps']):.1f}" if data['dropoff_temps'] else ""
+            weight = data['weight_lb']
+            avg_pickup = f"{data['temp_pickup_avg']:.1f}" if data['temp_pickup_count'] else ""
+            avg_dropoff = f"{data['temp_dropoff_avg']:.1f}" if data['temp_dropoff_count'] else ""
             writer.writerow([typ, f"{weight:.2f}", avg_pickup, avg_dropoff])
 
         # Blank line between sources
         writer.writerow([])
-            
+
     writer.writerow([]) # Extra blank line before detailed section
-    
-    # 4. Write Detailed Section
+
+    # 3. Write Detailed Section
     writer.writerow(["DETAILED LOGS"])
     writer.writerow(["Timestamp", "Source", "Type", "Weight (lb)", "Pickup Temp (°F)", "Dropoff Temp (°F)"])
 
-    for row in logs:
+    for row in logger_core.iter_logs_between(start_date, end_date):
         # Format temperature values
         temp_pickup = f"{row['temp_pickup_f']:.1f}" if row.get('temp_pickup_f') is not None else ""
         temp_dropoff = f"{row['temp_dropoff_f']:.1f}" if row.get('temp_dropoff_f') is not None else ""
-        
+
         writer.writerow([
-            row["timestamp"], 
-            row["source"], 
-            row["type"], 
+            row["timestamp"],
+            row["source"],
+            row["type"],
             row["weight_lb"],
             temp_pickup,
             temp_dropoff
         ])
+        if buf.tell() >= REPORT_CHUNK_SIZE:
+            yield take_chunk()
+
+    yield take_chunk()
 
-    return buf.getvalue().encode("utf-8")
+def spool_dir() -> Path:
+    global _spool_dir
+    if _spool_dir is None:
+        if REPORT_SPOOL_DIR:
+            _spool_dir = Path(REPORT_SPOOL_DIR)
+            _spool_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            _spool_dir = Path(tempfile.mkdtemp(prefix="weighit-reports-"))
+    return _spool_dir
 
-def send_email_with_attachment(to_email, subject, body, attachment_bytes, filename, note=None):
+# Report formats: MIME type of each
+REPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def write_report_xlsx(start_date, end_date, f: BinaryIO) -> None:
     """
-    Sends an email using credentials from .streamlit/secrets.toml
-    
-    Args:
-        to_email: Recipient email address
-        subject: Email subject line
-        body: Email body text
-        attachment_bytes: CSV file bytes to attach
-        filename: Name of the attachment file
-        note: Optional note to append to the email body
+    The report as an Excel workbook with three sheets, streamed to f:
+
+    - Summary: grand total, then totals per donor and per type
+    - Per-Source: one row per donor and type (weight, entries, average temps)
+    - Detail: every entry (more than one sheet past Excel's row limit)
+
+    Rows are written as they are read (xlsx_writer streams each sheet into
+    the zip), so memory does not grow with the range.
     """
-    # 1. Load Secrets
+    from weigh import xlsx_writer as xw
+
+    summary = summary_cache.summarize_between(start_date, end_date)
+    grand_total = 0.0
+    by_source = defaultdict(lambda: [0.0, 0])
+    by_type = defaultdict(lambda: [0.0, 0])
+    for row in summary:
+        grand_total += row["weight_lb"]
+        for totals in (by_source[row["source"]], by_type[row["type"]]):
+            totals[0] += row["weight_lb"]
+            totals[1] += row["entries"]
+
+    with xw.Workbook(f) as book:
+        with book.sheet("Summary", widths=[30, 20, 10]) as sheet:
+            sheet.row(["SUMMARY REPORT", f"{start_date} to {end_date}"], [xw.BOLD, xw.DEFAULT])
+            sheet.row([])
+            sheet.row(["GRAND TOTAL (All Sources)", grand_total, "lb"], [xw.BOLD, xw.DECIMAL_2, xw.DEFAULT])
+            sheet.row(["Entries", sum(t[1] for t in by_source.values())])
+            for title, totals in (("Source", by_source), ("Type", by_type)):
+                sheet.row([])
+                sheet.header([title, "Total Weight (lb)", "Entries"])
+                for name in sorted(totals):
+                    sheet.row([name, totals[name][0], totals[name][1]], [xw.DEFAULT, xw.DECIMAL_2, xw.DEFAULT])
+
+        with book.sheet("Per-Source", widths=[28, 12, 18, 10, 22, 22], freeze_header=True) as sheet:
+            sheet.header(["Source", "Type", "Total Weight (lb)", "Entries",
+                          "Avg Pickup Temp (°F)", "Avg Dropoff Temp (°F)"])
+            styles = [xw.DEFAULT, xw.DEFAULT, xw.DECIMAL_2, xw.DEFAULT, xw.DECIMAL_1, xw.DECIMAL_1]
+            for row in sorted(summary, key=lambda r: (r["source"], r["type"])):
+                sheet.row([row["source"], row["type"], row["weight_lb"], row["entries"],
+                           row["temp_pickup_avg"], row["temp_dropoff_avg"]], styles)
+
+        header = ["Timestamp (UTC)", "Source", "Type", "Weight (lb)", "Pickup Temp (°F)", "Dropoff Temp (°F)"]
+        styles = [xw.DATETIME, xw.DEFAULT, xw.DEFAULT, xw.DEFAULT, xw.DECIMAL_1, xw.DECIMAL_1]
+        rows = logger_core.iter_logs_between(start_date, end_date)
+        row = next(rows, None)  # read ahead, so a full sheet is not followed by an empty one
+        part = 1
+        while True:
+            name = "Detail" if part == 1 else f"Detail {part}"
+            with book.sheet(name, widths=[20, 28, 12, 12, 18, 18], freeze_header=True) as sheet:
+                sheet.header(header)
+                while row is not None and sheet.rows < XLSX_DETAIL_ROWS:
+                    sheet.row([_parse_timestamp(row["timestamp"]), row["source"], row["type"], row["weight_lb"],
+                               row["temp_pickup_f"], row["temp_dropoff_f"]], styles)
+                    row = next(rows, None)
+            if row is None:
+                break
+            part += 1
+
+def _parse_timestamp(text: str):
+    """Stored ISO timestamp as a datetime (left as text if it is not one)"""
+    try:
+        return datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return text
+
+def get_report_file(start_date, end_date, fmt: str = "csv") -> Path:
+    """
+    The report (iter_report_csv or write_report_xlsx, by fmt) spooled to a
+    file, cached until any log entry changes.
+
+    The key includes the change-feed token (db.fetch_change_token), so a
+    repeated download or email of the same range reuses the file and any
+    insert/undo/redo makes the next request regenerate. The file is written
+    chunk by chunk, so memory stays bounded however long the range is.
+    """
+    if fmt not in REPORT_MIME_TYPES:
+        raise ValueError(f"Unknown report format {fmt!r}")
+    token = db.fetch_change_token()
+    key = (start_date, end_date, fmt, token)
+    with _report_lock:
+        path = _report_cache.get(key)
+        if path is not None and path.exists():
+            _report_cache.move_to_end(key)
+            return path
+
+    directory = spool_dir()
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        if fmt == "xlsx":
+            write_report_xlsx(start_date, end_date, f)
+        else:
+            for chunk in iter_report_csv(start_date, end_date):
+                f.write(chunk)
+    path = directory / f"report_{start_date}_{end_date}_{token}.{fmt}"
+    os.replace(tmp, path)
+
+    with _report_lock:
+        # Entries for older tokens can never be hit again
+        stale = [_report_cache.pop(k) for k in list(_report_cache) if k[3] != token]
+        _report_cache[key] = path
+        _report_cache.move_to_end(key)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            stale.append(_report_cache.popitem(last=False)[1])
+    for old in stale:
+        # An open reader keeps its copy until it closes the file
+        old.unlink(missing_ok=True)
+    return path
+
+def get_report_csv(start_date, end_date) -> bytes:
+    """get_report_file() read into memory (for APIs that need the bytes)."""
+    return get_report_file(start_date, end_date).read_bytes()
+
+def get_report_bytes(start_date, end_date, fmt: str = "csv") -> bytes:
+    """get_report_file() of any format read into memory."""
+    return get_report_file(start_date, end_date, fmt).read_bytes()
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    server: str
+    port: int
+    sender: str
+    password: str = ""
+    # STARTTLS before login (smtp_starttls = false for a local relay)
+    starttls: bool = True
+
+def smtp_settings() -> SMTPSettings:
+    """The [email] section of .streamlit/secrets.toml"""
     try:
         secrets = st.secrets["email"]
-        SMTP_SERVER = secrets["smtp_server"]
-        SMTP_PORT = secrets["smtp_port"]
-        SENDER_EMAIL = secrets["sender_email"]
-        SENDER_PASSWORD = secrets["sender_password"]
+        return SMTPSettings(
+            server=secrets["smtp_server"],
+            port=int(secrets["smtp_port"]),
+            sender=secrets["sender_email"],
+            password=secrets["sender_password"],
+            starttls=bool(secrets.get("smtp_starttls", True)),
+        )
     except Exception:
         raise ValueError("Secrets not configured. Check .streamlit/secrets.toml")
 
-    # 2. Setup Message
+def open_smtp(settings: SMTPSettings, timeout: Optional[float] = None):
+    """Connected (STARTTLS, logged in) smtplib.SMTP session"""
+    import smtplib
+
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    server = smtplib.SMTP(settings.server, settings.port, **kwargs)
+    try:
+        if settings.starttls:
+            server.starttls()
+        if settings.password:
+            server.login(settings.sender, settings.password)
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+def build_message(sender, to_email, subject, body, filename, note=None):
+    """
+    The report email with a placeholder attachment, for iter_message()
+    (the attachment is base64-encoded from its file while sending).
+    """
+    # The SMTP/MIME stack is only loaded when a report is actually emailed
+    from email.mime.base import MIMEBase
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     msg = MIMEMultipart()
-    msg['From'] = SENDER_EMAIL
+    msg['From'] = sender
     msg['To'] = to_email
     msg['Subject'] = subject
-    
+
     # Append note to body if provided
     email_body = body
     if note:
         email_body += f"\n\nNote: {note}"
-    
+
     msg.attach(MIMEText(email_body, 'plain'))
 
-    # 3. Attach CSV
     part = MIMEBase('application', 'octet-stream')
-    part.set_payload(attachment_bytes)
-    encoders.encode_base64(part)
+    part.set_payload(_ATTACHMENT_PLACEHOLDER)
+    part['Content-Transfer-Encoding'] = 'base64'
     part.add_header(
         'Content-Disposition',
         f'attachment; filename="{filename}"',
     )
     msg.attach(part)
+    return msg
+
+def send_email_with_attachment(to_email, subject, body, attachment_bytes, filename, note=None,
+                               attachment_path=None):
+    """
+    Sends an email right away (in the calling thread) using credentials
+    from .streamlit/secrets.toml. The kiosk queues reports in the outbox
+    instead (outbox.enqueue), so a slow server does not block it.
+
+    Args:
+        to_email: Recipient email address
+        subject: Email subject line
+        body: Email body text
+        attachment_bytes: CSV file bytes to attach (or None with attachment_path)
+        filename: Name of the attachment file
+        note: Optional note to append to the email body
+        attachment_path: File to attach instead of attachment_bytes; it is
+            encoded and sent in chunks, never read into memory whole
+    """
+    settings = smtp_settings()
+    msg = build_message(settings.sender, to_email, subject, body, filename, note)
+
+    if attachment_path is not None:
+        attachment = open(attachment_path, "rb")
+    else:
+        attachment = io.BytesIO(attachment_bytes)
+    with attachment, open_smtp(settings) as server:
+        send_streamed(server, settings.sender, to_email, iter_message(msg, attachment))
+
+_ATTACHMENT_PLACEHOLDER = "@@WEIGHIT-ATTACHMENT@@"
+
+def iter_message(msg, attachment: BinaryIO) -> Iterator[bytes]:
+    """
+    msg (CRLF line endings) with its placeholder payload replaced by the
+    base64 of attachment, encoded EMAIL_CHUNK_SIZE bytes at a time.
+    """
+    import base64
+
+    # Flattened the way smtplib.SMTP.send_message() does it
+    flat = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+    head, _, tail = flat.partition(_ATTACHMENT_PLACEHOLDER.encode())
+    yield head
+    encoded = False
+    while True:
+        chunk = attachment.read(EMAIL_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield base64.encodebytes(chunk).replace(b"\n", b"\r\n")
+        encoded = True
+    # The last base64 line already ends the payload
+    yield tail[2:] if encoded else tail
+
+def send_streamed(server, sender: str, recipient: str, chunks: Iterator[bytes]) -> None:
+    """
+    smtplib's sendmail() for a message given as chunks: MAIL, RCPT, then
+    DATA written chunk by chunk (chunks start at line boundaries).
+    """
+    import smtplib
 
-    # 4. Connect & Send
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.send_message(msg)
+    server.ehlo_or_helo_if_needed()
+    code, resp = server.mail(sender)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, resp, sender)
+    code, resp = server.rcpt(recipient)
+    if code not in (250, 251):
+        raise smtplib.SMTPRecipientsRefused({recipient: (code, resp)})
+    code, resp = server.docmd("data")
+    if code != 354:
+        raise smtplib.SMTPDataError(code, resp)
+    ending = b""
+    for chunk in chunks:
+        if chunk:
+            # Dot-stuffing, as smtplib.SMTP.data() does
+            server.send(re.sub(rb"(?m)^\.", b"..", chunk))
+            ending = chunk[-2:]
+    server.send((b"" if ending == b"\r\n" else b"\r\n") + b".\r\n")
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
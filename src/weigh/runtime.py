@@ -0,0 +1,84 @@
+# src/weigh/runtime.py
+"""
+Process-wide kiosk resources.
+
+The idle governor, scale readers (one per scale), live weight stream, entry
+writer, time-status monitor and outbox worker exist once per server process. They used to be st.cache_resource functions
+in app.py, so they were only created inside the first browser session;
+living here, `weigh prewarm` can create them before any browser connects and
+every session of the same process reuses them.
+
+A factory that raises is not cached, so the next call tries again (e.g. the
+scale was plugged in later).
+"""
+import threading
+from typing import Callable, Dict, Optional
+
+from weigh import entry_flow, idle_governor, scale_backend, weight_stream
+
+# Re-entrant: get_scale() creates the governor from inside its factory
+_lock = threading.RLock()
+_instances: Dict[str, object] = {}
+
+
+def _singleton(name: str, factory: Callable[[], object]):
+    with _lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def get_idle_governor() -> "idle_governor.IdleGovernor":
+    """One governor per process, shared by the scale reader and all sessions"""
+    return _singleton("idle_governor", idle_governor.IdleGovernor)
+
+
+def get_scale(path: Optional[str] = None) -> "scale_backend.DymoHIDScale":
+    """Reader of the scale at HID `path` (None = first Dymo scale found)"""
+    if path is None:
+        return _singleton("scale", lambda: scale_backend.DymoHIDScale(governor=get_idle_governor()))
+    return _singleton(f"scale:{path}",
+                      lambda: scale_backend.DymoHIDScale(governor=get_idle_governor(), path=path))
+
+
+def get_weight_stream(scale_path: Optional[str] = None) -> Optional["weight_stream.WeightStreamServer"]:
+    """
+    Live weight SSE endpoint (None = port unavailable). One server streams
+    every scale; the scale at `scale_path` is added to it on first use.
+    """
+    name = scale_path or ""
+    server = _singleton("weight_stream", lambda: weight_stream.start_weight_stream(
+        get_scale(scale_path), name=name))
+    if server is not None and name not in server.broadcasters:
+        with _lock:
+            if name not in server.broadcasters:
+                server.add_scale(name, get_scale(scale_path))
+    return server
+
+
+def get_entry_writer() -> "entry_flow.EntryWriter":
+    """Background writer for kiosk entries (one thread for all sessions)"""
+    return _singleton("entry_writer", entry_flow.EntryWriter)
+
+
+def get_time_monitor():
+    """Background time-sync checks (sessions read the cached status)"""
+    from weigh import system_time  # subprocess/socket probing, started once
+    return _singleton("time_monitor", lambda: system_time.TimeStatusMonitor().start())
+
+
+def get_outbox_worker():
+    """Background sender of the email outbox (one SMTP session for the process)"""
+    from weigh import outbox  # only needed once a report is emailed
+    return _singleton("outbox_worker", lambda: outbox.OutboxWorker().start())
+
+
+def reset() -> None:
+    """Close and forget all resources (tests)."""
+    with _lock:
+        instances = dict(_instances)
+        _instances.clear()
+    for name, resource in instances.items():
+        close = getattr(resource, "stop" if name == "time_monitor" else "close", None)
+        if close is not None:
+            close()
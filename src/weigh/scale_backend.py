@@ -4,8 +4,11 @@
 import time
 import threading
 import logging
+import weakref
+from collections import Counter
 from dataclasses import dataclass
-from typing import Optional
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
 
 import hid  # from hidapi
 
@@ -14,12 +17,35 @@ logger = logging.getLogger(__name__)
 VENDOR_ID = 0x0922   # Dymo
 PRODUCT_ID = 0x8009  # S250 Digital Postal Scale
 
+# Readings at or below this many pounds count as "empty scale".
+ZERO_TOLERANCE_LB = 0.05
+
+
+# HID Point-of-Sale scale unit codes -> (unit name, units per pound).
+# Factors are exact decimals (1 lb = 453.59237 g by definition), so each
+# conversion is a single decimal division.
+UNIT_CODES = {
+    0x01: ("mg", Decimal("453592.37")),
+    0x02: ("g", Decimal("453.59237")),
+    0x03: ("kg", Decimal("0.45359237")),
+    0x0B: ("oz", Decimal(16)),
+    0x0C: ("lb", Decimal(1)),
+}
+
 
 @dataclass
 class ScaleReading:
-    value: float    # numeric value
-    unit: str       # "lb", "g", etc.
+    value: float    # weight in pounds, whatever unit the scale is set to
+    unit: str       # always "lb" for readings built by _parse_report
     is_stable: bool
+    raw_value: Optional[Decimal] = None   # value exactly as the scale reported it
+    raw_unit: Optional[str] = None        # unit the scale reported ("g", "oz", ...)
+    resolution: Optional[Decimal] = None  # display increment in raw_unit (e.g. 0.1)
+
+
+def find_scales(vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID) -> List[str]:
+    """HID paths of the connected scales (for the station config)"""
+    return [info["path"].decode() for info in hid.enumerate(vendor_id, product_id)]
 
 
 class DymoHIDScale:
@@ -32,9 +58,18 @@ class DymoHIDScale:
     - get_latest() returns the most recent reading (or None).
     - read_stable_weight() polls get_latest() until it sees a stable reading
       (or times out), perfect for LOG button use.
+    - Readings are normalized to pounds; the scale's own unit and
+      precision are kept in raw_unit/raw_value/resolution.
+    - add_listener() registers a callback that sees every parsed reading
+      (used by batch weighing, which must not miss a placement); a weak
+      listener goes away with the object its method belongs to.
+    - An optional IdleGovernor throttles the reader while the kiosk is idle.
+    - `path` opens one specific scale (stations with a scale each, see
+      find_scales()); without it the first matching device is opened.
     """
 
-    def __init__(self, vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID):
+    def __init__(self, vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID,
+                 governor=None, path: Optional[str] = None):
         logger.info("Enumerating HID devices...")
         for info in hid.enumerate():
             logger.debug(
@@ -44,14 +79,24 @@ class DymoHIDScale:
             )
 
         self.dev = hid.device()
-        self.dev.open(vendor_id, product_id)
+        if path:
+            self.dev.open_path(path.encode())
+        else:
+            self.dev.open(vendor_id, product_id)
 
         # Use BLOCKING reads in the reader thread so we never miss packets
         self.dev.set_nonblocking(False)
-        logger.info(f"Opened Dymo scale VID=0x{vendor_id:04x} PID=0x{product_id:04x}")
+        logger.info(f"Opened Dymo scale VID=0x{vendor_id:04x} PID=0x{product_id:04x}"
+                    + (f" at {path}" if path else ""))
 
         self._latest: Optional[ScaleReading] = None
-        self._lock = threading.Lock()
+        # Reentrant: a weak listener's owner can be collected while it is held
+        self._lock = threading.RLock()
+        self.governor = governor
+        # Callbacks, or weakref.WeakMethod of bound methods (weak=True)
+        self._listeners: list = []
+        # Telemetry: packets whose unit code we cannot convert
+        self.unknown_unit_codes: Counter = Counter()
         self._stop = False
 
         t = threading.Thread(target=self._reader_loop, daemon=True)
@@ -62,7 +107,8 @@ class DymoHIDScale:
     def _reader_loop(self):
         while not self._stop:
             try:
-                data = self.dev.read(6)  # blocking
+                # Blocking even while idle: the next packet wakes the reader
+                data = self.dev.read(6)
             except OSError:
                 time.sleep(0.1)
                 continue
@@ -72,11 +118,26 @@ class DymoHIDScale:
 
             rep = bytes(data)
             reading = self._parse_report(rep)
+            if self.governor is not None:
+                self.governor.note_reading(reading)
+                if self.governor.skip_packet():
+                    # Low-power cadence: only the occasional zero packet is published
+                    continue
             if reading:
                 # Uncomment this for low-level debug:
                 # print(f"RAW: {rep!r} -> {reading.value:.2f} {reading.unit} stable={reading.is_stable}")
                 with self._lock:
                     self._latest = reading
+                    listeners = list(self._listeners)
+                for listener in listeners:
+                    if isinstance(listener, weakref.WeakMethod):
+                        listener = listener()
+                        if listener is None:
+                            continue
+                    try:
+                        listener(reading)
+                    except Exception as e:
+                        logger.error(f"Scale listener failed: {type(e).__name__}: {e}")
             # Uncomment for debugging unparsed data:
             # else:
             #     print(f"UNPARSED: {rep!r}")
@@ -87,7 +148,7 @@ class DymoHIDScale:
 
           [0] report_id  (0x03)
           [1] status     (bit 0x04 = stable)
-          [2] unit_code  (0x02 = g, 0x0B = oz, 0x0C = lb)
+          [2] unit_code  (0x02 = g, 0x03 = kg, 0x0B = oz, 0x0C = lb)
           [3] exponent   (signed 8-bit, power of 10)
           [4] low byte   (LSB)
           [5] high byte  (MSB)
@@ -107,30 +168,74 @@ class DymoHIDScale:
 
         # signed 8-bit exponent (two's complement)
         exp = exponent - 256 if exponent >= 128 else exponent
-        scale = 10 ** exp  # exp = -1 -> 0.1
-
-        if unit_code == 0x02:      # grams
-            value = raw * scale
-            unit = "g"
-        elif unit_code == 0x0B:    # ounces
-            value = raw * scale
-            unit = "oz"
-        elif unit_code == 0x0C:    # pounds (your S250 foot-test)
-            value = raw * scale    # 0.1 lb units -> lb
-            unit = "lb"
-        else:
-            value = raw * scale
-            unit = f"0x{unit_code:02x}"
+        resolution = Decimal(1).scaleb(exp)  # exp = -1 -> 0.1
+        raw_value = Decimal(raw).scaleb(exp)
+
+        if unit_code not in UNIT_CODES:
+            self._record_unknown_unit(unit_code)
+            return None
 
-        return ScaleReading(float(value), unit, is_stable)
+        unit, units_per_lb = UNIT_CODES[unit_code]
+        value_lb = raw_value / units_per_lb
+
+        return ScaleReading(float(value_lb), "lb", is_stable,
+                            raw_value=raw_value, raw_unit=unit,
+                            resolution=resolution)
+
+    def _record_unknown_unit(self, unit_code: int) -> None:
+        with self._lock:
+            self.unknown_unit_codes[unit_code] += 1
+            first = self.unknown_unit_codes[unit_code] == 1
+        if first:
+            logger.warning(f"Scale reported unknown unit code 0x{unit_code:02x}; readings ignored")
 
     # ---------- public API ----------
 
+    def get_telemetry(self) -> Dict[str, Dict[str, int]]:
+        """Counters for conditions that would otherwise fail silently."""
+        with self._lock:
+            return {
+                "unknown_unit_codes": {
+                    f"0x{code:02x}": n for code, n in self.unknown_unit_codes.items()
+                },
+            }
+
     def get_latest(self) -> Optional[ScaleReading]:
         """Return the most recent reading from the background thread."""
         with self._lock:
             return self._latest
 
+    def add_listener(self, callback: Callable[[ScaleReading], None], weak: bool = False) -> None:
+        """
+        Call callback(reading) from the reader thread for every parsed packet.
+
+        With weak=True, callback must be a bound method and the scale only
+        keeps a weak reference to it: the listener is removed when its
+        object is garbage collected (e.g. a batch session whose browser
+        session went away without ending it).
+        """
+        with self._lock:
+            if callback in self._callbacks():
+                return
+            if weak:
+                self._listeners.append(weakref.WeakMethod(callback, self._drop_listener))
+            else:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[ScaleReading], None]) -> None:
+        with self._lock:
+            self._listeners = [
+                listener for listener, fn in zip(self._listeners, self._callbacks()) if fn != callback
+            ]
+
+    def _callbacks(self) -> List[Optional[Callable[[ScaleReading], None]]]:
+        return [listener() if isinstance(listener, weakref.WeakMethod) else listener
+                for listener in self._listeners]
+
+    def _drop_listener(self, ref: "weakref.WeakMethod") -> None:
+        with self._lock:
+            self._listeners = [listener for listener in self._listeners if listener is not ref]
+
     def read_stable_weight(self, timeout_s: float = 2.0) -> Optional[ScaleReading]:
         """
         Poll get_latest() for up to timeout_s and return the last
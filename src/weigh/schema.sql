@@ -21,6 +21,7 @@ CREATE TABLE IF NOT EXISTS logs (
     deleted    INTEGER DEFAULT 0,
     temp_pickup_f REAL,     -- NEW: Temperature at pickup in Fahrenheit
     temp_dropoff_f  REAL,   -- NEW: Temperature at dropoff in Fahrenheit
+    station    TEXT,        -- Station that logged the entry (see stations.py)
     FOREIGN KEY (source_id) REFERENCES sources(id),
     FOREIGN KEY (type_id)   REFERENCES types(id)
 );
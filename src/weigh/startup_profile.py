@@ -0,0 +1,163 @@
+# src/weigh/startup_profile.py
+"""
+Startup profiler for the kiosk.
+
+    weigh startup-profile [--top N]
+    python -m weigh.startup_profile [--top N]
+
+Runs app.py's first script run (what a browser connecting to a freshly
+started kiosk triggers) in a new interpreter under `python -X importtime`
+and prints:
+
+- the time to import streamlit (paid once by `streamlit run`)
+- the time to first render (first full run of app.py)
+- which modules the first render imported, slowest first
+
+Run it on the device with the kiosk stopped: the first run opens the scale
+like the real server does. The live weight stream is started on a random
+free port so it cannot clash with anything else.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+APP_PATH = Path(__file__).parent / "app.py"
+# Written to stderr between the streamlit import and the first render
+MARKER = "weighit-startup: first render"
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+# As launched by launch.sh
+config.set_option("server.enableStaticServing", True)
+before = set(sys.modules)
+sys.stderr.write(MARKER + "\n")
+sys.stderr.flush()
+t2 = time.perf_counter()
+at = AppTest.from_file(APP_PATH, default_timeout=300)
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (t1 - t0) * 1000.0,
+    "first_render_ms": (t3 - t2) * 1000.0,
+    "new_modules": sorted(set(sys.modules) - before),
+    "exceptions": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+@dataclass
+class StartupProfile:
+    streamlit_import_ms: float
+    first_render_ms: float
+    # Modules imported by the first render
+    new_modules: List[str]
+    # (module, cumulative microseconds) of top-level imports during the first render
+    render_imports: List[Tuple[str, int]] = field(default_factory=list)
+    exceptions: List[str] = field(default_factory=list)
+
+    @property
+    def render_import_ms(self) -> float:
+        return sum(us for _, us in self.render_imports) / 1000.0
+
+
+def parse_importtime(lines: Iterable[str]) -> List[Tuple[str, int]]:
+    """
+    (module, cumulative us) for the outermost imports in `-X importtime`
+    output (nested imports are already included in their parent's time).
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = len(name) - len(name.lstrip(" "))
+        entries.append((name.strip(), int(cumulative), depth))
+    if not entries:
+        return []
+    top = min(depth for _, _, depth in entries)
+    return [(name, us) for name, us, depth in entries if depth == top]
+
+
+def by_package(imports: List[Tuple[str, int]]) -> Dict[str, int]:
+    """Cumulative microseconds per top-level package."""
+    totals: Dict[str, int] = {}
+    for name, us in imports:
+        package = name.split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + us
+    return totals
+
+
+def run_profile(app_path: Path = APP_PATH, env: Optional[Dict[str, str]] = None) -> StartupProfile:
+    """Profile the first render of `app_path` in a fresh interpreter."""
+    child_env = dict(os.environ)
+    child_env.setdefault("WEIGHIT_WEIGHT_STREAM_PORT", "0")
+    src_dir = str(Path(__file__).parent.parent)
+    child_env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (src_dir, child_env.get("PYTHONPATH")) if p)
+    if env:
+        child_env.update(env)
+
+    code = f"MARKER = {MARKER!r}\nAPP_PATH = {str(app_path)!r}\n{_CHILD}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=child_env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup profile run failed:\n{proc.stderr[-2000:]}")
+
+    stderr = proc.stderr.splitlines()
+    after_marker = stderr[stderr.index(MARKER) + 1:] if MARKER in stderr else []
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        streamlit_import_ms=result["streamlit_import_ms"],
+        first_render_ms=result["first_render_ms"],
+        new_modules=result["new_modules"],
+        render_imports=parse_importtime(after_marker),
+        exceptions=result["exceptions"],
+    )
+
+
+def format_report(profile: StartupProfile, top: int = 15) -> str:
+    lines = [
+        f"streamlit import      {profile.streamlit_import_ms:8.1f} ms",
+        f"first render          {profile.first_render_ms:8.1f} ms",
+        f"  of which imports    {profile.render_import_ms:8.1f} ms "
+        f"({len(profile.new_modules)} modules)",
+        "",
+        "Imports during first render, by package:",
+    ]
+    packages = sorted(by_package(profile.render_imports).items(), key=lambda kv: -kv[1])
+    for package, us in packages[:top]:
+        lines.append(f"  {package:30s} {us / 1000.0:8.1f} ms")
+    lines.append("")
+    lines.append("Slowest imports:")
+    for name, us in sorted(profile.render_imports, key=lambda kv: -kv[1])[:top]:
+        lines.append(f"  {name:40s} {us / 1000.0:8.1f} ms")
+    if profile.exceptions:
+        lines.append("")
+        lines.append("App raised during first render:")
+        lines.extend(f"  {e}" for e in profile.exceptions)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Profile kiosk cold start")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    args = parser.parse_args(argv)
+    print(format_report(run_profile(), top=args.top))
+
+
+if __name__ == "__main__":
+    main()
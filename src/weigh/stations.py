@@ -0,0 +1,108 @@
+# src/weigh/stations.py
+"""
+Stations: several intake tables served by one kiosk process.
+
+Each tablet opens the kiosk with its station in the URL
+(http://SERVER:8501/?station=B); every browser session of that station uses
+the station's scale, starts on its default donor and undoes/redoes only the
+station's own entries. Stations are defined in a TOML file:
+
+    # ~/weighit/stations.toml (or WEIGHIT_STATIONS_FILE)
+    [stations.A]
+    source = "Trader Joe's"        # donor selected when a session starts
+
+    [stations.B]
+    scale = "/dev/hidraw1"         # HID path of its scale (see `weigh scales`)
+    source = "Wegmans"
+    undo = "all"                   # undo/redo any entry ("station" = own only)
+
+`scale` defaults to the first Dymo scale found, `undo` to "station". Without
+the file (or without ?station=) sessions use the "default" station, which
+is the single-tablet kiosk: first scale, first donor, undo any entry.
+
+Everything that does not depend on the station is shared by all sessions of
+the process: scale readers (one per scale), totals and history caches
+(per donor and day), sources/types and the rendered assets.
+"""
+import logging
+import os
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATIONS_FILE = Path(os.getenv("WEIGHIT_STATIONS_FILE", os.path.expanduser("~/weighit/stations.toml")))
+DEFAULT_NAME = "default"
+
+UNDO_STATION = "station"
+UNDO_ALL = "all"
+
+
+@dataclass(frozen=True)
+class Station:
+    name: str
+    # HID path of the station's scale (None = first Dymo scale found)
+    scale: Optional[str] = None
+    # Donor selected when a session starts (None = first donor)
+    source: Optional[str] = None
+    undo: str = UNDO_STATION
+
+    @property
+    def undo_station(self) -> Optional[str]:
+        """Station filter for undo/redo (None = any entry)"""
+        return self.name if self.undo == UNDO_STATION else None
+
+
+DEFAULT_STATION = Station(DEFAULT_NAME, undo=UNDO_ALL)
+
+
+def parse_stations(config: dict) -> Dict[str, Station]:
+    stations = {}
+    for name, options in config.get("stations", {}).items():
+        undo = options.get("undo", UNDO_STATION)
+        if undo not in (UNDO_STATION, UNDO_ALL):
+            raise ValueError(f"Station {name}: undo must be '{UNDO_STATION}' or '{UNDO_ALL}'")
+        stations[name] = Station(name, scale=options.get("scale") or None,
+                                 source=options.get("source"), undo=undo)
+    return stations
+
+
+_stations: Optional[Dict[str, Station]] = None
+
+
+def load_stations(path: Path = None) -> Dict[str, Station]:
+    """Stations from the config file (read once per process; {} if there is none)"""
+    global _stations
+    if _stations is None or path is not None:
+        path = path or STATIONS_FILE
+        if path.exists():
+            with open(path, "rb") as f:
+                _stations = parse_stations(tomllib.load(f))
+            logger.info(f"Loaded {len(_stations)} station(s) from {path}")
+        else:
+            _stations = {}
+    return _stations
+
+
+def get_station(name: Optional[str]) -> Station:
+    """Station for a ?station= value (default station if missing or unknown)"""
+    if not name:
+        return DEFAULT_STATION
+    station = load_stations().get(name)
+    if station is None:
+        logger.warning(f"Unknown station {name!r}, using the default station")
+        return DEFAULT_STATION
+    return station
+
+
+def all_stations() -> Dict[str, Station]:
+    """Configured stations, or just the default one"""
+    return load_stations() or {DEFAULT_NAME: DEFAULT_STATION}
+
+
+def reset() -> None:
+    """Forget the loaded config (tests)."""
+    global _stations
+    _stations = None
@@ -0,0 +1,175 @@
+# src/weigh/summary_cache.py
+"""
+Per-day report summary blocks, composed for range reports.
+
+Entries of a closed day (before today, UTC) rarely change, so each day's
+summary is stored once as an immutable block in the day_summaries table
+(see summary_cache.sql): the values the report sums (see below), as JSON,
+with a sha256 of that JSON. Any insert, update or
+delete of an entry appends a log_changes row for its day, and a trigger on
+log_changes deletes that day's block; nothing else invalidates it.
+
+summarize_between() answers a range from the stored blocks, builds the
+missing closed days (one query over their span, stored for next time) and
+adds today and later days from the logs, so after the first report a
+365-day summary costs one indexed read of 365 blocks plus today's rows
+instead of a scan of the logs (there is no timestamp index). Rows have the shape of logger_core.summarize_logs_between().
+
+A block keeps the values themselves, in entry order: per source and type
+(in order of their first entry that day), the weights and the recorded
+pickup / dropoff temperatures. The range is composed by adding the
+weights day after day one at a time and averaging the temperatures with
+sum() / len(), exactly like logger_core.summarize_logs_between()'s one
+pass over the logs (WEIGHIT_SUMMARY_CACHE=0, which aggregates the whole
+range from the logs instead). Per-day sums would round differently from
+that pass, so the report would no longer match earlier ones. A block
+whose hash does not match its rows, or that was stored in an older
+format, is rebuilt.
+"""
+import hashlib
+import json
+import logging
+import os
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+from weigh import db, logger_core
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE = os.getenv("WEIGHIT_SUMMARY_CACHE", "1") == "1"
+
+# Entries in report order; one block row per source and type of the day:
+# [source_id, type_id, weights, pickup temperatures, dropoff temperatures]
+_DAY_ENTRIES = """
+    SELECT DATE(timestamp) AS day, source_id, type_id,
+           weight_lb, temp_pickup_f, temp_dropoff_f
+    FROM logs
+    WHERE DATE(timestamp) BETWEEN ? AND ?
+      AND deleted = 0
+    ORDER BY timestamp ASC, id ASC
+"""
+# Part of the hash, so blocks stored in an older row format are rebuilt
+_BLOCK_FORMAT = "values-1:"
+
+# Stored only if no entry of the day changed after the snapshot it was built from
+_STORE = """
+    INSERT OR REPLACE INTO day_summaries (day, seq, hash, rows)
+    SELECT ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM log_changes WHERE seq > ? AND day = ?)
+"""
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def block_hash(rows_json: str) -> str:
+    return hashlib.sha256((_BLOCK_FORMAT + rows_json).encode("utf-8")).hexdigest()
+
+
+def _days(start: str, end: str) -> List[str]:
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def _aggregate(conn, start: str, end: str) -> Dict[str, list]:
+    """Block rows of every day of start..end that has entries"""
+    days: Dict[str, dict] = {}
+    cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples
+    for day, source_id, type_id, weight, pickup, dropoff in cursor.execute(_DAY_ENTRIES, (start, end)):
+        rows = days.setdefault(day, {})
+        row = rows.get((source_id, type_id))
+        if row is None:
+            row = rows[source_id, type_id] = [source_id, type_id, [], [], []]
+        row[2].append(weight)
+        if pickup is not None:
+            row[3].append(pickup)
+        if dropoff is not None:
+            row[4].append(dropoff)
+    return {day: list(rows.values()) for day, rows in days.items()}
+
+
+def _load(conn, start: str, end: str) -> Dict[str, list]:
+    """Stored blocks of start..end whose hash matches"""
+    blocks = {}
+    for row in conn.execute(
+            "SELECT day, hash, rows FROM day_summaries WHERE day BETWEEN ? AND ?", (start, end)):
+        if block_hash(row["rows"]) == row["hash"]:
+            blocks[row["day"]] = json.loads(row["rows"])
+        else:
+            logger.warning(f"Summary block of {row['day']} does not match its hash, rebuilding it")
+    return blocks
+
+
+def _store(conn, blocks: Dict[str, list], seq: int) -> None:
+    params = []
+    for day, rows in blocks.items():
+        rows_json = json.dumps(rows, separators=(",", ":"))
+        params.append((day, seq, block_hash(rows_json), rows_json, seq, day))
+    conn.executemany(_STORE, params)
+    conn.commit()
+
+
+def summarize_between(start_date, end_date) -> List[dict]:
+    """
+    Per source and type totals of the range, composed from the day blocks
+    (see module docstring); in order of their first entry.
+    """
+    if not SUMMARY_CACHE:
+        return logger_core.summarize_logs_between(start_date, end_date)
+    start, end = str(start_date), str(end_date)
+    if start > end:
+        return []
+    yesterday = (date.fromisoformat(today()) - timedelta(days=1)).isoformat()
+
+    conn = db.get_conn()
+    try:
+        # Blocks, change position and live rows from one snapshot
+        conn.execute("BEGIN")
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM log_changes").fetchone()[0]
+        closed_end = min(end, yesterday)
+        blocks: Dict[str, list] = {}
+        missing: List[str] = []
+        if start <= closed_end:
+            blocks = _load(conn, start, closed_end)
+            missing = [day for day in _days(start, closed_end) if day not in blocks]
+
+        # One scan covers the missing closed days and today onwards
+        live = end > yesterday
+        built: Dict[str, list] = {}
+        if missing or live:
+            scan_start = missing[0] if missing else max(start, today())
+            scan_end = end if live else missing[-1]
+            fresh = _aggregate(conn, scan_start, scan_end)
+            built = {day: fresh.get(day, []) for day in missing}
+            blocks.update(built)
+            blocks.update((day, rows) for day, rows in fresh.items() if day > yesterday)
+        sources = {row["id"]: row["name"] for row in conn.execute("SELECT id, name FROM sources")}
+        types = {row["id"]: row["name"] for row in conn.execute("SELECT id, name FROM types")}
+        conn.rollback()
+        if built:
+            _store(conn, built, seq)
+    finally:
+        conn.close()
+
+    # Day by day in entry order, as summarize_logs_between() adds them up
+    totals: Dict[tuple, list] = {}
+    for day in sorted(blocks):
+        for source_id, type_id, weights, pickups, dropoffs in blocks[day]:
+            if source_id not in sources or type_id not in types:
+                continue
+            acc = totals.get((sources[source_id], types[type_id]))
+            if acc is None:
+                acc = totals[sources[source_id], types[type_id]] = [0.0, 0, array("d"), array("d")]
+            weight = acc[0]
+            for value in weights:
+                weight += value
+            acc[0] = weight
+            acc[1] += len(weights)
+            acc[2].extend(pickups)
+            acc[3].extend(dropoffs)
+
+    return [logger_core.summary_row(source, type_, *acc) for (source, type_), acc in totals.items()]
@@ -0,0 +1,20 @@
+-- summary_cache.sql
+-- Applied after change_feed.sql, and to existing databases on first
+-- connection (every statement is idempotent).
+--
+-- Per-day report summary blocks (see summary_cache.py). A block is written
+-- once, for a closed day, and never updated: a log_changes row for its day
+-- (any insert/update/delete of an entry of that day, from any writer)
+-- deletes it, and the next report covering the day builds it again.
+
+CREATE TABLE IF NOT EXISTS day_summaries (
+    day    TEXT PRIMARY KEY,   -- YYYY-MM-DD (UTC, like DATE(timestamp))
+    seq    INTEGER NOT NULL,   -- log_changes position the block was built at
+    hash   TEXT NOT NULL,      -- sha256 of rows
+    rows   TEXT NOT NULL       -- JSON list, one item per source/type of the day
+);
+
+CREATE TRIGGER IF NOT EXISTS day_summaries_invalidate AFTER INSERT ON log_changes
+BEGIN
+    DELETE FROM day_summaries WHERE day = NEW.day;
+END;
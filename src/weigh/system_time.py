@@ -1,19 +1,48 @@
 """
 System time utilities for WeighIt.
 Handles NTP checks, internet connectivity, and system clock validation.
+
+The network/NTP probes can take seconds on an offline network, so the app
+does not call get_time_sync_status() per session: a TimeStatusMonitor
+(one per process) probes in a background thread and sessions read its
+cached result.
+
+Configuration (environment variables):
+    WEIGHIT_TIME_STATUS_REFRESH   seconds between background re-checks (default 300)
 """
+import os
 import socket
 import subprocess
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+TIME_STATUS_REFRESH_S = float(os.getenv("WEIGHIT_TIME_STATUS_REFRESH", "300"))
+
+# Try multiple DNS servers to be robust
+TEST_HOSTS = [
+    ("8.8.8.8", 53),        # Google DNS
+    ("1.1.1.1", 53),        # Cloudflare DNS
+    ("208.67.222.222", 53)  # OpenDNS
+]
+
+
+def _can_connect(host: str, port: int, timeout: float) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
 
 def check_internet_connectivity(timeout: float = 3.0) -> bool:
     """
     Check if internet is available by attempting to connect to common DNS servers.
+    The servers are tried in parallel, so this takes at most `timeout` seconds.
 
     Args:
         timeout: Connection timeout in seconds
@@ -21,22 +50,17 @@ def check_internet_connectivity(timeout: float = 3.0) -> bool:
     Returns:
         True if internet appears available, False otherwise
     """
-    # Try multiple DNS servers to be robust
-    test_hosts = [
-        ("8.8.8.8", 53),      # Google DNS
-        ("1.1.1.1", 53),      # Cloudflare DNS
-        ("208.67.222.222", 53) # OpenDNS
-    ]
-
-    for host, port in test_hosts:
-        try:
-            socket.setdefaulttimeout(timeout)
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-            return True
-        except (socket.error, socket.timeout):
-            continue
-
-    return False
+    pool = ThreadPoolExecutor(max_workers=len(TEST_HOSTS), thread_name_prefix="time-probe")
+    try:
+        pending = {pool.submit(_can_connect, host, port, timeout) for host, port in TEST_HOSTS}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(f.result() for f in done):
+                return True
+        return False
+    finally:
+        # Slower probes finish on their own (bounded by timeout)
+        pool.shutdown(wait=False)
 
 
 def check_ntp_sync() -> Tuple[bool, Optional[str]]:
@@ -164,12 +188,15 @@ def set_system_time(new_datetime: datetime) -> Tuple[bool, str]:
 def get_time_sync_status() -> dict:
     """
     Get comprehensive time synchronization status.
+    The internet and NTP checks run in parallel.
 
     Returns:
         Dictionary with status information
     """
-    has_internet = check_internet_connectivity()
-    ntp_synced, ntp_msg = check_ntp_sync()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="time-probe") as pool:
+        ntp_future = pool.submit(check_ntp_sync)
+        has_internet = check_internet_connectivity()
+        ntp_synced, ntp_msg = ntp_future.result()
     time_valid, time_warning = validate_system_time()
 
     return {
@@ -181,3 +208,78 @@ def get_time_sync_status() -> dict:
         "current_time": datetime.now(),
         "needs_manual_time_set": not has_internet and not ntp_synced
     }
+
+
+class TimeStatusMonitor:
+    """
+    Background time-sync checker shared by all sessions of a process.
+
+    start() launches a daemon thread that runs `probe` (get_time_sync_status)
+    immediately and then every `refresh_s` seconds. get_status() never
+    blocks: it returns the last result, or None until the first probe
+    has finished.
+    """
+
+    def __init__(self, refresh_s: float = TIME_STATUS_REFRESH_S,
+                 probe: Callable[[], dict] = get_time_sync_status):
+        self.refresh_s = refresh_s
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._status: Optional[dict] = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> "TimeStatusMonitor":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="time-status", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self.refresh()
+            self._wake.wait(self.refresh_s)
+            self._wake.clear()
+
+    def refresh(self) -> dict:
+        """Probe now (in the calling thread) and cache the result."""
+        try:
+            status = self._probe()
+        except Exception as e:
+            logger.error(f"Time status check failed: {type(e).__name__}: {e}")
+            status = {
+                "has_internet": False,
+                "ntp_synced": False,
+                "ntp_message": f"Check failed: {e}",
+                "needs_manual_time_set": True,
+            }
+        with self._lock:
+            self._status = status
+        self._ready.set()
+        return self.get_status()
+
+    def request_refresh(self) -> None:
+        """Ask the background thread to re-check now (e.g. after setting the clock)."""
+        self._wake.set()
+
+    def get_status(self, timeout: float = 0.0) -> Optional[dict]:
+        """
+        Cached status (None while the first check is still running).
+        The clock validity is re-evaluated on every call, as it is cheap
+        and changes when the time is set manually.
+        """
+        if timeout > 0:
+            self._ready.wait(timeout)
+        with self._lock:
+            if self._status is None:
+                return None
+            status = dict(self._status)
+        status["time_valid"], status["time_warning"] = validate_system_time()
+        status["current_time"] = datetime.now()
+        return status
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
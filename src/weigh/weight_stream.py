@@ -0,0 +1,176 @@
+# src/weigh/weight_stream.py
+"""
+Server-push live weight for the kiosk.
+
+Instead of a Streamlit fragment re-running on a timer in every browser, a
+WeightBroadcaster is registered as a DymoHIDScale listener and a tiny
+Server-Sent Events endpoint (GET /weight) pushes the displayed text to the
+browser only when it changes. One server serves every scale of the process:
+GET /weight streams the default scale, GET /weight?scale=PATH a station's
+own scale (see stations.py). While the weight is static the SSE handler
+threads sleep on a condition variable (apart from a rare keepalive comment),
+so the server does no work.
+
+Configuration (environment variables):
+    WEIGHIT_WEIGHT_PUSH          1 = push display (default), 0 = fragment polling
+    WEIGHIT_WEIGHT_STREAM_PORT   port of the SSE endpoint (default 8502)
+"""
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_PUSH = os.getenv("WEIGHIT_WEIGHT_PUSH", "1") == "1"
+STREAM_HOST = os.getenv("WEIGHIT_WEIGHT_STREAM_HOST", "0.0.0.0")
+STREAM_PORT = int(os.getenv("WEIGHIT_WEIGHT_STREAM_PORT", "8502"))
+# Seconds between keepalive comments on an idle stream (detects dead clients)
+KEEPALIVE_S = 30.0
+
+
+def format_weight(reading) -> str:
+    """Text shown in the kiosk weight box for a ScaleReading (or None)."""
+    return f"{reading.value:.1f} lbs" if reading and reading.unit == "lb" else "—"
+
+
+class WeightBroadcaster:
+    """
+    Holds the current weight text and wakes waiting streams when it changes.
+
+    publish() runs on the scale reader thread for every packet; it only
+    compares strings unless the displayed text actually changed.
+    """
+
+    def __init__(self, text: str = "—"):
+        self._text = text
+        self._version = 0
+        self._cond = threading.Condition()
+        self._listeners: List[Callable[[], None]] = []
+
+    def publish(self, reading) -> None:
+        text = format_weight(reading)
+        with self._cond:
+            if text == self._text:
+                return
+            self._text = text
+            self._version += 1
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call callback() (on the reader thread) after every change, e.g. to wake an event loop"""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        with self._cond:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def current(self) -> Tuple[str, int]:
+        with self._cond:
+            return self._text, self._version
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> Tuple[str, int]:
+        """Block until the version differs from seen_version (or timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != seen_version, timeout=timeout)
+            return self._text, self._version
+
+
+class _WeightStreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        scale = parse_qs(url.query).get("scale", [""])[0]
+        broadcaster = self.server.broadcasters.get(scale)
+        if url.path != "/weight" or broadcaster is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "keep-alive")
+        # The kiosk page is served by Streamlit on another port
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+
+        seen = -1
+        try:
+            while not self.server.closing:
+                text, version = broadcaster.wait_for_change(seen, timeout=KEEPALIVE_S)
+                if version == seen:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    seen = version
+                    self.wfile.write(f"data: {json.dumps({'text': text})}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        # One line per browser connection is noise on the kiosk console
+        pass
+
+
+class WeightStreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, broadcaster: WeightBroadcaster, host: str = STREAM_HOST,
+                 port: int = STREAM_PORT, name: str = ""):
+        # Scale name ("" = the default scale) -> its broadcaster
+        self.broadcasters: Dict[str, WeightBroadcaster] = {name: broadcaster}
+        self.closing = False
+        super().__init__((host, port), _WeightStreamHandler)
+
+    @property
+    def broadcaster(self) -> WeightBroadcaster:
+        """The scale the server was started with"""
+        return next(iter(self.broadcasters.values()))
+
+    def add_scale(self, name: str, scale) -> WeightBroadcaster:
+        """Also stream `scale` (GET /weight?scale=NAME)"""
+        broadcaster = WeightBroadcaster(format_weight(scale.get_latest()))
+        scale.add_listener(broadcaster.publish)
+        self.broadcasters[name] = broadcaster
+        return broadcaster
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "WeightStreamServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        logger.info(f"Weight stream listening on port {self.port}")
+        return self
+
+    def close(self) -> None:
+        # Open streams end at their next keepalive; handler threads are daemons
+        self.closing = True
+        self.shutdown()
+        self.server_close()
+
+
+def start_weight_stream(scale, host: str = STREAM_HOST, port: int = STREAM_PORT,
+                        name: str = "") -> Optional[WeightStreamServer]:
+    """
+    Hook a broadcaster onto the scale and start the SSE server (more scales
+    can be added with add_scale()).
+    Returns None if the port cannot be bound (caller falls back to polling).
+    """
+    broadcaster = WeightBroadcaster(format_weight(scale.get_latest()))
+    try:
+        server = WeightStreamServer(broadcaster, host, port, name)
+    except OSError as e:
+        logger.error(f"Weight stream unavailable on port {port}: {e}")
+        return None
+    scale.add_listener(broadcaster.publish)
+    return server.start()
@@ -0,0 +1,232 @@
+# src/weigh/xlsx_writer.py
+"""
+Minimal streaming XLSX (Office Open XML spreadsheet) writer.
+
+An .xlsx file is a zip of XML parts. Each sheet is written row by row
+straight into its compressed zip member, so memory does not grow with the
+number of rows (the reports feed it from database cursors). Sheets are
+written one after the other; the workbook, styles and content-type parts,
+which only list the sheets, are added on close.
+
+    with Workbook(f) as book:
+        with book.sheet("Detail", widths=[22, 12], freeze_header=True) as sheet:
+            sheet.header(["Timestamp", "Weight (lb)"])
+            for ts, weight in rows:
+                sheet.row([ts, weight], styles=[DATETIME, DECIMAL_2])
+
+Cells: str (inline string), int/float (number), datetime (Excel serial
+date), None or NaN (empty). Strings use inline strings rather than a shared
+strings table, which would have to be kept in memory until the end.
+"""
+import math
+import re
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+# Excel's sheet size limit (rows beyond it need another sheet)
+MAX_ROWS = 1_048_576
+
+# Cell styles (indexes into cellXfs of styles.xml)
+DEFAULT = 0
+DATETIME = 1
+BOLD = 2
+DECIMAL_2 = 3
+DECIMAL_1 = 4
+
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/><numFmt numFmtId="165" formatCode="0.0"/></numFmts>
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+<xf numFmtId="2" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+_REL_NS = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+_EPOCH = datetime(1899, 12, 30)
+# Characters XML 1.0 does not allow
+_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Strings that need escaping or cleaning
+_SPECIAL = re.compile("[&<>\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def column_letter(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def excel_serial(value: datetime) -> float:
+    """Excel's date number (days since 1899-12-30; time zone dropped)"""
+    delta = value.replace(tzinfo=None) - _EPOCH
+    return delta.days + (delta.seconds + delta.microseconds / 1e6) / 86400.0
+
+
+class Sheet:
+    # Rows are buffered and handed to the zip stream about this many bytes at a time
+    FLUSH_BYTES = 64 * 1024
+
+    def __init__(self, stream, name: str):
+        self.name = name
+        self.rows = 0
+        self._stream = stream
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._letters: List[str] = [column_letter(i) for i in range(26)]
+
+    def row(self, values: Sequence, styles: Optional[Sequence[int]] = None) -> None:
+        """Append one row (styles: one per value, or None for defaults)"""
+        if self.rows >= MAX_ROWS:
+            raise ValueError(f"Sheet {self.name!r} is full ({MAX_ROWS} rows)")
+        self.rows += 1
+        n = self.rows
+        letters = self._letters
+        while len(letters) < len(values):
+            letters.append(column_letter(len(letters)))
+        cells = [f'<row r="{n}">']
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            style = styles[i] if styles else DEFAULT
+            s = f' s="{style}"' if style else ""
+            kind = type(value)
+            if kind is float or kind is int:
+                if kind is float and not math.isfinite(value):
+                    continue
+                cells.append(f'<c r="{letters[i]}{n}"{s}><v>{value!r}</v></c>')
+            elif kind is str:
+                if not value:
+                    continue
+                if _SPECIAL.search(value):
+                    value = escape(_ILLEGAL.sub("", value))
+                cells.append(f'<c r="{letters[i]}{n}"{s} t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>')
+            elif isinstance(value, bool):
+                cells.append(f'<c r="{letters[i]}{n}"{s} t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                number = float(value)
+                if math.isfinite(number):
+                    cells.append(f'<c r="{letters[i]}{n}"{s}><v>{number!r}</v></c>')
+            elif isinstance(value, datetime):
+                cells.append(f'<c r="{letters[i]}{n}" s="{style or DATETIME}"><v>{excel_serial(value)!r}</v></c>')
+            else:
+                text = escape(_ILLEGAL.sub("", str(value)))
+                if text:
+                    cells.append(f'<c r="{letters[i]}{n}"{s} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        cells.append("</row>")
+        row = "".join(cells)
+        self._buffer.append(row)
+        self._buffered += len(row)
+        if self._buffered >= self.FLUSH_BYTES:
+            self.flush()
+
+    def header(self, values: Sequence[str]) -> None:
+        self.row(values, [BOLD] * len(values))
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer.clear()
+            self._buffered = 0
+
+
+class _SheetContext:
+    def __init__(self, book: "Workbook", name: str, widths, freeze_header: bool):
+        self.book, self.name, self.widths, self.freeze_header = book, name, widths, freeze_header
+
+    def __enter__(self) -> Sheet:
+        book = self.book
+        book._sheets.append(self.name)
+        path = f"xl/worksheets/sheet{len(book._sheets)}.xml"
+        self.stream = book._zip.open(path, "w")
+        head = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet {_NS} {_REL_NS}>']
+        if self.freeze_header:
+            head.append('<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+                        'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>')
+        if self.widths:
+            head.append("<cols>" + "".join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{w}" customWidth="1"/>'
+                for i, w in enumerate(self.widths)) + "</cols>")
+        head.append("<sheetData>")
+        self.stream.write("".join(head).encode("utf-8"))
+        self.sheet = Sheet(self.stream, self.name)
+        return self.sheet
+
+    def __exit__(self, *exc) -> None:
+        self.sheet.flush()
+        self.stream.write(b"</sheetData></worksheet>")
+        self.stream.close()
+
+
+class Workbook:
+    """Streaming workbook written to a binary file object (see module docstring)"""
+
+    def __init__(self, file: BinaryIO):
+        self._zip = zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._sheets: List[str] = []
+
+    def sheet(self, name: str, widths: Optional[Sequence[float]] = None,
+              freeze_header: bool = False) -> _SheetContext:
+        """Context manager for the next sheet (names: at most 31 chars, no []:*?/\\)"""
+        name = re.sub(r"[\[\]:*?/\\]", " ", name)[:31]
+        return _SheetContext(self, name, widths, freeze_header)
+
+    def close(self) -> None:
+        count = len(self._sheets)
+        sheets = "".join(f"<sheet name={quoteattr(name)} sheetId=\"{i + 1}\" r:id=\"rId{i + 1}\"/>"
+                         for i, name in enumerate(self._sheets))
+        parts = {
+            "[Content_Types].xml": (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/styles.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                + "".join(f'<Override PartName="/xl/worksheets/sheet{i + 1}.xml" '
+                          'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                          for i in range(count))
+                + '</Types>'),
+            "_rels/.rels": (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                'relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+            "xl/workbook.xml": (
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<workbook {_NS} {_REL_NS}>'
+                f'<sheets>{sheets}</sheets></workbook>'),
+            "xl/_rels/workbook.xml.rels": (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                + "".join(f'<Relationship Id="rId{i + 1}" Type="http://schemas.openxmlformats.org/'
+                          f'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i + 1}.xml"/>'
+                          for i in range(count))
+                + f'<Relationship Id="rId{count + 1}" Type="http://schemas.openxmlformats.org/'
+                  'officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>'),
+            "xl/styles.xml": _STYLES,
+        }
+        for name, xml in parts.items():
+            self._zip.writestr(name, xml)
+        self._zip.close()
+
+    def __enter__(self) -> "Workbook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -2,6 +2,8 @@ import pytest
 import tempfile
 import os
 import shutil
+import socketserver
+import threading
 
 from weigh import db as weigh_db
 
@@ -15,3 +17,100 @@ def temp_db(monkeypatch):
     weigh_db.init_for_test(db_path, schema_path)
 
     return {"db_path": db_path, "tmpdir": tmpdir}
+
+
+# Entries whose totals and averages land on a rounding tie: summed in any
+# other order than entry by entry in timestamp order, Meat prints 10.57 lb
+# and 37.4, Produce 9.40 and the Dairy dropoff average 37.0
+ROUNDING_TIES = [
+    ("2025-03-01T09:00:00+00:00", 4.099, "Safeway", "Meat", 35.4, None),
+    ("2025-03-01T09:10:00+00:00", 2.937, "Wegmans", "Produce", None, None),
+    ("2025-03-01T09:20:00+00:00", 1.0, "Wegmans", "Dairy", None, 33.9),
+    ("2025-03-02T09:00:00+00:00", 1.226, "Safeway", "Meat", 36.2, None),
+    ("2025-03-02T09:10:00+00:00", 2.652, "Wegmans", "Produce", None, None),
+    ("2025-03-02T09:20:00+00:00", 1.0, "Wegmans", "Dairy", None, 40.3),
+    ("2025-03-03T09:00:00+00:00", 4.041, "Safeway", "Meat", 39.3, None),
+    ("2025-03-03T09:10:00+00:00", 3.816, "Wegmans", "Produce", None, None),
+    ("2025-03-03T09:20:00+00:00", 1.0, "Wegmans", "Dairy", None, 36.1),
+    ("2025-03-03T09:20:00+00:00", 1.199, "Safeway", "Meat", 38.5, None),
+    ("2025-03-03T09:30:00+00:00", 1.0, "Wegmans", "Dairy", None, 37.5),
+]
+
+# Summary section of the 1.0 report (generate_report_csv before the SQL
+# summary) for ROUNDING_TIES, 2025-03-01 to 2025-03-10
+ROUNDING_TIES_SUMMARY = (
+    "SUMMARY REPORT,2025-03-01 to 2025-03-10\r\n\r\n"
+    "GRAND TOTAL (All Sources),23.97 lb\r\n\r\n"
+    "Safeway\r\nSOURCE TOTAL,10.56 lb,,\r\n\r\n"
+    "Type,Total Weight (lb),Avg Pickup Temp (°F),Avg Dropoff Temp (°F)\r\n"
+    "Meat,10.56,37.3,\r\n\r\n"
+    "Wegmans\r\nSOURCE TOTAL,13.41 lb,,\r\n\r\n"
+    "Type,Total Weight (lb),Avg Pickup Temp (°F),Avg Dropoff Temp (°F)\r\n"
+    "Produce,9.41,,\r\n"
+    "Dairy,4.00,,36.9\r\n\r\n\r\n"
+).encode("utf-8")
+
+
+@pytest.fixture
+def rounding_ties(temp_db):
+    """ROUNDING_TIES stored newest first; returns the 1.0 report's summary section"""
+    sources = {r["name"]: r["id"] for r in weigh_db.fetch_sources()}
+    types = {r["name"]: r["id"] for r in weigh_db.fetch_types()}
+    conn = weigh_db.get_conn()
+    try:
+        for timestamp, weight, source, type_, pickup, dropoff in reversed(ROUNDING_TIES):
+            conn.execute("""
+                INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                                  temp_pickup_f, temp_dropoff_f)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+            """, (timestamp, weight, sources[source], types[type_], pickup, dropoff))
+        conn.commit()
+    finally:
+        conn.close()
+    return ROUNDING_TIES_SUMMARY
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP to accept one message per DATA (kept in
+    server.messages); counts connections and refuses recipients at
+    "refused" addresses with 550.
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in")
+        while True:
+            line = self.rfile.readline().strip().decode()
+            verb = line.split(" ")[0].upper()
+            if not line or verb == "QUIT":
+                self.reply("221 bye")
+                return
+            if verb == "EHLO":
+                self.reply("250 stand-in")
+            elif verb == "RCPT" and "refused" in line:
+                self.reply("550 no such user")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                lines = []
+                while (data := self.rfile.readline()) != b".\r\n":
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                self.server.messages.append(b"".join(lines))
+                self.reply("250 queued")
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStandIn)
+    server.daemon_threads = True
+    server.messages = []
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
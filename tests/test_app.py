@@ -0,0 +1,350 @@
+# test_app.py
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import streamlit
+from streamlit.components.v2.bidi_component.main import _make_trigger_id
+from streamlit.testing.v1 import AppTest
+
+from weigh import asset_pipeline, logger_core, outbox, quick_entry, report_utils, runtime, scale_backend, stations, weight_stream
+
+APP_PATH = Path(__file__).parent.parent / "src" / "weigh" / "app.py"
+
+TIME_OK = {
+    "ntp_synced": True,
+    "has_internet": True,
+    "needs_manual_time_set": False,
+    "time_valid": True,
+    "time_warning": None,
+}
+
+
+class FakeScale:
+    """A stable 5 lb load, no USB device"""
+
+    def __init__(self, governor=None, path=None):
+        self.path = path
+        self.reading = scale_backend.ScaleReading(5.0, "lb", True)
+
+    def get_latest(self):
+        return self.reading
+
+    def read_stable_weight(self, timeout_s=2.0):
+        return self.reading
+
+    def add_listener(self, callback, weak=False):
+        pass
+
+    def remove_listener(self, callback):
+        pass
+
+    def get_telemetry(self):
+        return {"unknown_unit_codes": {}}
+
+    def close(self):
+        pass
+
+
+class FakeTimeMonitor:
+    def get_status(self, timeout=0.0):
+        return dict(TIME_OK)
+
+
+@pytest.fixture
+def asset_cache(monkeypatch, tmp_path):
+    """Logos and published assets go to a scratch cache, not the source tree"""
+    monkeypatch.setattr(asset_pipeline, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(asset_pipeline, "_rendered", {})
+    monkeypatch.setattr(asset_pipeline, "_bytes", {})
+    monkeypatch.setattr(asset_pipeline, "_published", {})
+
+
+@pytest.fixture
+def kiosk(temp_db, asset_cache, monkeypatch):
+    runtime.reset()
+    # Extra reruns requested by the app on top of the one per user action
+    rerun = streamlit.rerun
+    def counting_rerun(*args, **kwargs):
+        at.extra_reruns += 1
+        rerun(*args, **kwargs)
+    monkeypatch.setattr(streamlit, "rerun", counting_rerun)
+    monkeypatch.setattr(scale_backend, "DymoHIDScale", FakeScale)
+    monkeypatch.setattr(weight_stream, "WEIGHT_PUSH", False)
+    monkeypatch.setattr(runtime, "get_time_monitor", FakeTimeMonitor)
+    # Totals/history cached by earlier tests belong to another database
+    streamlit.cache_data.clear()
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.extra_reruns = 0
+    at.run()
+    assert not at.exception, at.exception
+    yield at
+    runtime.reset()
+
+
+def click_type(at, name):
+    button = next(b for b in at.button if b.label == name)
+    at.button(key=button.key).click().run()
+    assert not at.exception, at.exception
+
+
+def admin_tools_mounted(at):
+    return any(d.label == "Start Date" for d in at.sidebar.date_input)
+
+
+def test_admin_tools_mounted_only_when_opened(kiosk):
+    # Quick actions (kiosk.js hotkeys) are always there, the tools are not
+    keys = {b.key for b in kiosk.sidebar.button}
+    assert {"undo_last", "redo_last", "cheatsheet_btn", "close_app"} <= keys
+    assert not admin_tools_mounted(kiosk)
+
+    kiosk.button(key="admin_open_btn").click().run()
+    assert admin_tools_mounted(kiosk)
+
+    kiosk.button(key="admin_close").click().run()
+    assert not admin_tools_mounted(kiosk)
+
+
+def test_scale_error_is_shown_without_admin_tools(temp_db, asset_cache, monkeypatch):
+    class BrokenScale:
+        def __init__(self, governor=None, path=None):
+            raise OSError("open failed")
+
+    runtime.reset()
+    monkeypatch.setattr(scale_backend, "DymoHIDScale", BrokenScale)
+    monkeypatch.setattr(weight_stream, "WEIGHT_PUSH", False)
+    monkeypatch.setattr(runtime, "get_time_monitor", FakeTimeMonitor)
+    streamlit.cache_data.clear()
+    try:
+        at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+        at.run()
+        assert not at.exception, at.exception
+        assert not admin_tools_mounted(at)
+        assert any("Scale Error: OSError: open failed" in e.value for e in at.sidebar.error)
+    finally:
+        runtime.reset()
+
+
+def test_logging_an_entry_closes_admin_tools(kiosk):
+    kiosk.button(key="admin_open_btn").click().run()
+    click_type(kiosk, "Produce")
+
+    assert not kiosk.session_state.admin_open
+    assert not kiosk.exception
+
+
+def keypad_event(at, event, value=True):
+    """What keypad.js sends on Save / Cancel (AppTest has no component API)"""
+    key = f"entry_keypad_{at.session_state.entry_flow.serial}"
+    keypad = next(e for e in at.main if getattr(e, "key", None) == key)
+    states = at._tree.get_widget_states()
+    trigger = states.widgets.add()
+    trigger.id = _make_trigger_id(keypad.proto.id, "events")
+    trigger.json_trigger_value = json.dumps([{"event": event, "value": value}])
+    at._run(states)
+    assert not at.exception, at.exception
+
+
+def test_temperature_entry_takes_one_rerun_per_action(kiosk):
+    click_type(kiosk, "Meat")
+    assert kiosk.session_state.entry_flow.step == "temperature"
+    # Typing happens in the keypad; only Save reaches Python
+    assert not kiosk.number_input
+    keypad_event(kiosk, "submit", {"temp_pickup": 36.0, "temp_dropoff": 38.0})
+
+    assert kiosk.extra_reruns == 0
+    assert not kiosk.session_state.entry_flow.active
+    runtime.get_entry_writer().flush()
+    [entry] = logger_core.get_recent_entries(1)
+    assert (entry["type"], entry["weight_lb"], entry["temp_pickup_f"]) == ("Meat", 5.0, 36.0)
+
+
+def test_manual_entry_takes_one_rerun_per_action(kiosk):
+    runtime.get_scale().reading = None
+    click_type(kiosk, "Dairy")
+    assert kiosk.session_state.entry_flow.step == "manual"
+
+    # Save without a weight keeps the card open with an error
+    keypad_event(kiosk, "submit", {"weight": 0.0, "temp_pickup": 40.0, "temp_dropoff": 38.0})
+    assert kiosk.session_state.entry_flow.step == "manual"
+    assert kiosk.error
+
+    keypad_event(kiosk, "submit", {"weight": 12.5, "temp_pickup": 40.0, "temp_dropoff": 38.0})
+
+    assert kiosk.extra_reruns == 0
+    runtime.get_entry_writer().flush()
+    [entry] = logger_core.get_recent_entries(1)
+    assert (entry["type"], entry["weight_lb"], entry["temp_dropoff_f"]) == ("Dairy", 12.5, 38.0)
+
+
+def test_number_inputs_without_the_keypad(kiosk, monkeypatch):
+    monkeypatch.setenv("WEIGHIT_KEYPAD", "0")
+    click_type(kiosk, "Meat")
+    serial = kiosk.session_state.entry_flow.serial
+    kiosk.number_input(key=f"temp_pickup_input_{serial}").set_value(36.0)
+    kiosk.button(key="save_temp").click().run()
+
+    assert kiosk.extra_reruns == 0
+    runtime.get_entry_writer().flush()
+    [entry] = logger_core.get_recent_entries(1)
+    assert (entry["type"], entry["temp_pickup_f"]) == ("Meat", 36.0)
+
+
+def test_cancel_takes_one_rerun(kiosk):
+    click_type(kiosk, "Meat")
+    keypad_event(kiosk, "cancel")
+
+    assert kiosk.extra_reruns == 0
+    assert not kiosk.session_state.entry_flow.active
+    assert logger_core.get_recent_entries(1) == []
+
+
+def history_html(at):
+    return next(m.value for m in at.markdown if "history-table" in m.value)
+
+
+@pytest.fixture
+def held_writes(monkeypatch):
+    """Entry writes block until the returned event is set"""
+    log_entry = logger_core.log_entry
+    release = threading.Event()
+
+    def slow_log_entry(*args, **kwargs):
+        release.wait(30.0)
+        log_entry(*args, **kwargs)
+
+    monkeypatch.setattr(logger_core, "log_entry", slow_log_entry)
+    yield release
+    release.set()
+
+
+def test_entry_shows_pending_until_its_write_finishes(kiosk, held_writes):
+    click_type(kiosk, "Produce")
+
+    assert "Pending..." in history_html(kiosk)
+    assert "Produce: 5.0" in next(m.value for m in kiosk.markdown if "totals-box" in m.value)
+
+    held_writes.set()
+    kiosk.session_state.entry_flow.pending[0].future.result(5.0)
+    click_type(kiosk, "Dry")
+    runtime.get_entry_writer().flush()
+    kiosk.run()
+    assert "Pending..." not in history_html(kiosk)
+    assert history_html(kiosk).count("Logged") == 2
+
+
+def test_log_click_does_not_wait_for_the_write(kiosk, held_writes):
+    started = time.monotonic()
+    click_type(kiosk, "Produce")
+    click_type(kiosk, "Dry")
+
+    # Both runs returned while the first write is still held
+    assert time.monotonic() - started < 1.5
+    flow = kiosk.session_state.entry_flow
+    assert [w.future.done() for w in flow.pending] == [False, False]
+    assert history_html(kiosk).count("Pending...") == 2
+    assert kiosk.extra_reruns == 0
+
+
+def test_failed_write_is_shown_as_not_saved(kiosk, monkeypatch):
+    def locked(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(logger_core, "log_entry", locked)
+    click_type(kiosk, "Produce")
+    # Rolled back by the next run after the write has failed
+    runtime.get_entry_writer().flush()
+    kiosk.run()
+
+    assert "Not saved" in history_html(kiosk)
+    assert "database is locked" in kiosk.error[0].value
+    assert "Produce: 0.0" in next(m.value for m in kiosk.markdown if "totals-box" in m.value)
+
+
+def test_station_from_url_sets_source_scale_and_undo_scope(temp_db, asset_cache, monkeypatch, tmp_path):
+    path = tmp_path / "stations.toml"
+    path.write_text('[stations.B]\nscale = "/dev/hidraw1"\nsource = "Safeway"\n')
+    monkeypatch.setattr(stations, "STATIONS_FILE", path)
+    stations.reset()
+    runtime.reset()
+    monkeypatch.setattr(scale_backend, "DymoHIDScale", FakeScale)
+    monkeypatch.setattr(weight_stream, "WEIGHT_PUSH", False)
+    monkeypatch.setattr(runtime, "get_time_monitor", FakeTimeMonitor)
+    streamlit.cache_data.clear()
+    try:
+        at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+        at.query_params["station"] = "B"
+        at.run()
+        assert not at.exception, at.exception
+        assert at.session_state.source == "Safeway"
+        assert runtime.get_scale("/dev/hidraw1").path == "/dev/hidraw1"
+
+        logger_core.log_entry(9.0, "Wegmans", "Dry", station="A")
+        click_type(at, "Produce")
+        at.button(key="undo_last").click().run()
+        # Only station B's own entry is undone
+        assert [e["weight_lb"] for e in logger_core.get_recent_entries(5)] == [9.0]
+    finally:
+        stations.reset()
+        runtime.reset()
+
+
+def send_keys(at, *tokens):
+    at.text_input(key="quick_entry").set_value(quick_entry.SEPARATOR.join(tokens)).run()
+    assert not at.exception, at.exception
+
+
+def test_scanner_burst_is_one_rerun(kiosk):
+    send_keys(kiosk, "scan:SOURCE:Wegmans", "scan:produce", "key:2")
+
+    assert kiosk.session_state.source == "Wegmans"
+    assert kiosk.session_state.quick_entry == ""
+    # Only the donor change reruns the app (the header shows it)
+    assert kiosk.extra_reruns == 1
+    runtime.get_entry_writer().flush()
+    entries = logger_core.get_recent_entries(5)
+    assert [(e["source"], e["type"]) for e in entries] == [("Wegmans", "Dry"), ("Wegmans", "Produce")]
+
+
+def test_scans_wait_for_an_open_entry_step(kiosk):
+    send_keys(kiosk, "scan:Meat", "scan:Produce")
+    assert kiosk.session_state.entry_flow.step == "temperature"
+    assert kiosk.session_state.quick_queue == ["scan:Produce"]
+
+    keypad_event(kiosk, "submit", {"temp_pickup": 40.0, "temp_dropoff": 38.0})
+    runtime.get_entry_writer().flush()
+    assert [e["type"] for e in logger_core.get_recent_entries(5)] == ["Produce", "Meat"]
+    assert kiosk.session_state.quick_queue == []
+
+
+def test_unknown_code_is_reported(kiosk):
+    send_keys(kiosk, "scan:000000")
+    assert "Unknown code: 000000" in kiosk.warning[0].value
+    assert logger_core.get_recent_entries(1) == []
+
+
+class FakeOutboxWorker:
+    woken = 0
+
+    def wake(self):
+        FakeOutboxWorker.woken += 1
+
+
+def test_email_report_is_queued_without_sending(kiosk, monkeypatch, tmp_path):
+    monkeypatch.setattr(outbox, "OUTBOX_DIR", tmp_path / "outbox")
+    monkeypatch.setattr(report_utils, "_spool_dir", tmp_path)
+    monkeypatch.setattr(runtime, "get_outbox_worker", FakeOutboxWorker)
+    FakeOutboxWorker.woken = 0
+
+    kiosk.button(key="admin_open_btn").click().run()
+    next(t for t in kiosk.sidebar.text_input if t.label == "Recipient Email").input("office@example.org")
+    next(b for b in kiosk.sidebar.button if b.label == "Email Report").click().run()
+    assert not kiosk.exception, kiosk.exception
+
+    assert any("queued for office@example.org" in m.value for m in kiosk.success)
+    assert any("1 email(s) waiting to be sent" in m.value for m in kiosk.info)
+    [message] = outbox.get_messages()
+    assert (message["recipient"], message["status"]) == ("office@example.org", outbox.QUEUED)
+    assert FakeOutboxWorker.woken == 1
@@ -0,0 +1,83 @@
+# test_asset_pipeline.py
+import os
+
+import pytest
+from PIL import Image
+
+from weigh import asset_pipeline
+
+
+@pytest.fixture
+def asset_dirs(tmp_path, monkeypatch):
+    static = tmp_path / "static"
+    monkeypatch.setattr(asset_pipeline, "STATIC_DIR", static)
+    monkeypatch.setattr(asset_pipeline, "CACHE_DIR", static / "cache")
+    monkeypatch.setattr(asset_pipeline, "_rendered", {})
+    monkeypatch.setattr(asset_pipeline, "_bytes", {})
+    monkeypatch.setattr(asset_pipeline, "_published", {})
+
+    source = tmp_path / "logo.png"
+    Image.new("RGBA", (400, 200), (255, 0, 0, 255)).save(source)
+    return {"static": static, "source": source}
+
+
+def test_render_once_and_reuse(asset_dirs, monkeypatch):
+    source = asset_dirs["source"]
+    target = asset_pipeline.render_image(source, 100)
+
+    assert target.exists()
+    with Image.open(target) as img:
+        assert img.size == (200, 100)
+
+    # Second call must not touch PIL
+    monkeypatch.setattr(asset_pipeline, "_render", lambda *a: pytest.fail("re-rendered"))
+    assert asset_pipeline.render_image(source, 100) == target
+
+
+def test_source_change_builds_new_version(asset_dirs):
+    source = asset_dirs["source"]
+    first = asset_pipeline.render_image(source, 50)
+
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = asset_pipeline.render_image(source, 50)
+
+    assert second != first
+    assert second.exists()
+    assert not first.exists()  # stale render removed
+
+
+def test_static_url_and_bytes(asset_dirs):
+    source = asset_dirs["source"]
+    url = asset_pipeline.image_url(source, 100)
+    target = asset_pipeline.render_image(source, 100)
+
+    assert url == f"app/static/cache/{target.name}"
+    assert asset_pipeline.image_bytes(source, 100) == target.read_bytes()
+
+
+def test_missing_source(asset_dirs, tmp_path):
+    missing = tmp_path / "nope.png"
+    assert asset_pipeline.render_image(missing, 100) is None
+    assert asset_pipeline.image_url(missing, 100) is None
+    assert asset_pipeline.image_bytes(missing, 100) is None
+
+
+def test_publish_uses_content_hashed_name(asset_dirs, tmp_path):
+    script = tmp_path / "kiosk.js"
+    script.write_text("console.log(1);")
+    first = asset_pipeline.publish(script)
+
+    assert first.read_text() == "console.log(1);"
+    assert asset_pipeline.static_url(first) == f"app/static/cache/{first.name}"
+    # Unchanged source: same URL, no copy
+    assert asset_pipeline.publish(script) == first
+
+    script.write_text("console.log(2);")
+    st = script.stat()
+    os.utime(script, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = asset_pipeline.publish(script)
+
+    assert second.name != first.name
+    assert not first.exists()
+    assert asset_pipeline.publish(tmp_path / "missing.js") is None
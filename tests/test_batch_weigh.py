@@ -0,0 +1,120 @@
+# test_batch_weigh.py
+import sqlite3
+
+import pytest
+
+from weigh import logger_core
+from weigh.batch_weigh import BatchWeighSession
+from weigh.scale_backend import ScaleReading
+
+
+def place_and_lift(session, weight):
+    session.feed(ScaleReading(0.0, "lb", False))
+    session.feed(ScaleReading(weight / 2, "lb", False))   # settling
+    session.feed(ScaleReading(weight, "lb", True))
+    session.feed(ScaleReading(weight, "lb", True))
+    return session.feed(ScaleReading(0.0, "lb", False))  # lifted
+
+
+def test_placement_recorded_on_return_to_zero():
+    session = BatchWeighSession()
+    assert place_and_lift(session, 12.5) == 12.5
+    assert place_and_lift(session, 7.5) == 7.5
+
+    assert session.placements == [12.5, 7.5]
+    assert session.total == 20.0
+    assert session.pending is None
+
+
+def test_unstable_readings_are_not_placements():
+    session = BatchWeighSession()
+    session.feed(ScaleReading(3.0, "lb", False))
+    assert session.feed(ScaleReading(0.0, "lb", False)) is None
+    assert session.placements == []
+
+
+def test_settled_value_pending_until_lifted():
+    session = BatchWeighSession()
+    session.feed(ScaleReading(4.0, "lb", True))
+    session.feed(ScaleReading(4.4, "lb", True))  # box nudged, re-settled
+    assert session.pending == 4.4
+    assert session.placements == []
+
+    session.feed(ScaleReading(0.0, "lb", False))
+    assert session.placements == [4.4]
+
+
+def test_remove_last_and_clear():
+    session = BatchWeighSession()
+    place_and_lift(session, 1.0)
+    place_and_lift(session, 2.0)
+
+    assert session.remove_last() == 2.0
+    assert session.placements == [1.0]
+
+    session.clear()
+    assert session.placements == []
+    assert session.remove_last() is None
+
+
+def test_commit_as_single_entry(temp_db):
+    session = BatchWeighSession()
+    for w in (10.0, 20.5, 30.25):
+        place_and_lift(session, w)
+
+    assert session.commit("Safeway", "Dry") == 1
+    assert session.placements == []
+
+    logs = logger_core.get_last_logs(10)
+    assert len(logs) == 1
+    assert logs[0]["weight_lb"] == 60.75
+
+
+def test_commit_each_placement(temp_db):
+    session = BatchWeighSession()
+    for w in (10.0, 20.5):
+        place_and_lift(session, w)
+
+    assert session.commit("Wegmans", "Meat", split=True,
+                          temp_pickup_f=38.0, temp_dropoff_f=36.0) == 2
+
+    logs = logger_core.get_last_logs(10)
+    assert sorted(r["weight_lb"] for r in logs) == [10.0, 20.5]
+    assert all(r["temp_pickup_f"] == 38.0 for r in logs)
+    assert abs(logger_core.totals_today_weight() - 30.5) < 1e-6
+
+
+def test_commit_empty_session_writes_nothing(temp_db):
+    assert BatchWeighSession().commit("Safeway", "Dry") == 0
+    assert logger_core.get_last_logs(10) == []
+
+
+def test_placement_recorded_during_commit_is_kept(temp_db, monkeypatch):
+    session = BatchWeighSession()
+    place_and_lift(session, 10.0)
+    log_entries = logger_core.log_entries
+
+    def slow_write(*args, **kwargs):
+        # The reader thread records the next box while the entry is written
+        place_and_lift(session, 4.5)
+        return log_entries(*args, **kwargs)
+
+    monkeypatch.setattr(logger_core, "log_entries", slow_write)
+    assert session.commit("Safeway", "Dry") == 1
+    assert [r["weight_lb"] for r in logger_core.get_last_logs(10)] == [10.0]
+    assert session.placements == [4.5]
+
+
+def test_failed_commit_keeps_the_placements(temp_db, monkeypatch):
+    session = BatchWeighSession()
+    for w in (10.0, 20.5):
+        place_and_lift(session, w)
+
+    def locked(*args, **kwargs):
+        place_and_lift(session, 4.5)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(logger_core, "log_entries", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        session.commit("Safeway", "Dry")
+    assert session.placements == [10.0, 20.5, 4.5]
@@ -0,0 +1,70 @@
+# test_change_feed.py
+import sqlite3
+
+from weigh import db, logger_core
+
+
+def test_every_write_advances_the_token(temp_db):
+    start = db.fetch_change_token()
+
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+    after_insert = db.fetch_change_token()
+    assert after_insert > start
+
+    logger_core.undo_last_entry()
+    after_undo = db.fetch_change_token()
+    assert after_undo > after_insert
+
+    logger_core.redo_last_entry()
+    assert db.fetch_change_token() > after_undo
+
+
+def test_changes_record_log_id_and_day(temp_db):
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+    log_id = logger_core.undo_last_entry()
+
+    conn = sqlite3.connect(temp_db["db_path"])
+    rows = conn.execute("SELECT log_id, op, day FROM log_changes ORDER BY seq").fetchall()
+    day = conn.execute("SELECT DATE(timestamp) FROM logs WHERE id=?", (log_id,)).fetchone()[0]
+    conn.close()
+
+    assert rows == [(log_id, "insert", day), (log_id, "update", day)]
+
+
+def test_renaming_or_deleting_names_advances_the_token(temp_db):
+    start = db.fetch_change_token()
+    conn = db.get_conn()
+    try:
+        conn.execute("UPDATE types SET sort_order=9 WHERE name='Bread'")
+        conn.commit()
+        # Not shown in reports: no change
+        assert db.fetch_change_token() == start
+
+        conn.execute("UPDATE types SET name='Bakery' WHERE name='Bread'")
+        conn.commit()
+        renamed = db.fetch_change_token()
+        assert renamed > start
+
+        conn.execute("DELETE FROM sources WHERE name='Other'")
+        conn.commit()
+        assert db.fetch_change_token() > renamed
+        ops = [row[0] for row in conn.execute("SELECT op FROM log_changes WHERE day IS NULL ORDER BY seq")]
+    finally:
+        conn.close()
+    assert ops == ["type", "source"]
+
+
+def test_existing_database_gets_change_feed(tmp_path, monkeypatch):
+    # Database created before the change feed existed
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    with open(db.os.path.join(db.os.path.dirname(db.__file__), "schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    monkeypatch.setattr(db, "_schema_initialized", False)
+
+    token = db.fetch_change_token()
+    logger_core.log_entry(1.0, "Safeway", "Dry")
+    assert db.fetch_change_token() > token
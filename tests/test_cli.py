@@ -49,3 +49,32 @@ def test_cli_undo(temp_db):
 
     r = runner.invoke(cli, ["totals"], standalone_mode=False)
     assert "0.00" in r.output  # nothing left
+
+
+def test_cli_export(temp_db, tmp_path):
+    runner = CliRunner()
+    runner.invoke(cli, ["log", "Safeway", "Produce", "5.0"], standalone_mode=False)
+
+    r = runner.invoke(cli, ["export", str(tmp_path), "--format", "npz"], standalone_mode=False)
+    assert r.exit_code == 0
+    assert "Exported 1 rows" in r.output
+    assert list(tmp_path.glob("month=*/logs.npz"))
+
+    r = runner.invoke(cli, ["export", str(tmp_path), "--format", "npz"], standalone_mode=False)
+    assert "is up to date" in r.output
+
+
+def test_cli_export_without_pyarrow(temp_db, tmp_path, monkeypatch):
+    import sys
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    runner = CliRunner()
+    runner.invoke(cli, ["log", "Safeway", "Produce", "5.0"], standalone_mode=False)
+
+    r = runner.invoke(cli, ["export", str(tmp_path / "parquet")])
+    assert r.exit_code == 1
+    assert "pip install weighit[export]" in r.output
+
+    # npz needs numpy only
+    r = runner.invoke(cli, ["export", str(tmp_path / "npz"), "--format", "npz"])
+    assert r.exit_code == 0, r.output
+    assert list(tmp_path.glob("npz/month=*/logs.npz"))
@@ -0,0 +1,80 @@
+# test_entry_flow.py
+from weigh import entry_flow
+from weigh.scale_backend import ScaleReading
+
+MEAT = {"name": "Meat", "requires_temp": 1}
+PRODUCE = {"name": "Produce", "requires_temp": 0}
+
+
+def test_stable_reading_without_temperatures_logs_at_once():
+    flow = entry_flow.EntryFlow()
+    entry = flow.start(PRODUCE, "Wegmans", ScaleReading(4.5, "lb", True))
+
+    assert entry == entry_flow.Entry(4.5, "Wegmans", "Produce")
+    assert not flow.active
+
+
+def test_temperature_step_keeps_scale_weight():
+    flow = entry_flow.EntryFlow()
+    assert flow.start(MEAT, "Wegmans", ScaleReading(7.0, "lb", True)) is None
+    assert flow.step == entry_flow.TEMPERATURE
+
+    # A weight typed elsewhere does not replace the scale reading
+    entry = flow.save(weight_lb=1.0, temp_pickup_f=35.0, temp_dropoff_f=34.0)
+    assert entry == entry_flow.Entry(7.0, "Wegmans", "Meat", 35.0, 34.0)
+    assert flow.step == entry_flow.IDLE
+
+
+def test_unusable_reading_asks_for_weight():
+    for reading in (None, ScaleReading(0.0, "lb", True), ScaleReading(2.0, "kg", True)):
+        flow = entry_flow.EntryFlow()
+        flow.start(PRODUCE, "Safeway", reading)
+        assert flow.step == entry_flow.MANUAL
+
+    assert flow.save(weight_lb=0.0) is None
+    assert flow.error
+    entry = flow.save(weight_lb=3.0, temp_pickup_f=40.0)
+    assert entry == entry_flow.Entry(3.0, "Safeway", "Produce")
+    assert flow.error is None
+
+
+def test_cancel_and_new_flow_start_clean():
+    flow = entry_flow.EntryFlow()
+    flow.start(MEAT, "Wegmans", None)
+    flow.save()
+    first = flow.serial
+
+    flow.cancel()
+    assert (flow.step, flow.error, flow.type_name) == (entry_flow.IDLE, None, None)
+    assert flow.save() is None
+
+    flow.start(MEAT, "Wegmans", None)
+    assert flow.serial == first + 1
+    assert flow.error is None
+
+
+def test_writer_confirms_and_reports_failures(temp_db, monkeypatch):
+    from weigh import logger_core
+
+    writer = entry_flow.EntryWriter()
+    flow = entry_flow.EntryFlow()
+    try:
+        flow.track(writer.submit(flow.start(PRODUCE, "Wegmans", ScaleReading(4.5, "lb", True))))
+        assert flow.reconcile(timeout=5.0) == 1
+        assert flow.pending == []
+        assert logger_core.get_recent_entries(1)[0]["weight_lb"] == 4.5
+
+        def locked(*args, **kwargs):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(logger_core, "log_entry", locked)
+        flow.track(writer.submit(flow.start(PRODUCE, "Wegmans", ScaleReading(2.0, "lb", True))))
+        assert flow.reconcile(timeout=5.0) == 0
+        [failed] = flow.failed
+        assert failed.error == "RuntimeError: database is locked"
+
+        # Starting the next entry clears the rollback display
+        flow.start(MEAT, "Wegmans", None)
+        assert flow.failed == []
+    finally:
+        writer.close()
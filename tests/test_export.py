@@ -0,0 +1,126 @@
+# test_export.py
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from weigh import db, export, logger_core
+
+
+def add_log(timestamp, weight, source, type_, pickup=None, station=None):
+    conn = db.get_conn()
+    try:
+        source_id = conn.execute("SELECT id FROM sources WHERE name=?", (source,)).fetchone()[0]
+        type_id = conn.execute("SELECT id FROM types WHERE name=?", (type_,)).fetchone()[0]
+        conn.execute("""
+            INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted, temp_pickup_f, station)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (timestamp, weight, source_id, type_id, pickup, station))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def read_dataset(out_dir, fmt="parquet"):
+    return ds.dataset(out_dir, format=fmt, partitioning="hive").to_table().sort_by("id")
+
+
+def test_parquet_export_is_typed_and_partitioned_by_month(temp_db, tmp_path):
+    add_log("2025-02-28T23:59:00+00:00", 1.5, "Safeway", "Produce")
+    add_log("2025-03-01T09:00:00+00:00", 3.0, "Wegmans", "Meat", pickup=36.0, station="A")
+    add_log("2025-03-02T09:00:00+00:00", 9.0, "Wegmans", "Dry")
+    logger_core.undo_last_entry()
+
+    result = export.export_logs(tmp_path, "parquet")
+    assert (result.full, result.rows, result.written) == (True, 2, ["2025-02", "2025-03"])
+    assert export.partition_path(tmp_path, "2025-03", "parquet").exists()
+
+    table = read_dataset(tmp_path)
+    assert table.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert pa.types.is_dictionary(table.schema.field("source").type)
+    assert pa.types.is_dictionary(table.schema.field("type").type)
+    assert table.column("source").to_pylist() == ["Safeway", "Wegmans"]
+    assert table.column("type").to_pylist() == ["Produce", "Meat"]
+    assert table.column("weight_lb").to_pylist() == [1.5, 3.0]
+    assert table.column("temp_pickup_f").to_pylist() == [None, 36.0]
+    assert table.column("station").to_pylist() == [None, "A"]
+
+
+def test_repeat_export_rewrites_only_changed_months(temp_db, tmp_path):
+    add_log("2025-02-10T09:00:00+00:00", 1.0, "Safeway", "Produce")
+    add_log("2025-03-10T09:00:00+00:00", 2.0, "Safeway", "Produce")
+    export.export_logs(tmp_path, "arrow")
+    february = export.partition_path(tmp_path, "2025-02", "arrow")
+    february_written = february.stat().st_mtime_ns
+
+    assert export.export_logs(tmp_path, "arrow").written == []
+
+    add_log("2025-03-11T09:00:00+00:00", 4.0, "Wegmans", "Dry")
+    result = export.export_logs(tmp_path, "arrow")
+    assert (result.full, result.written, result.rows) == (False, ["2025-03"], 2)
+    assert february.stat().st_mtime_ns == february_written
+    assert read_dataset(tmp_path, "arrow").column("weight_lb").to_pylist() == [1.0, 2.0, 4.0]
+
+    # A month whose entries are all undone loses its partition
+    conn = db.get_conn()
+    conn.execute("UPDATE logs SET deleted=1 WHERE DATE(timestamp) LIKE '2025-03-%'")
+    conn.commit()
+    conn.close()
+    result = export.export_logs(tmp_path, "arrow")
+    assert result.removed == ["2025-03"]
+    assert not export.partition_path(tmp_path, "2025-03", "arrow").exists()
+    assert export.read_state(tmp_path)["months"] == {"2025-02": 1}
+
+
+def test_npz_export_and_format_switch(temp_db, tmp_path):
+    add_log("2025-03-01T09:00:00+00:00", 3.0, "Wegmans", "Meat", pickup=36.0)
+    export.export_logs(tmp_path, "parquet")
+
+    result = export.export_logs(tmp_path, "npz")
+    assert result.full
+    month_dir = export.partition_path(tmp_path, "2025-03", "npz").parent
+    assert [p.name for p in month_dir.iterdir()] == ["logs.npz"]
+
+    with np.load(export.partition_path(tmp_path, "2025-03", "npz")) as data:
+        assert data["timestamp"].dtype == np.dtype("datetime64[us]")
+        assert str(data["timestamp"][0]) == "2025-03-01T09:00:00.000000"
+        assert data["source_names"][data["source"][0]] == "Wegmans"
+        assert data["type_names"][data["type"][0]] == "Meat"
+        assert data["temp_pickup_f"][0] == 36.0
+        assert np.isnan(data["temp_dropoff_f"][0])
+        assert data["station"][0] == -1
+
+
+
+def test_numpy_and_arrow_read_timestamps_alike():
+    values = ["2025-03-01T09:00:00+00:00", "2025-03-01 09:00:00.5", "2025-03-01T09:00:00Z"]
+    expected = [1740819600_000_000, 1740819600_500_000, 1740819600_000_000]
+    assert export._timestamps_us(values).tolist() == expected
+    assert export._arrow_timestamps(values).cast(pa.int64()).to_pylist() == expected
+
+    # Another offset goes row by row
+    values.append("2025-03-01T04:00:00-05:00")
+    assert export._timestamps_us(values).tolist() == expected + [1740819600_000_000]
+
+def test_changed_dictionaries_rewrite_every_month(temp_db, tmp_path):
+    add_log("2025-02-10T09:00:00+00:00", 1.0, "Safeway", "Produce", station="A")
+    add_log("2025-03-10T09:00:00+00:00", 2.0, "Wegmans", "Dry")
+    export.export_logs(tmp_path, "npz")
+
+    # A new station in March changes the station codes of February too
+    add_log("2025-03-11T09:00:00+00:00", 4.0, "Wegmans", "Dry", station="0")
+    result = export.export_logs(tmp_path, "npz")
+    assert (result.full, result.written) == (True, ["2025-02", "2025-03"])
+
+    conn = db.get_conn()
+    conn.execute("UPDATE sources SET name='Safeway North' WHERE name='Safeway'")
+    conn.commit()
+    conn.close()
+    assert export.export_logs(tmp_path, "npz").full
+
+    for month in ("2025-02", "2025-03"):
+        with np.load(export.partition_path(tmp_path, month, "npz")) as data:
+            assert list(data["station_names"]) == ["0", "A"]
+            assert "Safeway North" in list(data["source_names"])
+    with np.load(export.partition_path(tmp_path, "2025-02", "npz")) as data:
+        assert data["source_names"][data["source"][0]] == "Safeway North"
+        assert data["station_names"][data["station"][0]] == "A"
@@ -0,0 +1,93 @@
+# test_history.py
+import random
+from datetime import datetime, timezone
+
+from weigh import db, history, logger_core
+
+TODAY = datetime.now(timezone.utc).date().isoformat()
+
+
+def fresh_rows(source):
+    return history.HistoryView(source, TODAY).rows()
+
+
+def test_new_entry_costs_one_query_and_one_render(temp_db):
+    for i in range(20):
+        logger_core.log_entry(float(i + 1), "Wegmans", "Produce")
+    view = history.HistoryView("Wegmans", TODAY)
+    rows = view.rows()
+    assert len(rows) == history.HISTORY_ROWS
+    assert "20.00 lb" in rows[0]
+
+    view.queries = view.rendered = 0
+    assert view.rows() == rows
+    assert (view.queries, view.rendered) == (1, 0)
+
+    logger_core.log_entry(21.0, "Wegmans", "Meat", temp_pickup_f=35.0)
+    rows = view.rows()
+    assert (view.queries, view.rendered) == (2, 1)
+    assert "21.00 lb" in rows[0] and "Pick:35.0°F" in rows[0]
+    assert rows == fresh_rows("Wegmans")
+
+
+def test_other_views_are_not_touched(temp_db):
+    logger_core.log_entry(1.0, "Wegmans", "Produce")
+    view = history.HistoryView("Wegmans", TODAY)
+    view.rows()
+
+    logger_core.log_entry(2.0, "Safeway", "Produce")
+    view.rendered = 0
+    assert len(view.rows()) == 1
+    assert view.rendered == 0
+
+
+def test_renamed_type_reloads_the_view(temp_db):
+    logger_core.log_entry(1.0, "Wegmans", "Bread")
+    view = history.HistoryView(None, TODAY)
+    assert "Bread" in view.rows()[0]
+
+    conn = db.get_conn()
+    conn.execute("UPDATE types SET name='Bakery' WHERE name='Bread'")
+    conn.commit()
+    conn.close()
+    assert "Bakery" in view.rows()[0]
+
+
+def test_undo_pulls_up_the_next_row_and_redo_restores(temp_db):
+    for i in range(history.HISTORY_ROWS + 2):
+        logger_core.log_entry(float(i + 1), "Wegmans", "Produce")
+    view = history.HistoryView("Wegmans", TODAY)
+    before = view.rows()
+
+    logger_core.undo_last_entry()
+    rows = view.rows()
+    assert len(rows) == history.HISTORY_ROWS
+    assert rows == fresh_rows("Wegmans")
+    assert "2.00 lb" in rows[-1]
+
+    logger_core.redo_last_entry()
+    assert view.rows() == before
+
+
+def test_matches_a_fresh_query_after_random_edits(temp_db):
+    rng = random.Random(7)
+    view = history.HistoryView("Wegmans", TODAY)
+    view.rows()
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.6:
+            logger_core.log_entry(rng.randint(1, 99), rng.choice(["Wegmans", "Safeway"]), "Dry")
+        elif action < 0.8:
+            logger_core.undo_last_entry()
+        elif action < 0.9:
+            logger_core.redo_last_entry()
+        else:
+            # Entry moved to another day (timestamp fixed by hand)
+            conn = db.get_conn()
+            conn.execute("UPDATE logs SET timestamp = '2000-01-01T00:00:00+00:00' "
+                         "WHERE id = (SELECT MAX(id) FROM logs)")
+            conn.commit()
+            conn.close()
+        if rng.random() < 0.3:
+            assert view.rows() == fresh_rows("Wegmans")
+    assert view.rows() == fresh_rows("Wegmans")
@@ -0,0 +1,99 @@
+# test_idle_governor.py
+from weigh.idle_governor import IdleGovernor
+from weigh.scale_backend import ScaleReading
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_governor(clock, **kwargs):
+    kwargs.setdefault("idle_after_s", 60.0)
+    kwargs.setdefault("idle_display_interval_s", 30.0)
+    return IdleGovernor(clock=clock, **kwargs)
+
+
+def test_goes_idle_after_quiet_period_at_zero_weight():
+    clock = FakeClock()
+    gov = make_governor(clock)
+
+    gov.note_reading(ScaleReading(0.0, "lb", False))
+    assert not gov.is_idle()
+
+    clock.now += 61
+    gov.note_reading(ScaleReading(0.0, "lb", False))
+    assert gov.is_idle()
+    assert gov.display_interval(3.0) == 30.0
+
+
+def test_non_zero_packet_wakes_immediately():
+    clock = FakeClock()
+    gov = make_governor(clock)
+    clock.now += 120
+    assert gov.is_idle()
+
+    gov.note_reading(ScaleReading(2.5, "lb", True))
+    assert not gov.is_idle()
+    assert gov.display_interval(3.0) == 3.0
+
+
+def test_idle_reader_publishes_one_packet_per_interval():
+    clock = FakeClock()
+    gov = make_governor(clock, idle_read_interval_s=2.0)
+    assert not gov.skip_packet()
+    clock.now += 120
+    assert gov.is_idle()
+
+    assert not gov.skip_packet()
+    clock.now += 1
+    assert gov.skip_packet()
+    clock.now += 1
+    assert not gov.skip_packet()
+
+    # A load ends idle mode: every packet is published again
+    gov.note_reading(ScaleReading(2.5, "lb", True))
+    assert not gov.skip_packet()
+    assert not gov.skip_packet()
+
+
+def test_session_activity_wakes():
+    clock = FakeClock()
+    gov = make_governor(clock)
+    clock.now += 120
+    assert gov.is_idle()
+
+    gov.note_session()
+    assert not gov.is_idle()
+
+
+def test_disabled_governor_never_idles():
+    clock = FakeClock()
+    gov = make_governor(clock, idle_after_s=0)
+    clock.now += 10_000
+    assert not gov.is_idle()
+    assert gov.display_interval(0) == 0
+
+
+def test_measurement_mode_counts_wakeups_per_minute():
+    clock = FakeClock()
+    gov = make_governor(clock, measure=True)
+
+    for _ in range(5):
+        gov.note_reading(ScaleReading(0.0, "lb", False))
+        clock.now += 1
+    gov.record_wakeup("display")
+
+    assert gov.wakeups_per_minute() == {"reader": 5, "display": 1}
+
+    clock.now += 61
+    assert gov.wakeups_per_minute() == {"reader": 0, "display": 0}
+
+
+def test_measurement_off_records_nothing():
+    gov = make_governor(FakeClock())
+    gov.record_wakeup("display")
+    assert gov.wakeups_per_minute() == {}
@@ -0,0 +1,172 @@
+# test_kiosk_lite.py
+import asyncio
+import threading
+from urllib.parse import urlencode
+
+import pytest
+
+from weigh import db, kiosk_lite, logger_core, runtime, scale_backend, stations
+
+
+class FakeScale:
+    """A stable 5 lb load, no USB device"""
+
+    def __init__(self, governor=None, path=None):
+        self.reading = scale_backend.ScaleReading(5.0, "lb", True)
+
+    def get_latest(self):
+        return self.reading
+
+    def read_stable_weight(self, timeout_s=2.0):
+        return self.reading
+
+    def add_listener(self, callback):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def lite(temp_db, monkeypatch):
+    runtime.reset()
+    kiosk_lite._broadcasters.clear()
+    monkeypatch.setattr(scale_backend, "DymoHIDScale", FakeScale)
+    yield
+    runtime.reset()
+    kiosk_lite._broadcasters.clear()
+
+
+def call(method, path, form=None, query=""):
+    """One request to the ASGI app: (status, body text)"""
+    body = urlencode(form or {}).encode()
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode()}
+    asyncio.run(kiosk_lite.app(scope, receive, send))
+    return sent[0]["status"], b"".join(m.get("body", b"") for m in sent[1:]).decode()
+
+
+def test_page_has_donors_weight_and_type_buttons(lite):
+    status, page = call("GET", "/")
+    assert status == 200
+    assert "<option selected>Food for Neighbors</option>" in page
+    assert "5.0 lbs" in page
+    assert 'data-action="log" data-type="Produce"' in page
+    assert "history-table" in page
+
+
+def test_log_returns_the_updated_panel(lite):
+    status, panel = call("POST", "/log", {"type": "Produce", "source": "Wegmans"})
+    assert status == 200
+    assert "Logged Produce 5.00 lb" in panel
+    assert "Produce: 5.0" in panel and "5.00 lb" in panel
+    [entry] = logger_core.get_recent_entries(1)
+    assert (entry["source"], entry["type"], entry["weight_lb"]) == ("Wegmans", "Produce", 5.0)
+
+
+def test_temperature_step_travels_in_the_card(lite):
+    _, panel = call("POST", "/log", {"type": "Meat", "source": "Wegmans"})
+    assert "Temperature Recording" in panel
+    assert 'name="step" value="temperature"' in panel
+    assert logger_core.get_recent_entries(1) == []
+
+    _, panel = call("POST", "/save", {"type": "Meat", "source": "Wegmans", "step": "temperature",
+                                      "weight_lb": "5.0", "temp_pickup": "35", "temp_dropoff": "38"})
+    assert "entry-card" not in panel
+    [entry] = logger_core.get_recent_entries(1)
+    assert (entry["type"], entry["weight_lb"], entry["temp_pickup_f"]) == ("Meat", 5.0, 35.0)
+
+
+def test_manual_entry_needs_a_weight(lite):
+    runtime.get_scale().reading = None
+    _, panel = call("POST", "/log", {"type": "Dry", "source": "Wegmans"})
+    assert "Manual Weight Entry" in panel
+
+    form = {"type": "Dry", "source": "Wegmans", "step": "manual", "weight": "0"}
+    _, panel = call("POST", "/save", form)
+    assert "Please enter a weight greater than 0" in panel
+
+    _, panel = call("POST", "/save", dict(form, weight="12.5"))
+    assert "Logged Dry 12.50 lb" in panel
+
+
+def test_undo_and_redo(lite):
+    call("POST", "/log", {"type": "Produce", "source": "Wegmans"})
+    _, panel = call("POST", "/undo", {"source": "Wegmans"})
+    assert "Undone" in panel and "Produce: 0.0" in panel
+    _, panel = call("POST", "/redo", {"source": "Wegmans"})
+    assert "Redone" in panel and "Produce: 5.0" in panel
+
+
+def test_type_names_are_escaped_in_the_totals(lite):
+    conn = db.get_conn()
+    conn.execute("UPDATE types SET name='Fruit & <Veg>' WHERE name='Produce'")
+    conn.commit()
+    conn.close()
+    _, panel = call("POST", "/source", {"source": "Wegmans"})
+    assert "Fruit &amp; &lt;Veg&gt;: 0.0" in panel
+
+
+def test_weight_stream_is_woken_by_the_broadcaster(lite, monkeypatch):
+    station = stations.get_station(None)
+    broadcaster = kiosk_lite.get_broadcaster(station)
+    threads = []
+    to_thread = asyncio.to_thread
+
+    def counting(fn, *args):
+        threads.append(fn)
+        return to_thread(fn, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", counting)
+
+    async def stream():
+        bodies = []
+        gone = asyncio.Event()
+
+        async def receive():
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if "body" not in message:
+                return
+            bodies.append(message["body"])
+            if len(bodies) == 1:
+                # A new weight from the scale reader thread
+                reading = scale_backend.ScaleReading(7.5, "lb", True)
+                threading.Thread(target=broadcaster.publish, args=(reading,)).start()
+            else:
+                gone.set()
+
+        await asyncio.wait_for(kiosk_lite.stream_weight(station, receive, send), 5.0)
+        return bodies
+
+    assert asyncio.run(stream()) == [b'data: {"text": "5.0 lbs"}\n\n', b'data: {"text": "7.5 lbs"}\n\n']
+    # No thread waits for the weight: only the broadcaster lookup ran in one
+    assert threads == [kiosk_lite.get_broadcaster]
+
+
+def test_assets_and_unknown_paths(lite):
+    assert call("GET", "/assets/lite.js")[0] == 200
+    assert call("GET", "/assets/../schema.sql")[0] == 404
+    assert call("GET", "/nope")[0] == 404
+    assert call("PUT", "/log")[0] == 405
+
+
+def test_report_is_streamed_from_the_spool(lite, monkeypatch, tmp_path):
+    from weigh import report_utils
+    monkeypatch.setattr(report_utils, "_spool_dir", tmp_path)
+    monkeypatch.setattr(report_utils, "_report_cache", report_utils.OrderedDict())
+    logger_core.log_entry(5.0, "Wegmans", "Produce")
+
+    status, csv_text = call("GET", "/report.csv", query="start=2000-01-01&end=2100-01-01")
+    assert status == 200
+    assert csv_text.startswith("SUMMARY REPORT")
+    assert ",Wegmans,Produce,5.0," in csv_text
@@ -0,0 +1,136 @@
+# test_outbox.py
+import email
+import socket
+import time
+
+import pytest
+
+from weigh import db, outbox, report_utils
+
+
+@pytest.fixture
+def queue(temp_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_DIR", tmp_path / "outbox")
+    report = tmp_path / "report.csv"
+    report.write_bytes(b"SUMMARY REPORT,2025-03-01 to 2025-03-01\r\n.leading dot\r\n")
+    return report
+
+
+def settings_for(server):
+    host, port = server.server_address
+    return report_utils.SMTPSettings(host, port, "kiosk@example.org", starttls=False)
+
+
+@pytest.fixture
+def worker(smtp_server):
+    worker = outbox.OutboxWorker(lambda: settings_for(smtp_server), retry_base_s=30)
+    yield worker
+    worker.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_queued_reports_are_sent_over_one_session(queue, worker, smtp_server):
+    first = outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue,
+                           note="March")
+    outbox.enqueue("board@example.org", "Donation Report", "Attached.", "report.csv", queue)
+    attachment = outbox.get_messages()[0]["attachment"]
+
+    assert worker.run_once() == 2
+    assert smtp_server.connections == 1
+    assert worker.connections == 1
+
+    received = email.message_from_bytes(smtp_server.messages[0])
+    assert received["To"] == "office@example.org"
+    text, csv_part = received.get_payload()
+    assert text.get_payload() == "Attached.\r\n\r\nNote: March"
+    assert csv_part.get_filename() == "report.csv"
+    assert csv_part.get_payload(decode=True) == queue.read_bytes()
+
+    assert [m["status"] for m in outbox.get_messages()] == [outbox.SENT, outbox.SENT]
+    assert not outbox.has_unsent()
+    assert outbox.get_status().last_sent["id"] in (first, first + 1)
+    # Sent attachments are deleted; the report itself is untouched
+    assert not list((queue.parent / "outbox").iterdir())
+    assert not (queue.parent / "outbox" / attachment).exists()
+    assert queue.exists()
+
+    # The session stays open for the next report
+    outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue)
+    assert worker.run_once() == 1
+    assert smtp_server.connections == 1
+
+
+def test_unreachable_server_keeps_the_report_queued_with_backoff(queue, smtp_server):
+    port = free_port()
+    settings = report_utils.SMTPSettings("127.0.0.1", port, "kiosk@example.org", starttls=False)
+    worker = outbox.OutboxWorker(lambda: settings, retry_base_s=30, timeout_s=2)
+    try:
+        outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue)
+        outbox.enqueue("board@example.org", "Donation Report", "Attached.", "report.csv", queue)
+
+        started = time.monotonic()
+        assert worker.run_once() == 0
+        assert time.monotonic() - started < 2
+        [second, first] = outbox.get_messages()
+        assert (first["status"], first["attempts"]) == (outbox.QUEUED, 1)
+        assert "ConnectionRefusedError" in first["last_error"]
+        # The worker waits for the retry time instead of trying the next message
+        assert second["attempts"] == 0
+        status = outbox.get_status()
+        assert status.queued == 2
+        assert 25 < (status.next_attempt - outbox._now()).total_seconds() <= 30
+        assert worker.run_once() == 0
+        assert outbox.get_messages()[1]["attempts"] == 1
+
+        # Server back: retry now sends both, the first on its second attempt
+        settings = settings_for(smtp_server)
+        assert worker.retry_now() == 2
+        assert worker.run_once() == 2
+        assert [m["attempts"] for m in outbox.get_messages()] == [1, 2]
+    finally:
+        worker.close()
+
+
+def test_refused_recipient_fails_without_blocking_the_queue(queue, worker, smtp_server):
+    outbox.enqueue("refused@example.org", "Donation Report", "Attached.", "report.csv", queue)
+    outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue)
+
+    assert worker.run_once() == 1
+    [sent, failed] = outbox.get_messages()
+    assert sent["status"] == outbox.SENT
+    assert failed["status"] == outbox.FAILED
+    assert "550" in failed["last_error"]
+    assert smtp_server.connections == 1
+    status = outbox.get_status()
+    assert (status.queued, status.failed) == (0, 1)
+    assert "550" in status.failed_error
+    # Kept for a retry after fixing the address
+    assert (queue.parent / "outbox").exists() and len(list((queue.parent / "outbox").iterdir())) == 1
+
+
+def test_background_worker_sends_queued_report(queue, worker, smtp_server):
+    worker.start()
+    outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue)
+    worker.wake()
+
+    deadline = time.monotonic() + 10
+    while outbox.has_unsent() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not outbox.has_unsent()
+    assert len(smtp_server.messages) == 1
+
+
+def test_stale_claim_is_sent_again(queue, worker, smtp_server):
+    outbox.enqueue("office@example.org", "Donation Report", "Attached.", "report.csv", queue)
+    conn = db.get_conn()
+    conn.execute("UPDATE outbox SET status='sending', next_attempt='2000-01-01T00:00:00.000000+00:00'")
+    conn.commit()
+    conn.close()
+
+    assert worker.run_once() == 1
+    assert outbox.get_messages()[0]["status"] == outbox.SENT
@@ -0,0 +1,83 @@
+# test_prewarm.py
+import pytest
+
+from weigh import asset_pipeline, prewarm, runtime
+
+
+class FakeScale:
+    opened = 0
+
+    def __init__(self, governor=None):
+        FakeScale.opened += 1
+        self.governor = governor
+
+    def get_latest(self):
+        return None
+
+    def add_listener(self, callback):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fresh_runtime(monkeypatch):
+    runtime.reset()
+    FakeScale.opened = 0
+    monkeypatch.setattr(runtime.scale_backend, "DymoHIDScale", FakeScale)
+    yield
+    runtime.reset()
+
+
+def test_runtime_resources_are_created_once(fresh_runtime):
+    scale = runtime.get_scale()
+    assert runtime.get_scale() is scale
+    assert scale.governor is runtime.get_idle_governor()
+    assert FakeScale.opened == 1
+
+
+def test_failed_factory_is_retried(fresh_runtime, monkeypatch):
+    def unplugged(governor=None):
+        raise OSError("open failed")
+
+    monkeypatch.setattr(runtime.scale_backend, "DymoHIDScale", unplugged)
+    with pytest.raises(OSError):
+        runtime.get_scale()
+
+    monkeypatch.setattr(runtime.scale_backend, "DymoHIDScale", FakeScale)
+    assert isinstance(runtime.get_scale(), FakeScale)
+
+
+def test_run_times_every_step_and_continues_after_failure():
+    calls = []
+
+    def broken():
+        calls.append("broken")
+        raise OSError("no scale")
+
+    results = prewarm.run([("broken", broken), ("ok", lambda: calls.append("ok"))])
+
+    assert calls == ["broken", "ok"]
+    assert [r.name for r in results] == ["broken", "ok"]
+    assert results[0].error == "OSError: no scale"
+    assert results[1].error is None
+    assert all(r.ms >= 0 for r in results)
+    assert "FAILED: OSError: no scale" in prewarm.format_report(results)
+
+
+def test_default_steps_warm_scale_database_and_assets(temp_db, fresh_runtime, tmp_path, monkeypatch):
+    monkeypatch.setattr(prewarm.weight_stream, "WEIGHT_PUSH", False)
+    monkeypatch.setattr(asset_pipeline, "STATIC_DIR", tmp_path / "static")
+    monkeypatch.setattr(asset_pipeline, "CACHE_DIR", tmp_path / "static" / "cache")
+    monkeypatch.setattr(asset_pipeline, "_rendered", {})
+    monkeypatch.setattr(asset_pipeline, "_published", {})
+    monkeypatch.setattr(runtime, "get_time_monitor", lambda: None)
+
+    results = prewarm.run()
+
+    assert [r.error for r in results] == [None] * len(prewarm.STEPS)
+    assert FakeScale.opened == 1
+    for logo in asset_pipeline.KIOSK_LOGOS:
+        assert asset_pipeline.render_image(logo, asset_pipeline.LOGO_HEIGHT_PX).exists()
+    assert any((tmp_path / "static" / "cache").glob("kiosk-*.js"))
@@ -0,0 +1,50 @@
+# test_quick_entry.py
+from weigh import quick_entry
+from weigh.quick_entry import Action, QuickEntry
+
+SOURCES = ["Safeway", "Trader Joe's", "Wegmans"]
+TYPES = ["Produce", "Dry", "Dairy", "Meat"]
+
+
+def test_split_batch_keeps_order():
+    batch = quick_entry.SEPARATOR.join(["key:1", "scan:4011", "scan:undo"])
+    assert quick_entry.split_batch(batch) == ["key:1", "scan:4011", "scan:undo"]
+    assert quick_entry.split_batch("") == []
+
+
+def test_hotkeys_log_type_buttons_in_order():
+    qe = QuickEntry(SOURCES, TYPES, hotkeys={"u": "undo"})
+    assert qe.resolve("key:1") == Action("log", "Produce")
+    assert qe.resolve("key:4") == Action("log", "Meat")
+    assert qe.resolve("key:5") is None
+    assert qe.resolve("key:u") == Action("undo")
+
+
+def test_scans_resolve_codes_labels_and_names():
+    qe = QuickEntry(SOURCES, TYPES, barcodes={"0001": "source:Wegmans", "4011": "type:produce"})
+    assert qe.resolve("scan:0001") == Action("source", "Wegmans")
+    assert qe.resolve("scan:4011") == Action("log", "Produce")
+    assert qe.resolve("scan:DONOR:trader joe's") == Action("source", "Trader Joe's")
+    assert qe.resolve("scan:TYPE:Dairy") == Action("log", "Dairy")
+    assert qe.resolve("scan:meat") == Action("log", "Meat")
+    assert qe.resolve("scan:REDO") == Action("redo")
+
+
+def test_unknown_codes_are_not_actions():
+    qe = QuickEntry(SOURCES, TYPES, barcodes={"9": "type:Fish"})
+    assert qe.resolve("scan:9") is None
+    assert qe.resolve("scan:SOURCE:Nowhere") is None
+    assert qe.resolve("scan:123456") is None
+    assert qe.resolve("other:1") is None
+
+
+def test_config_file(tmp_path):
+    path = tmp_path / "quick_entry.toml"
+    path.write_text('[barcodes]\n"0001" = "source:Wegmans"\n\n[hotkeys]\nu = "undo"\n')
+    try:
+        config = quick_entry.load_config(path)
+        assert config == {"barcodes": {"0001": "source:Wegmans"}, "hotkeys": {"u": "undo"}}
+        qe = quick_entry.get_quick_entry(SOURCES, TYPES)
+        assert qe.resolve("scan:0001") == Action("source", "Wegmans")
+    finally:
+        quick_entry.reset()
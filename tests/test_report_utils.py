@@ -0,0 +1,248 @@
+# test_report_utils.py
+import email
+import smtplib
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from weigh import db, logger_core, report_utils, summary_cache
+
+
+@pytest.fixture
+def spool(temp_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(report_utils, "_report_cache", report_utils.OrderedDict())
+    monkeypatch.setattr(report_utils, "_spool_dir", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def counted_reports(spool, monkeypatch):
+    calls = []
+    generate = report_utils.iter_report_csv
+
+    def counting(start, end):
+        calls.append((start, end))
+        return generate(start, end)
+
+    monkeypatch.setattr(report_utils, "iter_report_csv", counting)
+    return calls
+
+
+def test_report_cached_until_logs_change(counted_reports):
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+
+    first = report_utils.get_report_csv("2000-01-01", "2100-01-01")
+    assert report_utils.get_report_csv("2000-01-01", "2100-01-01") == first
+    assert len(counted_reports) == 1
+
+    logger_core.log_entry(2.0, "Safeway", "Dry")
+    second = report_utils.get_report_csv("2000-01-01", "2100-01-01")
+    assert len(counted_reports) == 2
+    assert second != first
+
+    logger_core.undo_last_entry()
+    assert report_utils.get_report_csv("2000-01-01", "2100-01-01") == first
+    assert len(counted_reports) == 3
+
+
+def test_report_cache_is_per_range_and_drops_stale_tokens(counted_reports):
+    report_utils.get_report_csv("2000-01-01", "2000-01-31")
+    report_utils.get_report_csv("2000-02-01", "2000-02-28")
+    assert len(report_utils._report_cache) == 2
+
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+    report_utils.get_report_csv("2000-01-01", "2000-01-31")
+    assert len(report_utils._report_cache) == 1
+
+
+def test_renamed_source_gives_a_fresh_report(spool):
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+    first = report_utils.get_report_file("2000-01-01", "2100-01-01")
+    assert b"Safeway" in first.read_bytes()
+
+    conn = db.get_conn()
+    conn.execute("UPDATE sources SET name='Safeway Annapolis' WHERE name='Safeway'")
+    conn.commit()
+    conn.close()
+
+    renamed = report_utils.get_report_file("2000-01-01", "2100-01-01")
+    assert renamed != first
+    assert b"Safeway Annapolis" in renamed.read_bytes()
+
+
+def add_log(timestamp, weight, source, type_, pickup=None, dropoff=None):
+    sources = {r["name"]: r["id"] for r in db.fetch_sources()}
+    types = {r["name"]: r["id"] for r in db.fetch_types()}
+    conn = db.get_conn()
+    try:
+        conn.execute("""
+            INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                              temp_pickup_f, temp_dropoff_f)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (timestamp, weight, sources[source], types[type_], pickup, dropoff))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# Output of the Python-side aggregation that the SQL summary replaced
+EXPECTED_CSV = (
+    "SUMMARY REPORT,2025-03-01 to 2025-03-02\r\n\r\n"
+    "GRAND TOTAL (All Sources),24.45 lb\r\n\r\n"
+    "Safeway\r\nSOURCE TOTAL,16.90 lb,,\r\n\r\n"
+    "Type,Total Weight (lb),Avg Pickup Temp (°F),Avg Dropoff Temp (°F)\r\n"
+    "Produce,12.50,,\r\nMeat,4.40,35.5,38.5\r\n\r\n"
+    "Wegmans\r\nSOURCE TOTAL,7.55 lb,,\r\n\r\n"
+    "Type,Total Weight (lb),Avg Pickup Temp (°F),Avg Dropoff Temp (°F)\r\n"
+    "Dry,0.30,,\r\nDairy,7.25,,40.0\r\n\r\n\r\n"
+    "DETAILED LOGS\r\n"
+    "Timestamp,Source,Type,Weight (lb),Pickup Temp (°F),Dropoff Temp (°F)\r\n"
+    "2025-03-01T09:00:00+00:00,Safeway,Produce,12.5,,\r\n"
+    "2025-03-01T09:05:00+00:00,Safeway,Meat,3.3,36.0,38.5\r\n"
+    "2025-03-01T09:06:00+00:00,Safeway,Meat,1.1,35.0,\r\n"
+    "2025-03-02T10:00:00+00:00,Wegmans,Dairy,7.25,,40.0\r\n"
+    "2025-03-02T10:01:00+00:00,Wegmans,Dry,0.1,,\r\n"
+    "2025-03-02T10:02:00+00:00,Wegmans,Dry,0.2,,\r\n"
+)
+
+
+def test_report_csv_summary_is_aggregated_in_sql(temp_db, monkeypatch):
+    add_log("2025-03-01T09:00:00+00:00", 12.5, "Safeway", "Produce")
+    add_log("2025-03-01T09:05:00+00:00", 3.3, "Safeway", "Meat", 36.0, 38.5)
+    add_log("2025-03-01T09:06:00+00:00", 1.1, "Safeway", "Meat", 35.0)
+    add_log("2025-03-02T10:00:00+00:00", 7.25, "Wegmans", "Dairy", dropoff=40.0)
+    add_log("2025-03-02T10:01:00+00:00", 0.1, "Wegmans", "Dry")
+    add_log("2025-03-02T10:02:00+00:00", 0.2, "Wegmans", "Dry")
+    # Outside the range / undone
+    add_log("2025-03-03T11:00:00+00:00", 99.0, "Safeway", "Produce")
+    add_log("2025-03-02T11:00:00+00:00", 50.0, "Safeway", "Produce")
+    logger_core.undo_last_entry()
+
+    def materialized(*args):
+        raise AssertionError("report loaded every row into a list")
+
+    monkeypatch.setattr(logger_core, "get_logs_between", materialized)
+    assert report_utils.generate_report_csv("2025-03-01", "2025-03-02").decode() == EXPECTED_CSV
+
+
+def test_summary_rows(temp_db):
+    add_log("2025-03-01T09:05:00+00:00", 3.0, "Safeway", "Meat", 36.0)
+    add_log("2025-03-01T09:06:00+00:00", 1.0, "Safeway", "Meat", 35.0)
+
+    [row] = logger_core.summarize_logs_between("2025-03-01", "2025-03-01")
+    assert row == {"source": "Safeway", "type": "Meat", "weight_lb": 4.0, "entries": 2,
+                   "temp_pickup_avg": 35.5, "temp_pickup_count": 2,
+                   "temp_dropoff_avg": None, "temp_dropoff_count": 0}
+
+
+def test_summary_matches_the_1_0_report_on_rounding_ties(rounding_ties, monkeypatch):
+    monkeypatch.setattr(summary_cache, "SUMMARY_CACHE", False)
+    report = report_utils.generate_report_csv("2025-03-01", "2025-03-10")
+    assert report[:len(rounding_ties)] == rounding_ties
+    assert report[len(rounding_ties):].startswith(b"DETAILED LOGS")
+
+
+def test_report_is_generated_in_chunks(temp_db, monkeypatch):
+    for i in range(200):
+        add_log(f"2025-03-01T09:{i // 60:02d}:{i % 60:02d}+00:00", 1.5, "Safeway", "Produce")
+    monkeypatch.setattr(report_utils, "REPORT_CHUNK_SIZE", 1024)
+
+    chunks = list(report_utils.iter_report_csv("2025-03-01", "2025-03-01"))
+    assert len(chunks) > 5
+    assert max(len(c) for c in chunks) < 1024 + 200
+    assert b"".join(chunks) == report_utils.generate_report_csv("2025-03-01", "2025-03-01")
+
+
+def test_cached_reports_are_files_removed_when_stale(spool):
+    path = report_utils.get_report_file("2000-01-01", "2100-01-01")
+    assert path.parent == spool
+    assert path.read_bytes().startswith(b"SUMMARY REPORT")
+    assert report_utils.get_report_file("2000-01-01", "2100-01-01") == path
+
+    logger_core.log_entry(5.0, "Safeway", "Produce")
+    newer = report_utils.get_report_file("2000-01-01", "2100-01-01")
+    assert newer != path
+    assert not path.exists()
+    assert [p.name for p in spool.iterdir()] == [newer.name]
+
+
+def test_attachment_is_streamed_over_smtp(smtp_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(report_utils, "EMAIL_CHUNK_SIZE", 57 * 4)
+    attachment = tmp_path / "report.csv"
+    attachment.write_bytes(b"".join(b"2025-03-01,Safeway,Produce,%d\r\n" % i for i in range(500)))
+    msg = MIMEMultipart()
+    msg["Subject"] = "Donation Report"
+    msg.attach(MIMEText("Attached.\n.\nNote: lines starting with a dot"))
+    part = MIMEBase("application", "octet-stream")
+    part.set_payload(report_utils._ATTACHMENT_PLACEHOLDER)
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", 'attachment; filename="report.csv"')
+    msg.attach(part)
+
+    with open(attachment, "rb") as f, smtplib.SMTP(*smtp_server.server_address) as smtp:
+        report_utils.send_streamed(smtp, "kiosk@example.org", "office@example.org",
+                                   report_utils.iter_message(msg, f))
+
+    [raw] = smtp_server.messages
+    received = email.message_from_bytes(raw)
+    text, csv_part = received.get_payload()
+    assert text.get_payload() == "Attached.\r\n.\r\nNote: lines starting with a dot"
+    assert csv_part.get_filename() == "report.csv"
+    assert csv_part.get_payload(decode=True) == attachment.read_bytes()
+
+
+def sheet_rows(path, number):
+    """Cell texts of one sheet of an xlsx file, row by row"""
+    import xml.etree.ElementTree as ET
+    import zipfile
+    ns = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    with zipfile.ZipFile(path) as z:
+        root = ET.fromstring(z.read(f"xl/worksheets/sheet{number}.xml"))
+    return [["".join(c.itertext()) for c in row.findall("x:c", ns)]
+            for row in root.find("x:sheetData", ns).findall("x:row", ns)]
+
+
+def test_xlsx_report_has_summary_per_source_and_detail_sheets(spool):
+    import zipfile
+    add_log("2025-03-01T09:00:00+00:00", 12.5, "Safeway", "Produce")
+    add_log("2025-03-01T09:05:00+00:00", 3.25, "Wegmans", "Meat", 36.0, 38.5)
+
+    path = report_utils.get_report_file("2025-03-01", "2025-03-01", "xlsx")
+    assert path.suffix == ".xlsx"
+    with zipfile.ZipFile(path) as z:
+        assert b'name="Summary"' in z.read("xl/workbook.xml")
+
+    summary = sheet_rows(path, 1)
+    assert ["GRAND TOTAL (All Sources)", "15.75", "lb"] in summary
+    assert ["Safeway", "12.5", "1"] in summary and ["Meat", "3.25", "1"] in summary
+    assert sheet_rows(path, 2)[1:] == [["Safeway", "Produce", "12.5", "1"],
+                                       ["Wegmans", "Meat", "3.25", "1", "36.0", "38.5"]]
+    detail = sheet_rows(path, 3)
+    assert detail[0][0] == "Timestamp (UTC)"
+    # 2025-03-01 09:05 as an Excel date number
+    assert detail[2] == [repr(45717 + 545 / 1440), "Wegmans", "Meat", "3.25", "36.0", "38.5"]
+
+
+def test_xlsx_detail_continues_on_a_new_sheet(spool, monkeypatch):
+    monkeypatch.setattr(report_utils, "XLSX_DETAIL_ROWS", 3)
+    for minute in range(5):
+        add_log(f"2025-03-01T09:0{minute}:00+00:00", 1.0, "Safeway", "Produce")
+
+    path = report_utils.get_report_file("2025-03-01", "2025-03-01", "xlsx")
+    assert [len(sheet_rows(path, n)) for n in (3, 4, 5)] == [3, 3, 2]
+
+
+def test_xlsx_full_detail_sheet_is_the_last_one(spool, monkeypatch):
+    import zipfile
+    monkeypatch.setattr(report_utils, "XLSX_DETAIL_ROWS", 3)
+    # Header plus two entries fill the sheet exactly
+    add_log("2025-03-01T09:00:00+00:00", 1.0, "Safeway", "Produce")
+    add_log("2025-03-01T09:01:00+00:00", 2.0, "Safeway", "Produce")
+
+    path = report_utils.get_report_file("2025-03-01", "2025-03-01", "xlsx")
+    with zipfile.ZipFile(path) as z:
+        assert b'name="Detail 2"' not in z.read("xl/workbook.xml")
+        assert "xl/worksheets/sheet4.xml" not in z.namelist()
+    assert len(sheet_rows(path, 3)) == 3
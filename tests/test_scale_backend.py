@@ -1,6 +1,11 @@
+import gc
+import threading
 import time
 import unittest
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
+from weigh.batch_weigh import BatchWeighSession
+from weigh.idle_governor import IdleGovernor
 from weigh.scale_backend import DymoHIDScale, ScaleReading
 
 class TestDymoHIDScale(unittest.TestCase):
@@ -61,12 +66,42 @@ class TestDymoHIDScale(unittest.TestCase):
         reading = scale._parse_report(packet)
         
         self.assertIsNotNone(reading)
-        self.assertEqual(reading.value, 10.0)
-        self.assertEqual(reading.unit, "oz")
+        self.assertEqual(reading.value, 0.625)    # normalized to lb
+        self.assertEqual(reading.unit, "lb")
+        self.assertEqual(reading.raw_value, Decimal("10.0"))
+        self.assertEqual(reading.raw_unit, "oz")
         self.assertFalse(reading.is_stable)
         
         scale.close()
 
+    @patch('weigh.scale_backend.hid')
+    def test_parse_report_grams(self, mock_hid):
+        scale = DymoHIDScale()
+
+        # 2268 g, exponent 0
+        packet = bytes([0x03, 0x04, 0x02, 0x00, 0xDC, 0x08])
+        reading = scale._parse_report(packet)
+
+        self.assertEqual(reading.unit, "lb")
+        self.assertEqual(reading.raw_value, Decimal(2268))
+        self.assertEqual(reading.raw_unit, "g")
+        self.assertEqual(reading.resolution, Decimal(1))
+        self.assertAlmostEqual(reading.value, 2268 / 453.59237, places=9)
+
+        scale.close()
+
+    @patch('weigh.scale_backend.hid')
+    def test_parse_report_unknown_unit(self, mock_hid):
+        scale = DymoHIDScale()
+
+        packet = bytes([0x03, 0x04, 0x07, 0xFF, 0x0F, 0x00])
+        self.assertIsNone(scale._parse_report(packet))
+        self.assertIsNone(scale._parse_report(packet))
+
+        self.assertEqual(scale.get_telemetry()["unknown_unit_codes"], {"0x07": 2})
+
+        scale.close()
+
     @patch('weigh.scale_backend.hid')
     def test_read_stable_weight(self, mock_hid):
         scale = DymoHIDScale()
@@ -83,3 +118,71 @@ class TestDymoHIDScale(unittest.TestCase):
         self.assertEqual(scale.get_latest.call_count, 3)
         
         scale.close()
+
+    @patch('weigh.scale_backend.hid')
+    def test_listener_receives_readings(self, mock_hid):
+        packet = [0x03, 0x04, 0x0C, 0xFF, 0x0F, 0x00]
+        mock_device = MagicMock()
+        mock_device.read.side_effect = lambda n: (time.sleep(0.01), packet)[1]
+        mock_hid.device.return_value = mock_device
+
+        received = []
+        scale = DymoHIDScale()
+        scale.add_listener(received.append)
+
+        deadline = time.time() + 1.0
+        while not received and time.time() < deadline:
+            time.sleep(0.01)
+        scale.remove_listener(received.append)
+        scale.close()
+
+        self.assertTrue(received)
+        self.assertEqual(received[0].value, 1.5)
+
+    @patch('weigh.scale_backend.hid')
+    def test_weak_listener_removed_with_its_session(self, mock_hid):
+        scale = DymoHIDScale()
+        kept = BatchWeighSession()
+        dropped = BatchWeighSession()
+        scale.add_listener(kept.feed, weak=True)
+        scale.add_listener(dropped.feed, weak=True)
+        scale.add_listener(dropped.feed, weak=True)
+        self.assertEqual(len(scale._listeners), 2)
+
+        # Browser session gone without ending its batch
+        del dropped
+        gc.collect()
+        self.assertEqual(len(scale._listeners), 1)
+
+        scale.remove_listener(kept.feed)
+        self.assertEqual(scale._listeners, [])
+        scale.close()
+
+    @patch('weigh.scale_backend.hid')
+    def test_idle_reader_still_sees_a_load_with_the_next_packet(self, mock_hid):
+        zero = [0x03, 0x04, 0x0C, 0xFF, 0x00, 0x00]
+        load = [0x03, 0x04, 0x0C, 0xFF, 0x0F, 0x00]
+        packets = iter([zero, zero, zero, load])
+        listening = threading.Event()
+        mock_device = MagicMock()
+        mock_device.read.side_effect = lambda n: (listening.wait(1.0) and next(packets, None)
+                                                  or (time.sleep(0.01), [])[1])
+        mock_hid.device.return_value = mock_device
+
+        # Idle already, publishing one packet per minute
+        governor = IdleGovernor(idle_after_s=1.0, idle_read_interval_s=60.0)
+        governor._last_activity -= 10
+        self.assertTrue(governor.is_idle())
+
+        received = []
+        scale = DymoHIDScale(governor=governor)
+        scale.add_listener(received.append)
+        listening.set()
+        deadline = time.time() + 1.0
+        while len(received) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        scale.close()
+
+        # The first zero, then the load at once (no idle sleep in between)
+        self.assertEqual([r.value for r in received], [0.0, 1.5])
+        self.assertFalse(governor.is_idle())
@@ -0,0 +1,55 @@
+# test_startup.py
+import sys
+
+from weigh import asset_pipeline, startup_profile
+from weigh.lazy_imports import lazy_import
+
+# Modules the first render must not pull in (admin-only or heavy)
+DEFERRED = {"smtplib", "email.mime.multipart", "PIL", "numpy", "pandas"}
+# Modules newly imported by the first render (37 when this was set); raise
+# it only for a good reason
+IMPORT_BUDGET = 60
+
+
+def test_lazy_import_runs_module_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "lazy_probe.py").write_text("import sys\nsys.lazy_probe_ran = True\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe", raising=False)
+
+    module = lazy_import("lazy_probe")
+    assert not getattr(sys, "lazy_probe_ran", False)
+
+    assert module.VALUE == 42
+    assert sys.lazy_probe_ran
+    del sys.lazy_probe_ran
+    sys.modules.pop("lazy_probe", None)
+
+
+def test_parse_importtime_keeps_outermost_imports():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   email.errors",
+        "import time:       200 |        300 | smtplib",
+        "some other stderr line",
+        "import time:        50 |         50 | weigh.profiling",
+    ]
+    imports = startup_profile.parse_importtime(lines)
+    assert imports == [("smtplib", 300), ("weigh.profiling", 50)]
+    assert startup_profile.by_package(imports) == {"smtplib": 300, "weigh": 50}
+
+
+def test_first_render_import_budget(tmp_path, monkeypatch):
+    # Logos already rendered (asset cache), as on any start after the first
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(asset_pipeline, "CACHE_DIR", cache)
+    monkeypatch.setattr(asset_pipeline, "_rendered", {})
+    monkeypatch.setattr(asset_pipeline, "_bytes", {})
+    for logo in ("slfp_logo.png", "scale_icon.png"):
+        asset_pipeline.render_image(startup_profile.APP_PATH.parent / "assets" / logo, 138)
+
+    profile = startup_profile.run_profile(env={"WEIGHIT_DB_PATH": str(tmp_path / "weigh.db"),
+                                               "WEIGHIT_ASSET_CACHE": str(cache)})
+
+    assert profile.exceptions == []
+    assert DEFERRED.isdisjoint(profile.new_modules)
+    assert len(profile.new_modules) <= IMPORT_BUDGET, profile.new_modules
@@ -0,0 +1,67 @@
+# test_stations.py
+import pytest
+
+from weigh import logger_core, stations
+
+
+@pytest.fixture
+def stations_file(tmp_path, monkeypatch):
+    path = tmp_path / "stations.toml"
+    path.write_text(
+        '[stations.A]\n'
+        'source = "Wegmans"\n'
+        '\n'
+        '[stations.B]\n'
+        'scale = "/dev/hidraw1"\n'
+        'undo = "all"\n'
+    )
+    monkeypatch.setattr(stations, "STATIONS_FILE", path)
+    stations.reset()
+    yield path
+    stations.reset()
+
+
+def test_stations_from_config_file(stations_file):
+    a = stations.get_station("A")
+    assert (a.scale, a.source, a.undo_station) == (None, "Wegmans", "A")
+    b = stations.get_station("B")
+    assert (b.scale, b.source, b.undo_station) == ("/dev/hidraw1", None, None)
+    assert set(stations.all_stations()) == {"A", "B"}
+
+
+def test_missing_or_unknown_station_is_the_default(stations_file):
+    assert stations.get_station(None) is stations.DEFAULT_STATION
+    assert stations.get_station("Z") is stations.DEFAULT_STATION
+    assert stations.DEFAULT_STATION.undo_station is None
+
+
+def test_no_config_file_means_one_default_station(tmp_path, monkeypatch):
+    monkeypatch.setattr(stations, "STATIONS_FILE", tmp_path / "missing.toml")
+    stations.reset()
+    assert stations.all_stations() == {"default": stations.DEFAULT_STATION}
+    stations.reset()
+
+
+def test_unreadable_config_file_fails_loudly(stations_file):
+    stations_file.write_text('[stations.A\nsource = "Wegmans"\n')
+    with pytest.raises(ValueError):
+        stations.load_stations()
+
+
+def test_bad_undo_scope_is_rejected():
+    with pytest.raises(ValueError):
+        stations.parse_stations({"stations": {"A": {"undo": "everything"}}})
+
+
+def test_undo_and_redo_stay_within_the_station(temp_db):
+    logger_core.log_entry(1.0, "Wegmans", "Produce", station="A")
+    logger_core.log_entry(2.0, "Safeway", "Produce", station="B")
+
+    undone = logger_core.undo_last_entry("A")
+    assert [e["weight_lb"] for e in logger_core.get_recent_entries(5)] == [2.0]
+    assert logger_core.redo_last_entry("B") is None
+    assert logger_core.redo_last_entry("A") == undone
+
+    # Undo any entry (default station)
+    logger_core.undo_last_entry()
+    assert [e["weight_lb"] for e in logger_core.get_recent_entries(5)] == [1.0]
@@ -0,0 +1,126 @@
+# test_summary_cache.py
+import json
+
+import pytest
+
+from weigh import db, logger_core, report_utils, summary_cache
+
+
+def add_log(timestamp, weight, source, type_, pickup=None, dropoff=None):
+    conn = db.get_conn()
+    try:
+        source_id = conn.execute("SELECT id FROM sources WHERE name=?", (source,)).fetchone()[0]
+        type_id = conn.execute("SELECT id FROM types WHERE name=?", (type_,)).fetchone()[0]
+        conn.execute("""
+            INSERT INTO logs (timestamp, weight_lb, source_id, type_id, deleted,
+                              temp_pickup_f, temp_dropoff_f)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (timestamp, weight, source_id, type_id, pickup, dropoff))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def stored_days():
+    conn = db.get_conn()
+    try:
+        return [row[0] for row in conn.execute("SELECT day FROM day_summaries ORDER BY day")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def march(temp_db, monkeypatch):
+    """Entries on two closed days and today (2025-03-10); counts day scans"""
+    monkeypatch.setattr(summary_cache, "today", lambda: "2025-03-10")
+    add_log("2025-03-01T09:00:00+00:00", 12.5, "Safeway", "Produce")
+    add_log("2025-03-01T09:05:00+00:00", 3.3, "Safeway", "Meat", 36.0, 38.5)
+    add_log("2025-03-02T10:00:00+00:00", 7.25, "Wegmans", "Dairy", dropoff=40.0)
+    add_log("2025-03-10T08:00:00+00:00", 1.1, "Safeway", "Meat", 35.0)
+
+    scans = []
+    aggregate = summary_cache._aggregate
+
+    def counting(conn, start, end):
+        scans.append((start, end))
+        return aggregate(conn, start, end)
+
+    monkeypatch.setattr(summary_cache, "_aggregate", counting)
+    return scans
+
+
+def test_closed_days_are_stored_once_and_today_is_live(march):
+    first = summary_cache.summarize_between("2025-03-01", "2025-03-10")
+    assert first == logger_core.summarize_logs_between("2025-03-01", "2025-03-10")
+    # Every closed day gets a block, empty ones included
+    assert stored_days() == [f"2025-03-0{d}" for d in range(1, 10)]
+    assert march == [("2025-03-01", "2025-03-10")]
+
+    add_log("2025-03-10T08:30:00+00:00", 2.0, "Safeway", "Meat")
+    second = summary_cache.summarize_between("2025-03-01", "2025-03-10")
+    assert march[1:] == [("2025-03-10", "2025-03-10")]
+    meat = next(row for row in second if row["type"] == "Meat")
+    assert (meat["weight_lb"], meat["entries"], meat["temp_pickup_avg"]) == (6.4, 3, 35.5)
+
+    # A range of closed days only reads blocks
+    summary_cache.summarize_between("2025-03-01", "2025-03-09")
+    assert len(march) == 2
+
+
+def test_a_write_invalidates_only_its_day(march):
+    summary_cache.summarize_between("2025-03-01", "2025-03-09")
+
+    add_log("2025-03-02T11:00:00+00:00", 5.0, "Wegmans", "Dry")
+    assert "2025-03-02" not in stored_days()
+    assert "2025-03-01" in stored_days()
+    [dry] = [row for row in summary_cache.summarize_between("2025-03-02", "2025-03-02")
+             if row["type"] == "Dry"]
+    assert dry["weight_lb"] == 5.0
+    assert march[-1] == ("2025-03-02", "2025-03-02")
+
+    # Undo is an update of the entry: its day is rebuilt without it
+    logger_core.undo_last_entry()
+    assert "2025-03-02" not in stored_days()
+    summary = summary_cache.summarize_between("2025-03-01", "2025-03-09")
+    assert summary == logger_core.summarize_logs_between("2025-03-01", "2025-03-09")
+    assert "Dry" not in {row["type"] for row in summary}
+
+
+def test_block_with_a_wrong_hash_is_rebuilt(march):
+    expected = summary_cache.summarize_between("2025-03-01", "2025-03-09")
+    conn = db.get_conn()
+    conn.execute("UPDATE day_summaries SET rows=? WHERE day='2025-03-01'",
+                 (json.dumps([[1, 1, [999.0], [], []]]),))
+    conn.commit()
+    conn.close()
+
+    assert summary_cache.summarize_between("2025-03-01", "2025-03-09") == expected
+    assert march[-1] == ("2025-03-01", "2025-03-01")
+
+
+def test_block_is_not_stored_if_its_day_changed_since_the_snapshot(temp_db):
+    seq = db.fetch_change_token()
+    add_log("2025-03-01T09:00:00+00:00", 12.5, "Safeway", "Produce")
+
+    conn = db.get_conn()
+    try:
+        summary_cache._store(conn, {"2025-03-01": [], "2025-03-02": []}, seq)
+    finally:
+        conn.close()
+    assert stored_days() == ["2025-03-02"]
+
+
+def test_report_from_blocks_matches_one_pass_and_the_1_0_report(rounding_ties, monkeypatch):
+    # Two closed days stored as blocks, the third aggregated live
+    monkeypatch.setattr(summary_cache, "today", lambda: "2025-03-03")
+
+    def summary():
+        report = report_utils.generate_report_csv("2025-03-01", "2025-03-10")
+        return report[:report.index(b"DETAILED LOGS")]
+
+    monkeypatch.setattr(summary_cache, "SUMMARY_CACHE", False)
+    assert summary() == rounding_ties
+    monkeypatch.setattr(summary_cache, "SUMMARY_CACHE", True)
+    assert summary() == rounding_ties  # builds the blocks
+    assert stored_days() == ["2025-03-01", "2025-03-02"]
+    assert summary() == rounding_ties  # composed from them
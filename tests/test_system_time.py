@@ -0,0 +1,101 @@
+# test_system_time.py
+import socket
+import threading
+import time
+
+from weigh import system_time
+from weigh.system_time import TimeStatusMonitor
+
+
+def test_connectivity_probes_run_in_parallel(monkeypatch):
+    calls = []
+
+    def fake_connect(host, port, timeout):
+        calls.append(host)
+        if host == "1.1.1.1":
+            return True
+        time.sleep(timeout)
+        return False
+
+    monkeypatch.setattr(system_time, "_can_connect", fake_connect)
+    started = time.monotonic()
+    assert system_time.check_internet_connectivity(timeout=1.0)
+    # Did not wait for the slow probe in front of the reachable one
+    assert time.monotonic() - started < 0.9
+    assert "1.1.1.1" in calls
+
+
+def test_offline_takes_one_timeout_not_three(monkeypatch):
+    def fake_connect(host, port, timeout):
+        time.sleep(timeout)
+        return False
+
+    monkeypatch.setattr(system_time, "_can_connect", fake_connect)
+    started = time.monotonic()
+    assert not system_time.check_internet_connectivity(timeout=0.3)
+    assert time.monotonic() - started < 0.8
+
+
+def test_can_connect_closes_socket_and_keeps_default_timeout(monkeypatch):
+    closed = []
+
+    class FakeSocket:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            closed.append(True)
+
+    monkeypatch.setattr(socket, "create_connection", lambda addr, timeout: FakeSocket())
+    default = socket.getdefaulttimeout()
+
+    assert system_time._can_connect("8.8.8.8", 53, 0.1)
+    assert closed == [True]
+    assert socket.getdefaulttimeout() == default
+
+
+def test_monitor_serves_cached_status_without_blocking():
+    release = threading.Event()
+    probes = []
+
+    def probe():
+        release.wait(5)
+        probes.append(1)
+        return {"has_internet": True, "ntp_synced": True, "ntp_message": "ok",
+                "needs_manual_time_set": False}
+
+    monitor = TimeStatusMonitor(refresh_s=3600, probe=probe).start()
+    try:
+        # First check still running: sessions get None immediately
+        assert monitor.get_status() is None
+
+        release.set()
+        status = monitor.get_status(timeout=5)
+        assert status["has_internet"] and status["ntp_synced"]
+        assert "time_valid" in status and "current_time" in status
+
+        # Reads are served from the cache
+        for _ in range(10):
+            monitor.get_status()
+        assert len(probes) == 1
+    finally:
+        monitor.stop()
+
+
+def test_monitor_refresh_and_failed_probe():
+    results = iter([RuntimeError("no timedatectl"),
+                    {"has_internet": False, "ntp_synced": False, "ntp_message": "",
+                     "needs_manual_time_set": True}])
+
+    def probe():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monitor = TimeStatusMonitor(refresh_s=3600, probe=probe)
+    failed = monitor.refresh()
+    assert failed["needs_manual_time_set"]
+    assert "no timedatectl" in failed["ntp_message"]
+
+    assert monitor.refresh()["ntp_message"] == ""
@@ -0,0 +1,102 @@
+# test_weight_stream.py
+import http.client
+import json
+import time
+
+from weigh.scale_backend import ScaleReading
+from weigh.weight_stream import WeightBroadcaster, WeightStreamServer, format_weight
+
+
+def read_event(resp):
+    """Read one SSE event (skipping keepalive comments) and return its data."""
+    while True:
+        line = resp.fp.readline().decode("utf-8").strip()
+        if line.startswith("data: "):
+            resp.fp.readline()  # blank line terminating the event
+            return json.loads(line[len("data: "):])
+
+
+def test_format_weight():
+    assert format_weight(ScaleReading(12.34, "lb", True)) == "12.3 lbs"
+    assert format_weight(None) == "—"
+
+
+def test_publish_only_bumps_version_on_change():
+    b = WeightBroadcaster()
+    b.publish(ScaleReading(1.0, "lb", True))
+    b.publish(ScaleReading(1.01, "lb", True))  # same displayed text
+    assert b.current() == ("1.0 lbs", 1)
+
+    b.publish(ScaleReading(2.0, "lb", True))
+    assert b.current() == ("2.0 lbs", 2)
+
+
+def test_wait_for_change_times_out_when_static():
+    b = WeightBroadcaster("1.0 lbs")
+    t0 = time.monotonic()
+    assert b.wait_for_change(0, timeout=0.05) == ("1.0 lbs", 0)
+    assert time.monotonic() - t0 >= 0.05
+
+
+def test_sse_pushes_changes_quickly():
+    broadcaster = WeightBroadcaster("0.0 lbs")
+    server = WeightStreamServer(broadcaster, "127.0.0.1", 0).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        conn.request("GET", "/weight")
+        resp = conn.getresponse()
+        assert resp.status == 200
+        assert resp.getheader("Content-Type") == "text/event-stream"
+
+        assert read_event(resp) == {"text": "0.0 lbs"}
+
+        t0 = time.monotonic()
+        broadcaster.publish(ScaleReading(5.5, "lb", True))
+        assert read_event(resp) == {"text": "5.5 lbs"}
+        assert time.monotonic() - t0 < 0.1
+        conn.close()
+    finally:
+        server.close()
+
+
+def test_unknown_path_is_404():
+    server = WeightStreamServer(WeightBroadcaster(), "127.0.0.1", 0).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        conn.request("GET", "/nope")
+        assert conn.getresponse().status == 404
+        conn.close()
+    finally:
+        server.close()
+
+
+class ListenedScale:
+    def __init__(self):
+        self.listeners = []
+
+    def get_latest(self):
+        return ScaleReading(1.0, "lb", True)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+
+def test_each_station_scale_has_its_own_stream():
+    server = WeightStreamServer(WeightBroadcaster("0.0 lbs"), "127.0.0.1", 0).start()
+    scale = ListenedScale()
+    server.add_scale("/dev/hidraw1", scale)
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        conn.request("GET", "/weight?scale=%2Fdev%2Fhidraw1")
+        resp = conn.getresponse()
+        assert read_event(resp) == {"text": "1.0 lbs"}
+        scale.listeners[0](ScaleReading(7.0, "lb", True))
+        assert read_event(resp) == {"text": "7.0 lbs"}
+        conn.close()
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        conn.request("GET", "/weight?scale=/dev/hidraw9")
+        assert conn.getresponse().status == 404
+        conn.close()
+    finally:
+        server.close()